@@ -0,0 +1,45 @@
+"""Store full ai analysis results
+
+Revision ID: a41d7e0c9b23
+Revises: 5f3c2a9d8e71
+Create Date: 2026-10-17 11:40:05.532871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41d7e0c9b23'
+down_revision: Union[str, Sequence[str], None] = '5f3c2a9d8e71'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ai_analyses', sa.Column('keyword_match_score', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('ai_analyses', sa.Column('missing_keywords', sa.JSON(), nullable=True))
+    op.add_column('ai_analyses', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.add_column('ai_analyses', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.alter_column('ai_analyses', 'suggestions',
+               existing_type=sa.String(length=255),
+               type_=sa.JSON(),
+               existing_nullable=True,
+               postgresql_using='to_json(suggestions)')
+    op.create_unique_constraint('unique_analysis_application_resume', 'ai_analyses', ['application_id', 'resume_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('unique_analysis_application_resume', 'ai_analyses', type_='unique')
+    op.alter_column('ai_analyses', 'suggestions',
+               existing_type=sa.JSON(),
+               type_=sa.String(length=255),
+               existing_nullable=True)
+    op.drop_column('ai_analyses', 'updated_at')
+    op.drop_column('ai_analyses', 'created_at')
+    op.drop_column('ai_analyses', 'missing_keywords')
+    op.drop_column('ai_analyses', 'keyword_match_score')
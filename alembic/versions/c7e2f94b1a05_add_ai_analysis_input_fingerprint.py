@@ -0,0 +1,28 @@
+"""Add ai analysis input fingerprint
+
+Revision ID: c7e2f94b1a05
+Revises: a41d7e0c9b23
+Create Date: 2026-10-17 20:21:37.104528
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2f94b1a05'
+down_revision: Union[str, Sequence[str], None] = 'a41d7e0c9b23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('ai_analyses', sa.Column('input_fingerprint', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('ai_analyses', 'input_fingerprint')
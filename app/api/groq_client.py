@@ -1,163 +1,75 @@
+import asyncio
+import copy
+import hashlib
 import os
 import re
 import json
-import requests
 import logging
-import re
+from typing import AsyncIterator, Optional, Tuple
+
+import httpx
+
+from app.api.groq_dispatcher import PRIORITY_INTERACTIVE, GroqDispatcher, GroqUnavailableError
+from app.api.result_cache import analysis_cache, make_cache_key, normalize_text
+from app.api.single_flight import SingleFlight
+from app.utils.json_stream import IncrementalJSONParser
+from app.utils.keyword_scorer import clamp_quality, combine_ats_score, failed_analysis, score_keywords
+from app.utils.prompt_compactor import compact_inputs, compact_resume, estimate_tokens
 logger = logging.getLogger(__name__)
 
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 GROQ_MODEL = os.getenv("GROQ_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
 
-def analyze_resume_with_groq(resume_text: str, job_description: str) -> dict:
+# Connection pool shared by every Groq call in this worker
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "10"))
+GROQ_CONNECT_TIMEOUT = float(os.getenv("GROQ_CONNECT_TIMEOUT", "5"))
 
-    if not GROQ_API_KEY:
-     raise RuntimeError("GROQ_API_KEY not set in environment")
-    """
-    Sends resume and JD to Groq API and extracts structured insights.
-    Always returns a dict with keys: score, missing_keywords, suggestions.
-    """
-    # resume_keyword = extract_jd_keywords(resume_text)
-    
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json",
-    }
-    payload = {
-        "model": GROQ_MODEL,
-        "temperature": 0,
-        "response_format": { "type": "json_object" },
-        "messages": [
-            {
-               "role": "system",
-    "content": """
-     INPUT FORMAT
-----------
-The assistant will receive two raw text blobs. They will be injected below between the markers.
-You MUST parse them and return ONLY the JSON object in the exact schema described afterwards.
+ANALYSIS_TIMEOUT = 30.0
+STRUCTURE_TIMEOUT = 60.0
 
-###JOB_DESCRIPTION_START###
-{JOB_DESCRIPTION_HERE}
-###JOB_DESCRIPTION_END###
+# Output budget assumed per call when charging the tokens-per-minute bucket
+EXPECTED_OUTPUT_TOKENS = {"analysis": 600, "structure": 2000}
 
-###RESUME_START###
-{RESUME_HERE}
-###RESUME_END###
+# Bump whenever a system prompt changes so cached results from the old prompt are not reused
+ANALYSIS_PROMPT_VERSION = "analysis-v2"
+STRUCTURE_PROMPT_VERSION = "structure-v1"
+
+ANALYSIS_SYSTEM_PROMPT = """
+     INPUT FORMAT
+----------
+The assistant will receive a job description, a resume, and the list of JD keywords
+that were NOT found in the resume (keyword matching has already been done deterministically).
+You MUST return ONLY the JSON object in the exact schema described afterwards.
 
 OUTPUT SCHEMA (MUST be the ONLY CONTENT RETURNED)
 {
-  "ats_score": <integer 0-100>,
-  "keyword_match_score": <integer 0-100>,
-  "missing_keywords": [<list of strings>],
+  "resume_quality": <integer 0-100>,
   "suggestions": [<list of strings>]
 }
 
-DETERMINISTIC RULES & MATCHING ALGORITHM (follow exactly)
-1. Normalization:
-   - Convert both JD and Resume to lowercase.
-   - Strip punctuation except characters used in tech names (+, #, ., -), e.g. keep "c++", "node.js", "c#".
-   - Collapse multiple spaces.
-2. Keyword extraction (from JD):
-   - Extract explicit terms, lists, comma-separated skills, quoted tokens, parenthesized items, and capitalized multi-word phrases.
-   - Include: hard skills, soft skills, technologies, protocols, minimum experience phrasing (e.g. "5+ years"), education requirements phrasing(e.g. Bachelor’s Degree or equivalent in Computer Science, Software Engineering, or related field.), role names.
-   - Produce a deduplicated list. Order does not matter.
-   - DO NOT invent keywords not present (no summarization).
-3. Matching rules (deterministic):
-   - For each JD keyword (as an exact phrase), create a normalized form and compare to resume text using these checks in order:
-     a) Exact phrase present → full match weight = 1.0
-     b) Token subset: all tokens of the JD keyword appear in resume (anywhere) → full match weight = 1.0
-     c) Partial token overlap ≥ 60% → partial match weight = 0.5
-     d) Synonym mapping: consult the built-in synonym map (below) — if present in resume, treat as partial match weight = 0.5 (only if not matched by a/b/c).
-     e) Otherwise not matched (weight = 0).
-   - Synonym map (apply these as deterministic examples; add others only when exact lexical variants are obvious):
-     { "js": "javascript", "node": "node.js", "reactjs": "react", "aws": "amazon web services", "postgres": "postgresql", "sql": "sql", "csharp": "c#", "cpp": "c++" }
-4. keyword_match_score:
-   - Compute sum_of_weights = Σ(weight for each JD keyword).
-   - score = floor( (sum_of_weights / total_number_of_jd_keywords) * 100 ).
-   - If JD has 0 extracted keywords, set keyword_match_score = 0.
-5. ats_score:
+RULES (follow exactly)
+1. resume_quality:
    - Compute resume_quality (0-100) from these conservative heuristics (model must be conservative):
      • Experience-level match (seniority & years): 0-30 (give full points only if explicit years and seniority match or exceed JD request)
      • Education & required credentials: 0-20
      • Formatting & clarity (presence of bullets, clear sections for experience/skills): 0-20
      • Relevance of job titles & achievements (metrics present): 0-30
-   - Then combine: ats_score = floor( 0.7 * keyword_match_score + 0.3 * resume_quality ).
-6. missing_keywords:
-   - Return Missing JD Keywords that the hiring manager or recruiter would spot out and care about.
-   - Return every JD keyword whose final match weight == 0. Order can be any.
-   - If all keywords matched (sum_of_weights equals total JD keywords), return [].
-7. suggestions:
+   - resume_quality is the sum of the four parts.
+2. suggestions:
    - Return suggestions that an hiring manager or recruiter would give to improve the resume.
    - Return 5–10 short (max 120 characters each) actionable suggestions in plain English.
-   - Keep them conservative and specific (e.g., "Add 'Spring Boot' to skills if you have experience", "Quantify achievements with numbers", "Match job title to JD").
-8. Output requirements:
+   - Use the missing keywords where relevant (e.g., "Add 'Spring Boot' to skills if you have experience").
+   - Keep them conservative and specific (e.g., "Quantify achievements with numbers", "Match job title to JD").
+3. Output requirements:
    - All numbers must be integers.
    - JSON only. No extra keys. No debugging fields.
-   - Deterministic: use exact algorithm above (temperature=0 recommended).
-Now produce the JSON using the provided JD and Resume above.
-
-    """
-          },
-
-            {
-                "role": "user",
-                "content": f"""
-          Job Description:
-          {job_description}
-
-          Resume:
-          {resume_text}
-          """
-            },
-        ],
-    }
-
-    try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=30)
-        resp.raise_for_status()
-        data = resp.json()
-
-        content = data["choices"][0]["message"]["content"].strip()
-
-        # Extract JSON safely
-        match = re.search(r"\{.*\}", content, re.DOTALL)
-        if match:
-            return json.loads(match.group())
-
-    except Exception as e:
-     logger.error(f"Groq API call failed: {e}")
-     return {
-          "ats_score": 0,
-          "keyword_match_score": 0,
-          "missing_keywords": [],
-          "suggestions": [f"Groq API failed: {str(e)}"]
-     }
+Now produce the JSON using the provided JD and Resume.
 
-
-
-def extract_resume_json_with_groq(resume_text: str) -> dict:
-    """
-    Dynamically extract and structure a resume into universal 'Classic' JSON.
-    Works across any profession — AI determines section names and order.
     """
-    if not GROQ_API_KEY:
-        raise RuntimeError("GROQ_API_KEY not set in environment")
-
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json",
-    }
 
-    payload = {
-        "model": GROQ_MODEL,
-        "temperature": 0,
-        "response_format": {"type": "json_object"},
-        "messages": [
-            {
-                "role": "system",
-                "content": """
+STRUCTURE_SYSTEM_PROMPT = """
 You are an advanced resume parser that converts *any unstructured resume text* (from any profession or region) into a standardized, universal JSON structure usable for classic resume templates and ATS systems."
 
 ### OUTPUT FORMAT (VALID JSON ONLY)
@@ -232,28 +144,364 @@ You are an advanced resume parser that converts *any unstructured resume text* (
 9. If a section is missing, omit it from the "sections" object.
 10. Never return empty section (e.g, if there us certifications in the section list and it has no data under it).
 """
+
+
+_async_client: Optional[httpx.AsyncClient] = None
+_sync_client: Optional[httpx.Client] = None
+
+# Identical calls already in flight (double clicks, SPA retries) share one Groq request
+analysis_flight = SingleFlight("analysis")
+structure_flight = SingleFlight("structure")
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=GROQ_MAX_CONNECTIONS,
+        max_keepalive_connections=GROQ_MAX_KEEPALIVE,
+        keepalive_expiry=60,
+    )
+
+
+def _headers() -> dict:
+    return {
+        "Authorization": f"Bearer {GROQ_API_KEY}",
+        "Content-Type": "application/json",
+    }
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    One long-lived AsyncClient per worker, so TLS handshakes and TCP
+    connections to Groq are reused across requests (HTTP keep-alive).
+    """
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            headers=_headers(),
+            limits=_limits(),
+            timeout=httpx.Timeout(ANALYSIS_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+        )
+    return _async_client
+
+
+def get_sync_client() -> httpx.Client:
+    """Pooled blocking client for callers that can't await (scripts, scheduler jobs)."""
+    global _sync_client
+    if _sync_client is None or _sync_client.is_closed:
+        _sync_client = httpx.Client(
+            headers=_headers(),
+            limits=_limits(),
+            timeout=httpx.Timeout(ANALYSIS_TIMEOUT, connect=GROQ_CONNECT_TIMEOUT),
+        )
+    return _sync_client
+
+
+async def close_groq_clients():
+    """Close pooled connections. Called on app shutdown."""
+    global _async_client, _sync_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _sync_client is not None:
+        _sync_client.close()
+        _sync_client = None
+
+
+def _timeout(seconds: float) -> httpx.Timeout:
+    return httpx.Timeout(seconds, connect=GROQ_CONNECT_TIMEOUT)
+
+
+# Every Groq call goes through the dispatcher (rate limits, priority, retries, circuit breaker)
+groq_dispatcher = GroqDispatcher(get_async_client, get_sync_client, GROQ_API_URL)
+
+
+def _estimated_tokens(payload: dict, kind: str) -> int:
+    prompt = sum(estimate_tokens(m["content"]) for m in payload["messages"])
+    return prompt + EXPECTED_OUTPUT_TOKENS[kind]
+
+
+def analysis_cache_key(resume_text: str, job_description: str) -> str:
+    return make_cache_key(
+        normalize_text(resume_text),
+        normalize_text(job_description),
+        GROQ_MODEL,
+        ANALYSIS_PROMPT_VERSION,
+    )
+
+
+def structure_cache_key(resume_text: str) -> str:
+    return make_cache_key(normalize_text(resume_text), GROQ_MODEL, STRUCTURE_PROMPT_VERSION)
+
+
+def structure_file_cache_key(file_bytes: bytes, sha256: Optional[str] = None) -> str:
+    """Key for the cleaned structure of an uploaded file; lets a hit skip text extraction too."""
+    return make_cache_key("file", sha256 or hashlib.sha256(file_bytes).hexdigest(), GROQ_MODEL, STRUCTURE_PROMPT_VERSION)
+
+
+def _analysis_payload(resume_text: str, job_description: str, missing_keywords: list) -> dict:
+    # Only the prompt is compacted; keyword scoring always sees the full text
+    compacted = compact_inputs(resume_text, job_description)
+    resume_text, job_description = compacted.resume_text, compacted.job_description
+    return {
+        "model": GROQ_MODEL,
+        "temperature": 0,
+        "response_format": { "type": "json_object" },
+        "messages": [
+            {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+            {
+                "role": "user",
+                "content": f"""
+          Job Description:
+          {job_description}
+
+          Resume:
+          {resume_text}
+
+          Missing Keywords:
+          {", ".join(missing_keywords) or "(none)"}
+          """
             },
-            {"role": "user", "content": resume_text}
         ],
     }
 
+
+def _structure_payload(resume_text: str) -> dict:
+    return {
+        "model": GROQ_MODEL,
+        "temperature": 0,
+        "response_format": {"type": "json_object"},
+        "messages": [
+            {"role": "system", "content": STRUCTURE_SYSTEM_PROMPT},
+            {"role": "user", "content": compact_resume(resume_text)}
+        ],
+    }
+
+
+def _parse_json_content(data: dict) -> dict:
+    content = data["choices"][0]["message"]["content"]
+
+    # Take the first complete JSON object; tolerates prose or fences around it
+    parser = IncrementalJSONParser(max_depth=0)
+    parser.feed(content)
+    if not parser.done:
+        raise ValueError("Groq did not return valid JSON")
+    return parser.close()
+
+
+def _analysis_failed(e: Exception, local: dict) -> dict:
+    logger.error(f"Groq API call failed: {e}")
+    return failed_analysis(local, f"Groq API failed: {str(e)}")
+
+
+def _merge_analysis(local: dict, llm: dict) -> dict:
+    """Combine the local keyword score with the LLM's subjective resume_quality."""
+    quality = clamp_quality(llm.get("resume_quality"))
+    return {
+        "ats_score": combine_ats_score(local["keyword_match_score"], quality),
+        "keyword_match_score": local["keyword_match_score"],
+        "missing_keywords": local["missing_keywords"],
+        "suggestions": llm.get("suggestions", []),
+        "resume_quality": quality,
+    }
+
+
+def _finish_structure(parsed: dict) -> dict:
+    # Safety defaults
+    parsed.setdefault("sections", {})
+    parsed.setdefault("order", list(parsed["sections"].keys()))
+    return parsed
+
+
+async def analyze_resume_with_groq_async(resume_text: str, job_description: str, priority: int = PRIORITY_INTERACTIVE) -> dict:
+    """
+    Sends resume and JD to Groq API and extracts structured insights.
+    Always returns a dict with keys: score, missing_keywords, suggestions.
+    Results are cached by content hash, so repeat analyses cost no tokens.
+    Non-blocking: safe to await from request handlers.
+    """
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set in environment")
+
+    key = analysis_cache_key(resume_text, job_description)
+    cached = await asyncio.to_thread(analysis_cache.get, key)
+    if cached is not None:
+        return cached
+
+    return await analysis_flight.do(key, lambda: _run_analysis(resume_text, job_description, key, priority))
+
+
+async def _run_analysis(resume_text: str, job_description: str, key: str, priority: int) -> dict:
+    local = score_keywords(resume_text, job_description)
+    payload = _analysis_payload(resume_text, job_description, local["missing_keywords"])
     try:
-        resp = requests.post(url, headers=headers, json=payload, timeout=60)
-        resp.raise_for_status()
-        data = resp.json()
-        content = data["choices"][0]["message"]["content"].strip()
-        match = re.search(r"\{.*\}", content, re.DOTALL)
-        if not match:
-            raise ValueError("Groq did not return valid JSON")
+        data = await groq_dispatcher.post(
+            payload,
+            timeout=_timeout(ANALYSIS_TIMEOUT),
+            priority=priority,
+            tokens=_estimated_tokens(payload, "analysis"),
+        )
+        insights = _merge_analysis(local, _parse_json_content(data))
+    except GroqUnavailableError:
+        raise
+    except Exception as e:
+        return _analysis_failed(e, local)
+
+    await asyncio.to_thread(analysis_cache.set, key, insights)
+    return insights
+
+
+def analyze_resume_with_groq(resume_text: str, job_description: str) -> dict:
+    """
+    Blocking variant of analyze_resume_with_groq_async.
+    Do not call from inside an event loop.
+    """
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set in environment")
 
-        parsed = json.loads(match.group())
+    key = analysis_cache_key(resume_text, job_description)
+    cached = analysis_cache.get(key)
+    if cached is not None:
+        return cached
 
-        # Safety defaults
-        parsed.setdefault("sections", {})
-        parsed.setdefault("order", list(parsed["sections"].keys()))
+    local = score_keywords(resume_text, job_description)
+    payload = _analysis_payload(resume_text, job_description, local["missing_keywords"])
+    try:
+        data = groq_dispatcher.post_sync(
+            payload,
+            timeout=_timeout(ANALYSIS_TIMEOUT),
+            tokens=_estimated_tokens(payload, "analysis"),
+        )
+        insights = _merge_analysis(local, _parse_json_content(data))
+    except GroqUnavailableError:
+        raise
+    except Exception as e:
+        return _analysis_failed(e, local)
+
+    analysis_cache.set(key, insights)
+    return insights
+
+
+async def _stream_completion(payload: dict, timeout: float, kind: str) -> AsyncIterator[str]:
+    """Yields content deltas from an OpenAI-compatible streaming chat completion."""
+    payload = {**payload, "stream": True}
+    async with groq_dispatcher.stream(
+        payload, timeout=_timeout(timeout), tokens=_estimated_tokens(payload, kind)
+    ) as resp:
+        async for line in resp.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+async def _stream_json(payload: dict, timeout: float, kind: str) -> AsyncIterator[Tuple[str, object]]:
+    parser = IncrementalJSONParser(max_depth=2)
+    async for delta in _stream_completion(payload, timeout, kind):
+        for path, value in parser.feed(delta):
+            yield "field", {"path": path, "value": value}
+        if parser.done:
+            break
+    yield "done", parser.close()
+
+
+async def stream_analysis_with_groq(resume_text: str, job_description: str) -> AsyncIterator[Tuple[str, object]]:
+    """
+    Streaming variant of analyze_resume_with_groq_async.
+    Yields ("field", {"path", "value"}) for every value as soon as it is complete
+    (top-level fields and individual list entries), then ("done", full_result).
+    Cache hits replay the stored result immediately.
+    """
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set in environment")
+
+    key = analysis_cache_key(resume_text, job_description)
+    cached = await asyncio.to_thread(analysis_cache.get, key)
+    if cached is not None:
+        for field, value in cached.items():
+            yield "field", {"path": [field], "value": value}
+        yield "done", cached
+        return
+
+    # The deterministic part is known before the LLM says anything
+    local = score_keywords(resume_text, job_description)
+    yield "field", {"path": ["keyword_match_score"], "value": local["keyword_match_score"]}
+    yield "field", {"path": ["missing_keywords"], "value": local["missing_keywords"]}
+
+    payload = _analysis_payload(resume_text, job_description, local["missing_keywords"])
+    async for event, data in _stream_json(payload, ANALYSIS_TIMEOUT, "analysis"):
+        if event == "done":
+            data = _merge_analysis(local, data)
+            await asyncio.to_thread(analysis_cache.set, key, data)
+        elif data["path"] == ["resume_quality"]:
+            yield event, data
+            data = {
+                "path": ["ats_score"],
+                "value": combine_ats_score(local["keyword_match_score"], data["value"]),
+            }
+        yield event, data
+
+
+async def stream_resume_json_with_groq(resume_text: str) -> AsyncIterator[Tuple[str, object]]:
+    """Streaming variant of extract_resume_json_with_groq_async (emits each section as it completes)."""
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set in environment")
 
-        return parsed
+    async for event, data in _stream_json(_structure_payload(resume_text), STRUCTURE_TIMEOUT, "structure"):
+        if event == "done":
+            data = _finish_structure(data)
+        yield event, data
 
+
+async def extract_resume_json_with_groq_async(resume_text: str) -> dict:
+    """
+    Dynamically extract and structure a resume into universal 'Classic' JSON.
+    Works across any profession — AI determines section names and order.
+    """
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set in environment")
+
+    parsed = await structure_flight.do(structure_cache_key(resume_text), lambda: _run_structure(resume_text))
+    # Coalesced callers share one result; callers normalize it in place
+    return copy.deepcopy(parsed)
+
+
+async def _run_structure(resume_text: str) -> dict:
+    payload = _structure_payload(resume_text)
+    try:
+        data = await groq_dispatcher.post(
+            payload,
+            timeout=_timeout(STRUCTURE_TIMEOUT),
+            tokens=_estimated_tokens(payload, "structure"),
+        )
+        return _finish_structure(_parse_json_content(data))
+
+    except GroqUnavailableError:
+        raise
+    except Exception as e:
+        logger.error(f"Groq universal resume parse failed: {e}")
+        return {"sections": {}, "order": []}
+
+
+def extract_resume_json_with_groq(resume_text: str) -> dict:
+    """Blocking variant of extract_resume_json_with_groq_async."""
+    if not GROQ_API_KEY:
+        raise RuntimeError("GROQ_API_KEY not set in environment")
+
+    payload = _structure_payload(resume_text)
+    try:
+        data = groq_dispatcher.post_sync(
+            payload,
+            timeout=_timeout(STRUCTURE_TIMEOUT),
+            tokens=_estimated_tokens(payload, "structure"),
+        )
+        return _finish_structure(_parse_json_content(data))
+
+    except GroqUnavailableError:
+        raise
     except Exception as e:
         logger.error(f"Groq universal resume parse failed: {e}")
         return {"sections": {}, "order": []}
@@ -0,0 +1,300 @@
+import asyncio
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional
+
+import httpx
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+GROQ_RPM = float(os.getenv("GROQ_RPM", "30"))
+GROQ_TPM = float(os.getenv("GROQ_TPM", "30000"))
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "3"))
+GROQ_BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", "0.5"))
+GROQ_BACKOFF_MAX = float(os.getenv("GROQ_BACKOFF_MAX", "20"))
+GROQ_BREAKER_THRESHOLD = int(os.getenv("GROQ_BREAKER_THRESHOLD", "5"))
+GROQ_BREAKER_RESET_SECONDS = float(os.getenv("GROQ_BREAKER_RESET_SECONDS", "30"))
+
+# Lower runs first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 5
+PRIORITY_BACKGROUND = 10
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class GroqUnavailableError(RuntimeError):
+    """Groq is rate limiting or down and retries are exhausted (or the circuit is open)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Reservation-style token bucket, safe to share between threads and the event loop.
+    reserve(n) takes n tokens immediately (the balance may go negative) and returns
+    how long the caller must wait before using them.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def available(self) -> float:
+        with self._lock:
+            elapsed = time.monotonic() - self._updated
+            return min(self.capacity, self._tokens + elapsed * self.rate)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `threshold` consecutive provider failures;
+    open -> half-open after `reset_timeout`, letting one trial call through;
+    half-open -> closed on success, back to open on failure.
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def check(self) -> None:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            # A trial that never reported back (e.g. cancelled) must not wedge the breaker
+            trial_stale = time.monotonic() - self._trial_started >= self.reset_timeout
+            if state == "half_open" and (not self._trial_in_flight or trial_stale):
+                self._trial_in_flight = True
+                self._trial_started = time.monotonic()
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self.opened_at)
+        raise GroqUnavailableError("Groq circuit is open; failing fast", retry_after=max(1.0, remaining))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.threshold:
+                if self.opened_at is None or self._trial_in_flight:
+                    logger.warning(f"Groq circuit opened after {self.failures} consecutive failures")
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+def _retry_after(resp: Optional[httpx.Response]) -> Optional[float]:
+    if resp is None:
+        return None
+    value = resp.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(GROQ_BACKOFF_MAX, GROQ_BACKOFF_BASE * (2 ** attempt)))
+
+
+class GroqDispatcher:
+    """
+    Single gateway for every outbound Groq call in this worker.
+
+    - requests-per-minute and tokens-per-minute token buckets
+    - priority queue: interactive calls are released before batch/background ones
+    - retries on 429/5xx/network errors with jittered backoff, honoring Retry-After
+      (a Retry-After also pauses the whole queue, not just the one call)
+    - circuit breaker that fails fast while the provider is down
+    """
+
+    def __init__(self, async_client: Callable[[], httpx.AsyncClient], sync_client: Callable[[], httpx.Client], url: str):
+        self._async_client = async_client
+        self._sync_client = sync_client
+        self.url = url
+        self.rpm = TokenBucket(GROQ_RPM)
+        self.tpm = TokenBucket(GROQ_TPM)
+        self.breaker = CircuitBreaker(GROQ_BREAKER_THRESHOLD, GROQ_BREAKER_RESET_SECONDS)
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._pump: Optional[asyncio.Task] = None
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self.sent = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.failed = 0
+        self.admit_wait = 0.0  # seconds calls spent waiting on the limiter and the queue
+
+    # ---- admission -------------------------------------------------------
+
+    def _delay_for(self, tokens: float) -> float:
+        pause = self._paused_until - time.monotonic()
+        return max(self.rpm.reserve(1), self.tpm.reserve(tokens), pause, 0.0)
+
+    async def _run_pump(self):
+        while True:
+            _, _, tokens, fut = await self._queue.get()
+            if fut.done():
+                continue
+            delay = self._delay_for(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if not fut.done():
+                fut.set_result(None)
+
+    async def _admit(self, priority: int, tokens: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self._pump is None or self._pump.done() or self._pump.get_loop() is not loop:
+            self._queue = asyncio.PriorityQueue()
+            self._pump = loop.create_task(self._run_pump())
+        fut = loop.create_future()
+        queued = time.monotonic()
+        await self._queue.put((priority, next(self._seq), tokens, fut))
+        await fut
+        self.admit_wait += time.monotonic() - queued
+
+    def _pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    # ---- outcome bookkeeping --------------------------------------------
+
+    def _retry_delay(self, attempt: int, resp: Optional[httpx.Response], error: str) -> float:
+        """Records a retryable failure and returns how long to wait, or raises when out of retries."""
+        hinted = _retry_after(resp)
+        if resp is not None and resp.status_code == 429:
+            # Rate limited means the provider is up; it must not trip the breaker
+            self.breaker.record_success()
+            self.rate_limited += 1
+            if hinted:
+                self._pause(hinted)
+        else:
+            self.breaker.record_failure()
+
+        if attempt >= GROQ_MAX_RETRIES:
+            self.failed += 1
+            raise GroqUnavailableError(f"Groq request failed after {attempt + 1} attempts: {error}", retry_after=hinted)
+
+        self.retries += 1
+        delay = hinted if hinted is not None else _backoff(attempt)
+        logger.warning(f"Groq call failed ({error}); retry {attempt + 1}/{GROQ_MAX_RETRIES} in {delay:.2f}s")
+        return delay
+
+    # ---- public API ------------------------------------------------------
+
+    async def post(self, payload: dict, timeout: httpx.Timeout, priority: int = PRIORITY_INTERACTIVE, tokens: float = 1000) -> dict:
+        """POST a chat completion and return the decoded JSON body."""
+        for attempt in itertools.count():
+            self.breaker.check()
+            await self._admit(priority, tokens)
+            resp = None
+            try:
+                self.sent += 1
+                resp = await self._async_client().post(self.url, json=payload, timeout=timeout)
+                if resp.status_code not in RETRYABLE_STATUS:
+                    self.breaker.record_success()
+                    resp.raise_for_status()
+                    return resp.json()
+                error = f"HTTP {resp.status_code}"
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            await asyncio.sleep(self._retry_delay(attempt, resp, error))
+
+    def post_sync(self, payload: dict, timeout: httpx.Timeout, tokens: float = 1000) -> dict:
+        """Blocking post(); shares limits and breaker with the async path but has no priority."""
+        for attempt in itertools.count():
+            self.breaker.check()
+            delay = self._delay_for(tokens)
+            self.admit_wait += delay
+            time.sleep(delay)
+            resp = None
+            try:
+                self.sent += 1
+                resp = self._sync_client().post(self.url, json=payload, timeout=timeout)
+                if resp.status_code not in RETRYABLE_STATUS:
+                    self.breaker.record_success()
+                    resp.raise_for_status()
+                    return resp.json()
+                error = f"HTTP {resp.status_code}"
+            except httpx.TransportError as e:
+                error = f"{type(e).__name__}: {e}"
+            time.sleep(self._retry_delay(attempt, resp, error))
+
+    @asynccontextmanager
+    async def stream(self, payload: dict, timeout: httpx.Timeout, priority: int = PRIORITY_INTERACTIVE, tokens: float = 1000) -> AsyncIterator[httpx.Response]:
+        """
+        Open a streaming chat completion. Retries happen only before the response
+        body starts; once a 2xx stream is handed to the caller it is not replayed.
+        """
+        for attempt in itertools.count():
+            self.breaker.check()
+            await self._admit(priority, tokens)
+            resp = None
+            started = False
+            try:
+                self.sent += 1
+                async with self._async_client().stream("POST", self.url, json=payload, timeout=timeout) as resp:
+                    if resp.status_code not in RETRYABLE_STATUS:
+                        self.breaker.record_success()
+                        resp.raise_for_status()
+                        started = True
+                        yield resp
+                        return
+                    error = f"HTTP {resp.status_code}"
+            except httpx.TransportError as e:
+                if started:
+                    raise
+                error = f"{type(e).__name__}: {e}"
+            await asyncio.sleep(self._retry_delay(attempt, resp, error))
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.sent,
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+            "admit_wait_s": round(self.admit_wait, 3),
+            "queued": self._queue.qsize() if self._queue else 0,
+            "circuit": self.breaker.state,
+            "rpm_available": round(self.rpm.available(), 2),
+            "tpm_available": round(self.tpm.available(), 2),
+        }
@@ -0,0 +1,269 @@
+import asyncio
+import datetime
+import os
+import socket
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+from app import database, models
+from app.api.groq_client import analyze_resume_with_groq_async, clean_resume_json, extract_resume_json_with_groq_async
+from app.api.groq_dispatcher import GroqUnavailableError
+from app.api.result_cache import structure_cache
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+AI_JOB_WORKERS = int(os.getenv("AI_JOB_WORKERS", "2"))
+AI_JOB_POLL_SECONDS = float(os.getenv("AI_JOB_POLL_SECONDS", "2"))
+AI_JOB_TIMEOUT_SECONDS = int(os.getenv("AI_JOB_TIMEOUT_SECONDS", "300"))
+AI_JOB_MAX_ATTEMPTS = int(os.getenv("AI_JOB_MAX_ATTEMPTS", "3"))
+AI_JOB_RETENTION_HOURS = int(os.getenv("AI_JOB_RETENTION_HOURS", "24"))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+
+
+async def _run_analyze(payload: dict) -> dict:
+    return await analyze_resume_with_groq_async(payload["resume_text"], payload["job_description"])
+
+
+async def _run_structure(payload: dict) -> dict:
+    resume_json = clean_resume_json(await extract_resume_json_with_groq_async(payload["resume_text"]))
+    if payload.get("cache_key") and resume_json.get("sections"):
+        await asyncio.to_thread(structure_cache.set, payload["cache_key"], resume_json)
+    return resume_json
+
+
+JOB_HANDLERS: Dict[str, Callable[[dict], Awaitable[dict]]] = {
+    "analyze": _run_analyze,
+    "structure": _run_structure,
+}
+
+
+def _finished_payload(payload: dict) -> dict:
+    """The payload kept once a job is done: the resume text is only needed to run it."""
+    return {k: v for k, v in payload.items() if k != "resume_text"}
+
+
+def submit_job(db, user_id: int, kind: str, payload: dict, result: Optional[dict] = None) -> models.AiJob:
+    """
+    Queue a job for `user_id` and wake the local workers. Passing `result` records
+    a job that was answered on the spot (cache hit), so clients poll it like any other.
+    """
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    now = datetime.datetime.utcnow()
+    job = models.AiJob(
+        id=str(uuid.uuid4()), user_id=user_id, kind=kind, payload=payload, status=QUEUED, run_after=now,
+    )
+    if result is not None:
+        job.status, job.result, job.finished_at = SUCCEEDED, result, now
+        job.payload = _finished_payload(payload)
+    db.add(job)
+    db.commit()
+    if result is None:
+        job_workers.notify()
+    return job
+
+
+def job_to_dict(job: models.AiJob, include_result: bool = True) -> dict:
+    data = {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+    if job.status == FAILED:
+        data["error"] = job.error
+    if include_result and job.status == SUCCEEDED:
+        data["result"] = job.result
+    return data
+
+
+def _claim_next(worker_id: str) -> Optional[tuple]:
+    """
+    Claim the oldest runnable job. The queued -> running UPDATE is conditional on the
+    row still being queued, so two workers (or processes) can never both win it;
+    on Postgres SKIP LOCKED additionally keeps workers off each other's candidates.
+    """
+    db = database.SessionLocal()
+    try:
+        now = datetime.datetime.utcnow()
+        candidates = db.query(models.AiJob.id).filter(
+            models.AiJob.status == QUEUED,
+            models.AiJob.run_after <= now,
+        ).order_by(models.AiJob.created_at).limit(5).with_for_update(skip_locked=True).all()
+
+        for (job_id,) in candidates:
+            claimed = db.query(models.AiJob).filter(
+                models.AiJob.id == job_id,
+                models.AiJob.status == QUEUED,
+            ).update({
+                models.AiJob.status: RUNNING,
+                models.AiJob.locked_by: worker_id,
+                models.AiJob.started_at: now,
+                models.AiJob.attempts: models.AiJob.attempts + 1,
+            }, synchronize_session=False)
+            if claimed:
+                db.commit()
+                job = db.get(models.AiJob, job_id)
+                return job.id, job.kind, job.payload, job.attempts
+        db.commit()
+        return None
+    finally:
+        db.close()
+
+
+def _finish(job_id: str, worker_id: str, **values) -> None:
+    """Record the outcome, unless the job was reaped and handed to another worker meanwhile."""
+    db = database.SessionLocal()
+    try:
+        db.query(models.AiJob).filter(
+            models.AiJob.id == job_id,
+            models.AiJob.status == RUNNING,
+            models.AiJob.locked_by == worker_id,
+        ).update(values, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def requeue_stale_jobs() -> int:
+    """Jobs left running past the timeout (worker crashed or restarted) are retried or failed."""
+    db = database.SessionLocal()
+    try:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(seconds=AI_JOB_TIMEOUT_SECONDS * 2)
+        stale = db.query(models.AiJob).filter(
+            models.AiJob.status == RUNNING,
+            models.AiJob.started_at < cutoff,
+        ).all()
+        for job in stale:
+            if job.attempts >= AI_JOB_MAX_ATTEMPTS:
+                job.status, job.error = FAILED, "Job timed out"
+                job.finished_at = datetime.datetime.utcnow()
+                job.payload = _finished_payload(job.payload)
+            else:
+                job.status, job.locked_by = QUEUED, None
+        db.commit()
+        if stale:
+            logger.warning(f"Recovered {len(stale)} stale AI jobs")
+        return len(stale)
+    finally:
+        db.close()
+
+
+def purge_finished_jobs():
+    """Delete finished jobs past their retention. Scheduled from app.main."""
+    db = database.SessionLocal()
+    try:
+        cutoff = datetime.datetime.utcnow() - datetime.timedelta(hours=AI_JOB_RETENTION_HOURS)
+        deleted = db.query(models.AiJob).filter(
+            models.AiJob.status.in_([SUCCEEDED, FAILED]),
+            models.AiJob.finished_at < cutoff,
+        ).delete(synchronize_session=False)
+        db.commit()
+        if deleted:
+            logger.info(f"Purged {deleted} finished AI jobs")
+    finally:
+        db.close()
+
+
+class JobWorkerPool:
+    """
+    `concurrency` worker coroutines in this process, each claiming one job at a time
+    from ai_jobs. Workers sleep up to AI_JOB_POLL_SECONDS between polls and are woken
+    immediately when a job is submitted from this process.
+    """
+
+    def __init__(self, concurrency: int = AI_JOB_WORKERS):
+        self.concurrency = concurrency
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(requeue_stale_jobs)
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.concurrency)]
+        logger.info(f"Started {self.concurrency} AI job workers ({self.worker_id})")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _worker(self, n: int) -> None:
+        worker_id = f"{self.worker_id}/{n}"
+        while True:
+            try:
+                job = await asyncio.to_thread(_claim_next, worker_id)
+            except Exception:
+                logger.exception("AI job claim failed")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), AI_JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            await self._run(worker_id, *job)
+
+    async def _run(self, worker_id: str, job_id: str, kind: str, payload: dict, attempts: int) -> None:
+        self.running += 1
+        now = datetime.datetime.utcnow
+        try:
+            result = await asyncio.wait_for(JOB_HANDLERS[kind](payload), AI_JOB_TIMEOUT_SECONDS)
+            if result.get("failed"):
+                # The analysis fell back to the local score because the LLM call failed
+                error = (result.get("suggestions") or ["AI analysis failed"])[0]
+                values = {"status": FAILED, "result": result, "error": error, "finished_at": now()}
+                self.failed += 1
+            else:
+                values = {"status": SUCCEEDED, "result": result, "error": None, "finished_at": now()}
+                self.completed += 1
+        except GroqUnavailableError as e:
+            if attempts < AI_JOB_MAX_ATTEMPTS:
+                # Provider is busy: put the job back instead of failing it
+                delay = datetime.timedelta(seconds=e.retry_after or AI_JOB_POLL_SECONDS * 5)
+                values = {"status": QUEUED, "locked_by": None, "run_after": now() + delay}
+            else:
+                values = {"status": FAILED, "error": str(e), "finished_at": now()}
+                self.failed += 1
+        except asyncio.CancelledError:
+            # Shutting down: hand the job back for the next worker
+            await asyncio.to_thread(_finish, job_id, worker_id, status=QUEUED, locked_by=None)
+            raise
+        except Exception as e:
+            logger.exception(f"AI job {job_id} ({kind}) failed")
+            values = {"status": FAILED, "error": str(e) or type(e).__name__, "finished_at": now()}
+            self.failed += 1
+        finally:
+            self.running -= 1
+        if values["status"] != QUEUED:
+            values["payload"] = _finished_payload(payload)
+        await asyncio.to_thread(_finish, job_id, worker_id, **values)
+
+    def stats(self) -> dict:
+        return {
+            "worker_id": self.worker_id,
+            "concurrency": self.concurrency,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+job_workers = JobWorkerPool()
@@ -0,0 +1,207 @@
+import datetime
+import hashlib
+import os
+import re
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app import database, models
+from app.core.logger import get_logger
+from app.utils.cache import TTLCache
+
+logger = get_logger(__name__)
+
+AI_CACHE_TTL_SECONDS = int(os.getenv("AI_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+AI_CACHE_MEMORY_SIZE = int(os.getenv("AI_CACHE_MEMORY_SIZE", "512"))
+# Structured resumes are larger than analyses, so both tiers are bounded tighter
+STRUCTURE_CACHE_MEMORY_SIZE = int(os.getenv("STRUCTURE_CACHE_MEMORY_SIZE", "128"))
+STRUCTURE_CACHE_MAX_ROWS = int(os.getenv("STRUCTURE_CACHE_MAX_ROWS", "5000"))
+
+_ws_re = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so cosmetic differences don't change the cache key."""
+    return _ws_re.sub(" ", text or "").strip()
+
+
+def make_cache_key(*parts: str) -> str:
+    """SHA-256 over the given parts, separated so ("ab", "c") != ("a", "bc")."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update((part or "").encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache for AI results.
+    Tier 1 is a bounded in-process LRU, tier 2 is the ai_result_cache table,
+    so results survive restarts and are shared between workers.
+    Entries expire after `ttl` seconds in both tiers. The memory tier holds at
+    most `maxsize` entries (LRU); with `max_rows` set, the DB tier is trimmed to
+    its newest `max_rows` rows by purge_expired_cache_entries().
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int = AI_CACHE_TTL_SECONDS,
+        maxsize: int = AI_CACHE_MEMORY_SIZE,
+        max_rows: Optional[int] = None,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        value = self._db_get(key)
+        if value is not None:
+            self.hits += 1
+            self.db_hits += 1
+            self.memory.set(key, value)
+            return value
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: dict) -> None:
+        self.memory.set(key, value)
+        self._db_set(key, value)
+
+    def invalidate(self, key: str) -> None:
+        self.memory.pop(key)
+        self._db_delete(models.AiResultCache.cache_key == key)
+
+    def clear(self) -> None:
+        """Drop every entry of this namespace, e.g. after a parser change that kept the prompt version."""
+        self.memory.clear()
+        self._db_delete(models.AiResultCache.namespace == self.namespace)
+
+    def trim(self) -> int:
+        """Delete the oldest DB rows beyond max_rows. Returns the number of rows removed."""
+        if not self.max_rows:
+            return 0
+        db = database.SessionLocal()
+        try:
+            cutoff = db.query(models.AiResultCache.id).filter(
+                models.AiResultCache.namespace == self.namespace,
+            ).order_by(models.AiResultCache.id.desc()).offset(self.max_rows).limit(1).scalar()
+            if cutoff is None:
+                return 0
+            deleted = db.query(models.AiResultCache).filter(
+                models.AiResultCache.namespace == self.namespace,
+                models.AiResultCache.id <= cutoff,
+            ).delete()
+            db.commit()
+            return deleted
+        except Exception:
+            db.rollback()
+            logger.exception(f"[{self.namespace}] cache trim failed")
+            return 0
+        finally:
+            db.close()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "memory": self.memory.stats(),
+        }
+
+    def _db_delete(self, condition) -> None:
+        db = database.SessionLocal()
+        try:
+            db.query(models.AiResultCache).filter(condition).delete()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"[{self.namespace}] cache invalidate failed: {e}")
+        finally:
+            db.close()
+
+    def _db_get(self, key: str) -> Optional[dict]:
+        db = database.SessionLocal()
+        try:
+            row = db.query(models.AiResultCache).filter(
+                models.AiResultCache.cache_key == key,
+                models.AiResultCache.expires_at > datetime.datetime.utcnow(),
+            ).first()
+            if not row:
+                return None
+            row.hit_count += 1
+            db.commit()
+            return row.payload
+        except Exception as e:
+            # The DB tier is best-effort; a failure here must never break an analysis
+            db.rollback()
+            logger.warning(f"[{self.namespace}] cache read failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _db_set(self, key: str, value: dict) -> None:
+        expires_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=self.ttl)
+        db = database.SessionLocal()
+        try:
+            row = db.query(models.AiResultCache).filter(models.AiResultCache.cache_key == key).first()
+            if row:
+                row.payload = value
+                row.expires_at = expires_at
+            else:
+                db.add(models.AiResultCache(
+                    cache_key=key,
+                    namespace=self.namespace,
+                    payload=value,
+                    expires_at=expires_at,
+                ))
+            db.commit()
+        except IntegrityError:
+            # Another worker stored the same key first; its result is just as good
+            db.rollback()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"[{self.namespace}] cache write failed: {e}")
+        finally:
+            db.close()
+
+
+def purge_expired_cache_entries():
+    """Delete expired rows from ai_result_cache and trim size-bounded namespaces. Scheduled from app.main."""
+    db = database.SessionLocal()
+    try:
+        deleted = db.query(models.AiResultCache).filter(
+            models.AiResultCache.expires_at <= datetime.datetime.utcnow()
+        ).delete()
+        db.commit()
+        if deleted:
+            logger.info(f"Purged {deleted} expired AI cache entries")
+    except Exception:
+        db.rollback()
+        logger.exception("Purging expired AI cache entries failed")
+    finally:
+        db.close()
+
+    for cache in (analysis_cache, structure_cache):
+        trimmed = cache.trim()
+        if trimmed:
+            logger.info(f"Evicted {trimmed} {cache.namespace} cache entries over the {cache.max_rows} row limit")
+
+
+analysis_cache = ResultCache("analysis")
+structure_cache = ResultCache("structure", maxsize=STRUCTURE_CACHE_MEMORY_SIZE, max_rows=STRUCTURE_CACHE_MAX_ROWS)
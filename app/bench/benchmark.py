@@ -0,0 +1,237 @@
+"""
+End-to-end benchmark of the AI endpoints against the fake Groq server.
+
+    # everything in one process: fake Groq on a local port + the feedback router over ASGI
+    python -m app.bench.benchmark -n 200 -c 20 --latency lognormal:800,0.35
+
+    # or against a running API whose GROQ_API_URL points at `python -m app.bench.fake_groq`
+    python -m app.bench.benchmark --target http://127.0.0.1:8000 -n 200 -c 20
+
+Every request carries a unique nonce, so the result cache and call coalescing
+are not measured unless --repeat-ratio asks for repeated inputs. In-process, the
+Groq rate limiter is opened up (--groq-rpm/--groq-tpm, effectively unlimited by
+default) so the numbers measure the service rather than GROQ_RPM; the time calls
+spent waiting on the limiter is reported in its own column.
+Reports throughput and p50/p95/p99 latency per scenario (analyze, reanalyze, structure).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Dict, List, Optional
+
+import fitz
+import httpx
+import numpy as np
+
+SCENARIOS = ("analyze", "reanalyze", "structure")
+UNLIMITED = 1e9  # requests or tokens per minute
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+Requirements: Python, FastAPI, PostgreSQL, Docker, Kubernetes and AWS.
+Experience with CI/CD pipelines (GitHub Actions, Jenkins) and event-driven systems.
+5+ years of experience. Bachelor's degree in Computer Science or related field."""
+
+RESUME_TEXT = """Jane Doe
+Backend engineer, 6 years building APIs in Python and Go.
+Experience: Acme Corp, Software Engineer, 2019 - Present.
+Built FastAPI services on PostgreSQL and Docker; ran CI on GitHub Actions.
+Education: B.S. Computer Science, State University."""
+
+
+def _resume_pdf(nonce: str) -> bytes:
+    """A plain single-block PDF; the local sectioner is not confident on it, so structure reaches Groq."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 550, 800), f"{RESUME_TEXT}\nRef {nonce}", fontsize=10)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _request_factory(scenario: str, repeat_ratio: float) -> Callable[[httpx.AsyncClient], "asyncio.Future"]:
+    shared = uuid.uuid4().hex
+
+    def nonce() -> str:
+        return shared if random.random() < repeat_ratio else uuid.uuid4().hex
+
+    def make(client: httpx.AsyncClient):
+        n = nonce()
+        if scenario == "analyze":
+            return client.post(
+                "/ai/resume/analyze",
+                files={"resume": (f"resume-{n}.pdf", _resume_pdf(n), "application/pdf")},
+                data={"job_description": f"{JOB_DESCRIPTION}\nReq {n}"},
+            )
+        if scenario == "reanalyze":
+            return client.post(
+                "/ai/resume/reanalyze",
+                data={"resume": f"{RESUME_TEXT}\nRef {n}", "job_description": f"{JOB_DESCRIPTION}\nReq {n}"},
+            )
+        return client.post(
+            "/ai/resume/structure",
+            files={"resume": (f"resume-{n}.pdf", _resume_pdf(n), "application/pdf")},
+        )
+
+    return make
+
+
+def _limiter_wait() -> Optional[float]:
+    """Seconds Groq calls have waited for admission so far; None when the API runs elsewhere."""
+    client = sys.modules.get("app.api.groq_client")
+    return client.groq_dispatcher.admit_wait if client else None
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, total: int, concurrency: int, repeat_ratio: float) -> dict:
+    make = _request_factory(scenario, repeat_ratio)
+    waited_before = _limiter_wait()
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    remaining = iter(range(total))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            try:
+                resp = await make(client)
+                statuses[resp.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    waited_after = _limiter_wait()
+
+    ms = np.array(latencies) * 1000
+    ok = statuses.get(200, 0)
+    return {
+        "scenario": scenario,
+        "requests": total,
+        "concurrency": concurrency,
+        "ok": ok,
+        "errors": total - ok,
+        "statuses": {str(k): v for k, v in statuses.items()},
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(float(np.percentile(ms, 50)), 1),
+        "p95_ms": round(float(np.percentile(ms, 95)), 1),
+        "p99_ms": round(float(np.percentile(ms, 99)), 1),
+        "max_ms": round(float(ms.max()), 1),
+        "limiter_wait_ms": (
+            round((waited_after - waited_before) * 1000 / total, 1) if waited_before is not None else None
+        ),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _start_fake_groq(args) -> str:
+    """Run the fake server in a background thread; returns its chat completions URL."""
+    import uvicorn
+
+    from app.bench.fake_groq import FakeGroqConfig, LatencyModel, create_app
+
+    config = FakeGroqConfig(latency=LatencyModel(args.latency), rate_limit=args.rate_limit, error_rate=args.error_rate)
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/openai/v1/chat/completions"
+
+
+def _in_process_app(args):
+    """
+    The feedback router wired to the fake server. Env must be set before app modules
+    are imported, since they read GROQ_API_URL and DATABASE_URL at import time.
+    """
+    os.environ["GROQ_API_URL"] = _start_fake_groq(args)
+    os.environ.setdefault("GROQ_API_KEY", "fake")
+    os.environ["GROQ_RPM"] = str(args.groq_rpm)
+    os.environ["GROQ_TPM"] = str(args.groq_tpm)
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+
+    from fastapi import FastAPI
+
+    from app import database
+    from app.routers import feedback
+
+    database.Base.metadata.create_all(database.engine)
+    app = FastAPI()
+    app.include_router(feedback.router)
+    return app
+
+
+def _print_table(results: List[dict]) -> None:
+    header = (
+        f"{'scenario':<11}{'reqs':>6}{'ok':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+        f"{'limit ms':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r['scenario']:<11}{r['requests']:>6}{r['ok']:>6}{r['throughput_rps']:>9}"
+            f"{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['max_ms']:>10}"
+            f"{'-' if r['limiter_wait_ms'] is None else r['limiter_wait_ms']:>10}"
+        )
+
+
+async def main_async(args) -> List[dict]:
+    if args.target:
+        transport, base_url = None, args.target
+    else:
+        transport, base_url = httpx.ASGITransport(app=_in_process_app(args)), "http://bench"
+
+    timeout = httpx.Timeout(args.timeout)
+    limits = httpx.Limits(max_connections=args.concurrency)
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=timeout, limits=limits) as client:
+        results = []
+        for scenario in args.scenarios:
+            if args.warmup:
+                await run_scenario(client, scenario, args.warmup, min(args.warmup, args.concurrency), 0.0)
+            results.append(await run_scenario(client, scenario, args.requests, args.concurrency, args.repeat_ratio))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyze/reanalyze/structure against the fake Groq server")
+    parser.add_argument("--target", help="base URL of a running API; default runs the router in-process")
+    parser.add_argument("-n", "--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("-c", "--concurrency", type=int, default=10)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--repeat-ratio", type=float, default=0.0, help="fraction of requests reusing one input (cache hits)")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--latency", default="lognormal:800,0.35", help="fake Groq latency spec (in-process mode)")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="fake Groq 429 fraction (in-process mode)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fake Groq 503 fraction (in-process mode)")
+    parser.add_argument("--groq-rpm", type=float, default=UNLIMITED, help="GROQ_RPM for the in-process app")
+    parser.add_argument("--groq-tpm", type=float, default=UNLIMITED, help="GROQ_TPM for the in-process app")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = asyncio.run(main_async(args))
+    _print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
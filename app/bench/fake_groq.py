@@ -0,0 +1,224 @@
+"""
+Groq-compatible stand-in for load testing, so benchmarks don't burn API quota.
+
+Serves POST /openai/v1/chat/completions (the path GROQ_API_URL uses) and
+/v1/chat/completions with canned JSON answers for the analysis and structure
+prompts. It also supports streaming (stream=true, SSE chunks ending in [DONE]),
+configurable latency, and injected 429s and 5xx errors.
+
+    python -m app.bench.fake_groq --port 8090 --latency lognormal:900,0.4 --rate-limit 0.05
+    GROQ_API_URL=http://127.0.0.1:8090/openai/v1/chat/completions GROQ_API_KEY=fake uvicorn app.main:app
+
+Latency specs (milliseconds): fixed:300 | uniform:200,800 | normal:600,150 | lognormal:<median>,<sigma>
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+CANNED_ANALYSIS = {
+    "resume_quality": 72,
+    "suggestions": [
+        "Quantify the impact of your most recent role (latency, revenue, users).",
+        "Move the skills that match the job description to the top of the Skills section.",
+        "Replace generic phrases such as 'responsible for' with action verbs.",
+    ],
+}
+
+CANNED_STRUCTURE = {
+    "sections": {
+        "Header": {"fullName": "Jane Doe", "title": "Software Engineer", "email": "jane@example.com"},
+        "Professional Summary": "Backend engineer building distributed systems in Python and Go.",
+        "Skills": {"Languages": ["Python", "Go", "SQL"], "Cloud": ["AWS", "Docker", "Kubernetes"]},
+        "Work Experience": [
+            {
+                "role": "Software Engineer",
+                "company": "Acme Corp",
+                "startDate": "2020-01",
+                "endDate": "Present",
+                "achievements": ["Cut p99 latency by 40% by moving hot paths to async I/O."],
+            }
+        ],
+        "Education": [{"institution": "State University", "degree": "B.S. Computer Science", "endDate": "2019-06"}],
+    },
+    "order": ["Header", "Professional Summary", "Skills", "Work Experience", "Education"],
+}
+
+
+class LatencyModel:
+    """Samples a response latency in seconds from a spec such as "lognormal:900,0.4" (ms)."""
+
+    def __init__(self, spec: str):
+        self.spec = spec
+        kind, _, args = spec.partition(":")
+        values = [float(v) for v in args.split(",") if v]
+        self.kind = kind
+        self.values = values
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        v = self.values
+        if self.kind == "fixed":
+            ms = v[0]
+        elif self.kind == "uniform":
+            ms = random.uniform(v[0], v[1])
+        elif self.kind == "normal":
+            ms = random.gauss(v[0], v[1])
+        else:
+            ms = random.lognormvariate(math.log(v[0]), v[1])
+        return max(0.0, ms) / 1000.0
+
+
+@dataclass
+class FakeGroqConfig:
+    latency: LatencyModel = field(default_factory=lambda: LatencyModel(os.getenv("FAKE_GROQ_LATENCY", "lognormal:800,0.35")))
+    rate_limit: float = float(os.getenv("FAKE_GROQ_RATE_LIMIT", "0"))  # fraction of requests answered 429
+    error_rate: float = float(os.getenv("FAKE_GROQ_ERROR_RATE", "0"))  # fraction answered 503
+    retry_after: float = float(os.getenv("FAKE_GROQ_RETRY_AFTER", "1"))
+    stream_chunk_chars: int = int(os.getenv("FAKE_GROQ_STREAM_CHUNK", "12"))
+    fixtures: Optional[str] = os.getenv("FAKE_GROQ_FIXTURES")  # JSON file: {"analysis": {...}, "structure": {...}}
+
+
+class _Counters:
+    def __init__(self):
+        self.requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self.streams = 0
+        self.in_flight = 0
+
+
+def _pick_answer(payload: dict, canned: dict) -> dict:
+    system = next((m.get("content", "") for m in payload.get("messages", []) if m.get("role") == "system"), "")
+    if '"sections"' in system or "resume parser" in system:
+        return canned["structure"]
+    if "resume_quality" in system or "suggestions" in system:
+        return canned["analysis"]
+    return {}
+
+
+def _usage(payload: dict, content: str) -> dict:
+    prompt = sum(len(m.get("content", "")) for m in payload.get("messages", [])) // 4
+    completion = len(content) // 4
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+def create_app(config: Optional[FakeGroqConfig] = None) -> FastAPI:
+    config = config or FakeGroqConfig()
+    canned = {"analysis": CANNED_ANALYSIS, "structure": CANNED_STRUCTURE}
+    if config.fixtures:
+        with open(config.fixtures, encoding="utf-8") as f:
+            canned.update(json.load(f))
+
+    app = FastAPI(title="Fake Groq")
+    counters = _Counters()
+    app.state.config = config
+    app.state.counters = counters
+
+    async def chat_completions(request: Request):
+        counters.requests += 1
+        payload = await request.json()
+
+        if random.random() < config.rate_limit:
+            counters.rate_limited += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": str(config.retry_after)},
+            )
+        if random.random() < config.error_rate:
+            counters.errors += 1
+            return JSONResponse({"error": {"message": "Service unavailable"}}, status_code=503)
+
+        content = json.dumps(_pick_answer(payload, canned))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        latency = config.latency.sample()
+
+        if payload.get("stream"):
+            counters.streams += 1
+            return StreamingResponse(
+                _stream(content, completion_id, payload, latency, config, counters),
+                media_type="text/event-stream",
+            )
+
+        counters.in_flight += 1
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            counters.in_flight -= 1
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "fake"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": _usage(payload, content),
+        }
+
+    app.post("/openai/v1/chat/completions")(chat_completions)
+    app.post("/v1/chat/completions")(chat_completions)
+
+    @app.get("/stats")
+    async def stats():
+        return vars(counters)
+
+    return app
+
+
+async def _stream(content: str, completion_id: str, payload: dict, latency: float, config: FakeGroqConfig, counters: _Counters):
+    """First chunk after ~20% of the latency (time to first token), the rest spread over the remainder."""
+    size = max(1, config.stream_chunk_chars)
+    chunks = [content[i:i + size] for i in range(0, len(content), size)] or [""]
+    pause = latency * 0.8 / len(chunks)
+    counters.in_flight += 1
+    try:
+        await asyncio.sleep(latency * 0.2)
+        for piece in chunks:
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "model": payload.get("model", "fake"),
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(event)}\n\n"
+            await asyncio.sleep(pause)
+        yield "data: [DONE]\n\n"
+    finally:
+        counters.in_flight -= 1
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Groq-compatible fake chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", help="e.g. fixed:300, uniform:200,800, normal:600,150, lognormal:900,0.4")
+    parser.add_argument("--rate-limit", type=float, help="fraction of requests answered with 429")
+    parser.add_argument("--error-rate", type=float, help="fraction of requests answered with 503")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--fixtures", help="JSON file overriding the canned analysis/structure answers")
+    args = parser.parse_args()
+
+    config = FakeGroqConfig()
+    if args.latency:
+        config.latency = LatencyModel(args.latency)
+    for name in ("rate_limit", "error_rate", "retry_after", "fixtures"):
+        if getattr(args, name) is not None:
+            setattr(config, name, getattr(args, name))
+
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,13 @@
 from fastapi import FastAPI
 from app.routers import applications, auth, cloudinary, feedback, jd_proxy, resume, users
+from app.api.groq_client import close_groq_clients
+from app.api.job_queue import job_workers, purge_finished_jobs, requeue_stale_jobs
+from app.api.result_cache import purge_expired_cache_entries
 from app.database import SessionLocal
+from app.utils.asset_store import prune_assets
+from app.utils.thumbnails import prune_thumbnails
+from app.utils.extract_pool import extraction_pool
+from app.utils.upload_intake import UploadLimitMiddleware
 from app.routers.auth import cleanup_expired_reset_codes
 from app.utils.scheduler import start_scheduler, scheduler
 from fastapi.middleware.cors import CORSMiddleware
@@ -28,6 +35,8 @@ origins = [
     
 ]
 
+# Added before CORS so oversized-upload rejections still carry CORS headers
+app.add_middleware(UploadLimitMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,  # ✅ allowed origins
@@ -47,12 +56,22 @@ async def health():
     return {"status": "ok"}
 
 @app.on_event("startup")
-def _startup():
+async def _startup():
     start_scheduler()
     scheduler.add_job(scheduled_cleanup, "interval", minutes=20)  # Runs every 10 minutes
+    scheduler.add_job(purge_expired_cache_entries, "interval", hours=6, id="purge_ai_cache", replace_existing=True)
+    scheduler.add_job(purge_finished_jobs, "interval", hours=1, id="purge_ai_jobs", replace_existing=True)
+    scheduler.add_job(requeue_stale_jobs, "interval", minutes=5, id="requeue_ai_jobs", replace_existing=True)
+    scheduler.add_job(prune_assets, "interval", hours=1, id="prune_assets", replace_existing=True)
+    scheduler.add_job(prune_thumbnails, "interval", hours=1, id="prune_thumbnails", replace_existing=True)
+    await job_workers.start()
+    await extraction_pool.start()
 
 
 
 @app.on_event("shutdown")
-def _shutdown():
-    scheduler.shutdown(wait=False)
\ No newline at end of file
+async def _shutdown():
+    scheduler.shutdown(wait=False)
+    await job_workers.stop()
+    await extraction_pool.stop()
+    await close_groq_clients()
\ No newline at end of file
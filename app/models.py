@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Index, Integer, String, DateTime, ForeignKey, Boolean, Enum, UniqueConstraint
+from sqlalchemy import JSON, Column, Index, Integer, String, DateTime, ForeignKey, Boolean, Enum, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.database import Base
 import datetime
@@ -75,11 +75,20 @@ class AiAnalysis(Base):
     application_id = Column(Integer, ForeignKey("applications.id", ondelete="CASCADE"), nullable=False)
     resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), nullable=False)
     ats_score = Column(Integer, nullable=False, default=0,)
-    keyword_Match = Column(Boolean, nullable=False, default=False)
-    suggestions = Column(String(255), nullable=True)   
+    keyword_Match = Column(Boolean, nullable=False, default=False)  # True when no JD keyword is missing
+    keyword_match_score = Column(Integer, nullable=False, default=0)
+    missing_keywords = Column(JSON, nullable=True)
+    suggestions = Column(JSON, nullable=True)
+    input_fingerprint = Column(String(64), nullable=True)  # hash of resume file, JD and prompt version
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
     
     application = relationship("Application", back_populates="analyses")
     resume = relationship("Resume", back_populates="analyses") 
+
+    __table_args__ = (
+        UniqueConstraint("application_id", "resume_id", name="unique_analysis_application_resume"),
+    )
     
     
     
@@ -193,4 +202,37 @@ class FeatureUsage(Base):
     )
     
     user = relationship("User", back_populates="usages")
-    
\ No newline at end of file
+
+
+class AiResultCache(Base):
+    __tablename__ = "ai_result_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)  # sha256 hex of the inputs
+    namespace = Column(String(50), nullable=False)  # e.g., "analysis"
+    payload = Column(JSON, nullable=False)
+    hit_count = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class AiJob(Base):
+    __tablename__ = "ai_jobs"
+
+    id = Column(String(36), primary_key=True)  # uuid4, handed to the client for polling
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String(30), nullable=False)  # e.g., "analyze", "structure"
+    status = Column(String(20), nullable=False, default="queued")  # queued | running | succeeded | failed
+    payload = Column(JSON, nullable=False)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    attempts = Column(Integer, default=0, nullable=False)
+    locked_by = Column(String(100), nullable=True)  # worker that claimed the job
+    run_after = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_ai_jobs_status_run_after", "status", "run_after"),
+    )
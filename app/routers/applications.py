@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from app import models, database
 from app.schema.schemas import AddApplicationRequest, InterviewDateRequest, RecentApplicationResponse, StatsResponse, UpdateApplicationRequest
 from app.utils.time_ago import time_ago
+from app.utils.jd_index import jd_index
 from app.utils.interview import make_ics, parse_local_datetime, resolve_to_iana, schedule_reminders_for_application
 from app.utils.utils import check_feature_access, get_current_user, send_mail
 
@@ -50,6 +51,7 @@ def add_new_application(
     db.add(new_application)
     db.commit()
     db.refresh(new_application)
+    jd_index.upsert(new_application)
     return {
         "message": "Application added successfully",
         "application": new_application
@@ -152,6 +154,7 @@ def update_application(
 
     db.commit()
     db.refresh(application)
+    jd_index.upsert(application)
 
     next_action = None
     if new_status_norm == "interview":
@@ -181,6 +184,7 @@ def delete_application(
     
     db.delete(application)
     db.commit()
+    jd_index.remove(current_user.id, application_id)
     
     return {"message": "Application deleted successfully"}
 
@@ -1,11 +1,41 @@
-from typing import Dict
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form, Body
+import asyncio
+import json
+import os
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import msgpack
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, Form, Body, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session
 from app import database, models
-from app.api.groq_client import analyze_resume_with_groq, clean_resume_json, extract_resume_json_with_groq
+from app.api.groq_client import (
+    analysis_cache_key,
+    analysis_flight,
+    analyze_resume_with_groq_async,
+    clean_resume_json,
+    extract_resume_json_with_groq_async,
+    groq_dispatcher,
+    stream_analysis_with_groq,
+    stream_resume_json_with_groq,
+    structure_file_cache_key,
+    structure_flight,
+)
+from app.api.groq_dispatcher import PRIORITY_BATCH, GroqUnavailableError
+from app.api.job_queue import job_to_dict, job_workers, submit_job
+from app.api.result_cache import analysis_cache, structure_cache
 from app.core.logger import get_logger
-from app.utils.pdf_converter import pdf_to_editable_html, pdf_to_html_preview
-from app.utils.pdf_overlay_extractor import extract_pdf_structure
-from app.utils.pdf_utils import extract_resume_text
+from app.utils.pdf_converter import iter_editable_html, parse_page_range
+from app.utils.pdf_overlay_extractor import extract_pdf_structure, extract_pdf_structure_columnar
+from app.utils.asset_store import ASSET_CACHE_CONTROL, asset_store, asset_url, document_asset_ids
+from app.utils.analysis_store import analysis_fingerprint, analysis_to_dict, get_current_analyses, save_analysis
+from app.utils.jd_index import jd_index
+from app.utils.keyword_scorer import failed_analysis, score_keywords
+from app.utils.preview_renderer import preview_renderer
+from app.utils.prompt_compactor import compaction_stats
+from app.utils.extract_pool import extract_resume_text_async, extraction_pool
+from app.utils.pdf_document import PdfDocument, pdf_cache
+from app.utils.resume_files import fetch_resume_text
+from app.utils.resume_sectioner import SECTIONER_MIN_CONFIDENCE, section_resume_document
+from app.utils.upload_intake import MAX_FILE_SIZE_MB, Upload, read_upload
 from app.utils.utils import get_current_user
 
 
@@ -13,8 +43,26 @@ router = APIRouter(prefix="/ai", tags=["Feedback"])
 
 logger = get_logger(__name__)
 
-MAX_FILE_SIZE_MB = 2
-MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024 
+MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024
+
+# Max Groq calls in flight for one batch request
+BATCH_CONCURRENCY = int(os.getenv("AI_BATCH_CONCURRENCY", "4"))
+# Largest resume x application matrix one batch request may ask for
+BATCH_MAX_APPLICATIONS = int(os.getenv("AI_BATCH_MAX_APPLICATIONS", "50"))
+BATCH_MAX_PAIRS = int(os.getenv("AI_BATCH_MAX_PAIRS", "100"))
+JOB_EVENTS_POLL_SECONDS = 1.0
+# How long one /jobs/{id}/events stream may poll before it gives up; clients reconnect or poll /result
+JOB_EVENTS_MAX_SECONDS = float(os.getenv("AI_JOB_EVENTS_MAX_SECONDS", "300"))
+
+
+def _groq_unavailable(e: GroqUnavailableError) -> HTTPException:
+    """503 with Retry-After so clients back off instead of hammering a rate-limited provider."""
+    retry_after = max(1, int(e.retry_after or 0))
+    return HTTPException(
+        status_code=503,
+        detail="AI service is busy, please retry shortly.",
+        headers={"Retry-After": str(retry_after)},
+    )
 
 
 def get_db():
@@ -31,19 +79,8 @@ async def extract_resume(
     current_user: models.User = Depends(get_current_user),
 
     ):
-    file_bytes = await resume.read()
-
-    if not file_bytes:
-        logger.warning("Uploaded file is empty")
-        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
-    
-    if len(file_bytes) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Maximum allowed size is {MAX_FILE_SIZE_MB} MB."
-        )
-
-    extracted_text = extract_resume_text(file_bytes, resume.content_type, resume.filename)
+    upload = await read_upload(resume, MAX_FILE_SIZE)
+    extracted_text = await _upload_text(upload)
 
     if not extracted_text:
         logger.error(f"Failed to extract text from: {resume.filename}")
@@ -75,21 +112,10 @@ async def analyze_resume(
     """
     try:
         # ✅ Read file
-        file_bytes = await resume.read()
-        if not file_bytes:
-            logger.warning("Uploaded file is empty")
-            raise HTTPException(status_code=400, detail="Uploaded file is empty.")
-    
-        if len(file_bytes) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=400,
-                detail=f"File too large. Maximum allowed size is {MAX_FILE_SIZE_MB} MB."
-            )
+        upload = await read_upload(resume, MAX_FILE_SIZE)
 
         # ✅ Extract text
-        resume_text = extract_resume_text(
-            file_bytes, resume.content_type, resume.filename
-        )
+        resume_text = await _upload_text(upload)
         if not resume_text:
             raise HTTPException(status_code=400, detail="Could not extract text from resume")
         
@@ -105,8 +131,10 @@ async def analyze_resume(
 
         # ✅ Call Groq AI
         try:
-            insights = analyze_resume_with_groq(resume_text, job_description)
+            insights = await analyze_resume_with_groq_async(resume_text, job_description)
             
+        except GroqUnavailableError as e:
+            raise _groq_unavailable(e)
         except Exception as e:
             logger.exception("Groq AI analysis failed")
             raise HTTPException(status_code=500, detail="AI analysis failed")    
@@ -118,6 +146,8 @@ async def analyze_resume(
             # "resume_json": resume_json
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Resume analysis failed")
         raise HTTPException(status_code=500, detail=str(e))
@@ -125,10 +155,130 @@ async def analyze_resume(
 
 
     
+STRUCTURE_FORMATS = {"json": extract_pdf_structure, "columnar": extract_pdf_structure_columnar}
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
 @router.post("/extract-pdf-structure")
-async def extract_pdf(file: UploadFile = File(...)):
-    file_bytes = await file.read()
-    return extract_pdf_structure(file_bytes)    
+async def extract_pdf(
+    request: Request, file: UploadFile = File(...), output_format: str = Query("json", alias="format"),
+):
+    """
+    Positioned text for the overlay editor. format=columnar returns parallel arrays per
+    field (see extract_pdf_structure_columnar), a fraction of the size; either format is
+    sent as MessagePack when the client accepts application/msgpack, with the same
+    double-precision floats as the JSON.
+    """
+    if output_format not in STRUCTURE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {', '.join(STRUCTURE_FORMATS)}")
+    upload = await read_upload(file, MAX_FILE_SIZE, kinds=("pdf",))
+    if not await extraction_pool.load_pdf(upload.data, label=upload.filename, sha256=upload.sha256):
+        raise HTTPException(status_code=422, detail="Could not read PDF.")
+    structure = await asyncio.to_thread(STRUCTURE_FORMATS[output_format], upload.data)
+    accept = request.headers.get("accept", "")
+    if any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES):
+        return Response(msgpack.packb(structure), media_type="application/msgpack")
+    return structure
+
+
+@router.post("/resume/editable-html")
+async def editable_html(file: UploadFile = File(...)):
+    """
+    Editable HTML for the resume editor. Uses the same parsed model as analysis and
+    structuring, so opening the editor on a file that was just analyzed does not re-parse it.
+    """
+    upload = await read_upload(file, MAX_FILE_SIZE, kinds=("pdf",))
+    document = await extraction_pool.load_pdf(upload.data, label=upload.filename, sha256=upload.sha256)
+    if not document:
+        raise HTTPException(status_code=422, detail="Could not read PDF.")
+    image_urls = await _image_urls(document)
+    html = await asyncio.to_thread(lambda: "".join(iter_editable_html(document, image_urls=image_urls)))
+    return {"filename": file.filename, "html": html}
+
+
+@router.post("/resume/preview-html")
+async def preview_html(file: UploadFile = File(...)):
+    """
+    Read-only, layout-faithful preview (pdf2htmlEX, or PyMuPDF when it is unavailable).
+    """
+    upload = await read_upload(file, MAX_FILE_SIZE, kinds=("pdf",))
+    try:
+        preview = await preview_renderer.render(upload.data, label=upload.filename)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Preview rendering timed out.")
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Could not read PDF.")
+    return {"filename": file.filename, **preview}
+
+
+async def _image_urls(document: PdfDocument) -> Dict[int, str]:
+    """Images go to the asset store once per document; the HTML references them by URL."""
+    asset_ids = await asyncio.to_thread(document_asset_ids, document)
+    return {xref: asset_url(asset_id) for xref, asset_id in asset_ids.items()}
+
+
+async def _editable_html_response(document: PdfDocument, pages: Optional[str], wrap: bool = True) -> StreamingResponse:
+    """
+    Stream the editable HTML page by page. Starlette iterates the sync generator in a
+    worker thread, so each page is rendered off the event loop just before it is sent.
+    """
+    try:
+        start, end = parse_page_range(pages, len(document.pages))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    image_urls = await _image_urls(document)
+    return StreamingResponse(
+        iter_editable_html(document, start, end, wrap=wrap, image_urls=image_urls),
+        media_type="text/html; charset=utf-8",
+        headers={
+            "X-Document-Id": document.sha256,
+            "X-Page-Count": str(len(document.pages)),
+            "X-Page-Range": f"{start}-{end}",
+        },
+    )
+
+
+@router.post("/resume/editable-html/stream")
+async def editable_html_stream(file: UploadFile = File(...), pages: Optional[str] = Form(None)):
+    """
+    Streaming editable HTML, optionally for a page range ("2", "2-5", "3-").
+    The X-Document-Id header lets the editor fetch further ranges with
+    GET /ai/documents/{document_id}/html without uploading the file again.
+    """
+    upload = await read_upload(file, MAX_FILE_SIZE, kinds=("pdf",))
+    document = await extraction_pool.load_pdf(upload.data, label=upload.filename, sha256=upload.sha256)
+    if not document:
+        raise HTTPException(status_code=422, detail="Could not read PDF.")
+    return await _editable_html_response(document, pages)
+
+
+@router.get("/documents/{document_id}/html")
+async def document_html(document_id: str, pages: Optional[str] = None, wrap: bool = False):
+    """
+    A page range of an already uploaded PDF, for lazy loading in the editor.
+    Pages come without the pdf-document wrapper unless wrap=true.
+    404 once the parsed document has left the cache; the client then re-uploads.
+    """
+    document = pdf_cache.get(document_id)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found or expired. Upload it again.")
+    return await _editable_html_response(document, pages, wrap)
+
+
+@router.get("/assets/{asset_id}")
+async def get_asset(asset_id: str, request: Request):
+    """
+    An image or font extracted from a converted resume. Ids are content hashes, so the
+    bytes behind a URL never change and browsers may cache them forever.
+    """
+    path = asset_store.path(asset_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Asset not found")
+    etag = f'"{asset_id.split(".")[0]}"'
+    headers = {"Cache-Control": ASSET_CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=asset_store.media_type(asset_id), headers=headers)
 
 
 
@@ -142,7 +292,9 @@ async def reanalyze_resume(
 
         
     try:
-        insights = analyze_resume_with_groq(resume, job_description)
+        insights = await analyze_resume_with_groq_async(resume, job_description)
+    except GroqUnavailableError as e:
+        raise _groq_unavailable(e)
     except Exception as e:
         logger.exception("Groq AI re-analysis failed")
         raise HTTPException(status_code=500, detail="AI re-analysis failed")    
@@ -153,35 +305,486 @@ async def reanalyze_resume(
         "analysis": insights,
         
         }
+
+
+@router.post("/resume/keyword-score")
+async def keyword_score(
+    resume: str = Form(...),
+    job_description: str = Form(...),
+):
+    """
+    Instant, LLM-free preview: deterministic keyword_match_score and missing_keywords.
+    """
+    if not resume:
+        raise HTTPException(status_code=400, detail="Missing resume data")
+    return {"analysis": score_keywords(resume, job_description)}
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_response(events: AsyncIterator[Tuple[str, object]], meta: dict, on_done=None) -> StreamingResponse:
+    """
+    Wrap an AI event stream as Server-Sent Events.
+    Emits `meta` first, then one `field` event per completed value, then `done` (or `error`).
+    """
+    async def body():
+        yield _sse("meta", meta)
+        try:
+            async for event, data in events:
+                if event == "done" and on_done:
+                    data = on_done(data)
+                yield _sse(event, data)
+        except Exception as e:
+            logger.exception("AI stream failed")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _upload_text(upload: Upload) -> str:
+    return await extract_resume_text_async(upload.data, upload.content_type, upload.filename, upload.sha256)
+
+
+async def _read_resume_text(resume: UploadFile) -> str:
+    resume_text = await _upload_text(await read_upload(resume, MAX_FILE_SIZE))
+    if not resume_text:
+        raise HTTPException(status_code=400, detail="Could not extract text from resume")
+    return resume_text
+
+
+@router.post("/resume/analyze/stream")
+async def analyze_resume_stream(
+    resume: UploadFile,
+    job_description: str = Form(...),
+):
+    """
+    Streaming /resume/analyze. Responds with text/event-stream; fields such as
+    ats_score and each suggestions entry arrive as soon as the model finishes them.
+    """
+    resume_text = await _read_resume_text(resume)
+    return _sse_response(
+        stream_analysis_with_groq(resume_text, job_description),
+        meta={"filename": resume.filename, "extracted_text_preview": resume_text[:500]},
+    )
+
+
+@router.post("/resume/structure/stream")
+async def structure_resume_stream(resume: UploadFile):
+    """Streaming /resume/structure; each resume section is emitted as soon as it is complete."""
+    resume_text = await _read_resume_text(resume)
+    return _sse_response(
+        stream_resume_json_with_groq(resume_text),
+        meta={"filename": resume.filename},
+        on_done=clean_resume_json,
+    )
+
+
+def _check_batch_size(resumes: int, applications: int) -> None:
+    if applications > BATCH_MAX_APPLICATIONS or resumes * applications > BATCH_MAX_PAIRS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch too large: at most {BATCH_MAX_APPLICATIONS} applications and "
+                   f"{BATCH_MAX_PAIRS} resume x application pairs per request.",
+        )
+
+
+@router.post("/resume/analyze/batch")
+async def analyze_resume_batch(
+    resume: Optional[UploadFile] = File(None),
+    resume_ids: Optional[List[int]] = Form(None),
+    application_ids: Optional[List[int]] = Form(None),
+    all_with_jd: bool = Form(False),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Analyze one or more resumes against many saved applications in one call.
+    Resumes: an upload and/or stored resume ids. Applications: explicit ids,
+    or every application of the user that has a job description (all_with_jd).
+    Returns an N x M ats_score matrix (rows = resumes, columns = applications).
+    Results for stored resumes are saved to ai_analyses; pairs whose resume file
+    and JD are unchanged since the last run are answered from there without a Groq call.
+    At most BATCH_MAX_APPLICATIONS applications and BATCH_MAX_PAIRS cells per request (422).
+    """
+    if not resume and not resume_ids:
+        raise HTTPException(status_code=400, detail="Provide a resume upload or resume_ids.")
+    if not application_ids and not all_with_jd:
+        raise HTTPException(status_code=400, detail="Provide application_ids or set all_with_jd.")
+    resume_count = int(resume is not None) + len(set(resume_ids or []))
+    if application_ids and not all_with_jd:
+        _check_batch_size(resume_count, len(set(application_ids)))
+
+    query = db.query(models.Application).filter(
+        models.Application.user_id == current_user.id,
+        models.Application.job_description.isnot(None),
+        models.Application.job_description != "",
+    )
+    if not all_with_jd:
+        query = query.filter(models.Application.id.in_(application_ids))
+    applications = query.order_by(models.Application.id).all()
+    if not applications:
+        raise HTTPException(status_code=404, detail="No applications with a job description found.")
+    _check_batch_size(resume_count, len(applications))
+
+    # Each resume is read and extracted once, not once per JD
+    rows = []
+    if resume:
+        rows.append({"id": None, "name": resume.filename, "resume": None, "text": await _read_resume_text(resume)})
+    if resume_ids:
+        stored = db.query(models.Resume).filter(
+            models.Resume.id.in_(resume_ids),
+            models.Resume.user_id == current_user.id,
+        ).all()
+        if len(stored) != len(set(resume_ids)):
+            raise HTTPException(status_code=404, detail="Resume not found")
+        rows.extend({"id": r.id, "name": r.name, "resume": r, "text": None} for r in stored)
+
+    # Stored pairs whose inputs are unchanged are answered from ai_analyses
+    fingerprints = {
+        (app.id, row["id"]): analysis_fingerprint(row["resume"], app.job_description)
+        for row in rows if row["resume"] is not None for app in applications
+    }
+    current = get_current_analyses(db, fingerprints)
+
+    stale_rows = [
+        row for row in rows
+        if row["resume"] is not None and any((app.id, row["id"]) not in current for app in applications)
+    ]
+    texts = await asyncio.gather(*(fetch_resume_text(row["resume"]) for row in stale_rows))
+    for row, text in zip(stale_rows, texts):
+        if not text:
+            raise HTTPException(status_code=422, detail=f"Could not extract text from resume {row['id']}")
+        row["text"] = text
+
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(row: dict, app: models.Application) -> dict:
+        stored = current.get((app.id, row["id"]))
+        if stored is not None:
+            return analysis_to_dict(stored)
+        async with semaphore:
+            try:
+                insights = await analyze_resume_with_groq_async(
+                    row["text"], app.job_description, priority=PRIORITY_BATCH
+                )
+            except GroqUnavailableError as e:
+                # One unavailable cell must not sink the whole matrix
+                return failed_analysis(score_keywords(row["text"], app.job_description), str(e))
+        if row["id"] is not None:
+            save_analysis(db, app.id, row["id"], insights, fingerprints[(app.id, row["id"])])
+        return insights
+
+    results = await asyncio.gather(*(run(row, app) for row in rows for app in applications))
+    matrix = [results[i * len(applications):(i + 1) * len(applications)] for i in range(len(rows))]
+    db.commit()
+
+    return {
+        "resumes": [{"id": row["id"], "name": row["name"]} for row in rows],
+        "applications": [
+            {"id": app.id, "job_title": app.job_title, "company": app.company} for app in applications
+        ],
+        "scores": [[insights.get("ats_score", 0) for insights in row_results] for row_results in matrix],
+        "results": matrix,
+        "reused": len(current),
+    }
+
+
+@router.post("/applications/{application_id}/analyze")
+async def analyze_saved_resume(
+    application_id: int,
+    resume_id: int = Form(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Analyze a stored resume against a saved application and persist the result.
+    The stored analysis is returned as-is while the resume file and JD are unchanged.
+    """
+    application = db.query(models.Application).filter(
+        models.Application.id == application_id,
+        models.Application.user_id == current_user.id,
+    ).first()
+    if not application:
+        raise HTTPException(status_code=404, detail="Application not found")
+    if not application.job_description:
+        raise HTTPException(status_code=400, detail="Application has no job description.")
+
+    resume = db.query(models.Resume).filter(
+        models.Resume.id == resume_id,
+        models.Resume.user_id == current_user.id,
+    ).first()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+
+    fingerprint = analysis_fingerprint(resume, application.job_description)
+    stored = get_current_analyses(db, {(application.id, resume.id): fingerprint})
+    if stored:
+        return {"analysis": analysis_to_dict(stored[(application.id, resume.id)]), "cached": True}
+
+    resume_text = await fetch_resume_text(resume)
+    if not resume_text:
+        raise HTTPException(status_code=422, detail="Could not extract text from resume")
+
+    try:
+        insights = await analyze_resume_with_groq_async(resume_text, application.job_description)
+    except GroqUnavailableError as e:
+        raise _groq_unavailable(e)
+
+    save_analysis(db, application.id, resume.id, insights, fingerprint)
+    db.commit()
+    return {"analysis": insights, "cached": False}
+
+
+@router.post("/applications/rank")
+async def rank_applications(
+    resume: Optional[UploadFile] = File(None),
+    resume_text: Optional[str] = Form(None),
+    resume_id: Optional[int] = Form(None),
+    limit: int = Form(50),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Rank all of the user's saved applications by BM25 similarity between their
+    job descriptions and one resume (uploaded file, plain text or a stored resume_id).
+    LLM-free; applications without a job description are left out.
+    """
+    if resume is not None:
+        text = await _read_resume_text(resume)
+    elif resume_text:
+        text = resume_text
+    elif resume_id is not None:
+        stored = db.query(models.Resume).filter(
+            models.Resume.id == resume_id,
+            models.Resume.user_id == current_user.id,
+        ).first()
+        if not stored:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        text = await fetch_resume_text(stored)
+        if not text:
+            raise HTTPException(status_code=422, detail="Could not extract text from resume")
+    else:
+        raise HTTPException(status_code=400, detail="Provide resume, resume_text or resume_id.")
+
+    ranked = await asyncio.to_thread(jd_index.rank, db, current_user.id, text, max(1, min(limit, 500)))
+    apps = {
+        a.id: a for a in db.query(
+            models.Application.id, models.Application.job_title, models.Application.company, models.Application.status
+        ).filter(models.Application.id.in_([r["application_id"] for r in ranked])).all()
+    }
+    for r in ranked:
+        a = apps.get(r["application_id"])
+        if a:
+            r.update(job_title=a.job_title, company=a.company, status=a.status)
+    return {"results": ranked, "count": len(ranked)}
+
+
+@router.post("/jobs/resume/analyze", status_code=202)
+async def submit_analyze_job(
+    resume: UploadFile,
+    job_description: str = Form(...),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Queue /resume/analyze as a background job and return its id immediately.
+    Poll GET /ai/jobs/{job_id} or subscribe to /ai/jobs/{job_id}/events.
+    """
+    resume_text = await _read_resume_text(resume)
+    cached = await asyncio.to_thread(analysis_cache.get, analysis_cache_key(resume_text, job_description))
+    job = submit_job(
+        db, current_user.id, "analyze",
+        {"resume_text": resume_text, "job_description": job_description, "filename": resume.filename},
+        result=cached,
+    )
+    return job_to_dict(job)
+
+
+@router.post("/jobs/resume/structure", status_code=202)
+async def submit_structure_job(
+    resume: UploadFile,
+    refresh: bool = Form(False),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Queue /resume/structure as a background job; cache and sectioner hits complete immediately."""
+    upload = await read_upload(resume, MAX_FILE_SIZE)
+
+    cache_key, resume_json = await _structure_without_llm(upload, refresh)
+    payload = {"filename": resume.filename, "cache_key": cache_key}
+    if resume_json is None:
+        resume_text = await _upload_text(upload)
+        if not resume_text:
+            raise HTTPException(status_code=400, detail="Could not extract text from resume")
+        payload["resume_text"] = resume_text
+    return job_to_dict(submit_job(db, current_user.id, "structure", payload, result=resume_json))
+
+
+def _get_job_or_404(db: Session, job_id: str, user_id: int) -> models.AiJob:
+    job = db.query(models.AiJob).filter(
+        models.AiJob.id == job_id,
+        models.AiJob.user_id == user_id,
+    ).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_job_status(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Job status; includes the result once the job has succeeded."""
+    return job_to_dict(_get_job_or_404(db, job_id, current_user.id))
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(
+    job_id: str,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    The job result: 200 with the result when done, 202 while queued or running.
+    A failed job is a finished job, not a server error: 200 with status "failed" and the error.
+    """
+    job = _get_job_or_404(db, job_id, current_user.id)
+    if job.status == "failed":
+        return {"job_id": job.id, "status": "failed", "error": job.error or "AI job failed"}
+    if job.status != "succeeded":
+        response.status_code = 202
+        return job_to_dict(job, include_result=False)
+    return {"job_id": job.id, "result": job.result}
+
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """
+    Server-Sent Events: `status` on every state change, then `done` (with the result) or `error`.
+    The stream ends with `timeout` after JOB_EVENTS_MAX_SECONDS if the job is still unfinished.
+    """
+    user_id = _get_job_or_404(db, job_id, current_user.id).user_id
+
+    def load() -> dict:
+        session = database.SessionLocal()
+        try:
+            return job_to_dict(_get_job_or_404(session, job_id, user_id))
+        finally:
+            session.close()
+
+    async def events():
+        last = None
+        polls = max(1, int(JOB_EVENTS_MAX_SECONDS / JOB_EVENTS_POLL_SECONDS))
+        for _ in range(polls):
+            job = await asyncio.to_thread(load)
+            if job["status"] != last:
+                last = job["status"]
+                yield "status", {"job_id": job_id, "status": last, "attempts": job["attempts"]}
+            if last == "succeeded":
+                yield "done", job["result"]
+                return
+            if last == "failed":
+                yield "error", {"detail": job["error"]}
+                return
+            await asyncio.sleep(JOB_EVENTS_POLL_SECONDS)
+        yield "timeout", {"job_id": job_id, "status": last}
+
+    return _sse_response(events(), meta={"job_id": job_id})
+
+
+@router.get("/cache/stats")
+async def cache_stats(current_user: models.User = Depends(get_current_user)):
+    """Hit/miss counters for the AI result cache, in-flight call coalescing, the Groq dispatcher and job workers."""
+    return {
+        "analysis": analysis_cache.stats(),
+        "structure": structure_cache.stats(),
+        "coalescing": [analysis_flight.stats(), structure_flight.stats()],
+        "compaction": compaction_stats.snapshot(),
+        "dispatcher": groq_dispatcher.stats(),
+        "jobs": job_workers.stats(),
+        "jd_index": jd_index.stats(),
+        "extraction": extraction_pool.stats(),
+        "pdf_documents": pdf_cache.stats(),
+        "previews": preview_renderer.stats(),
+    }
     
     
     
+async def _structure_without_llm(upload: Upload, refresh: bool = False) -> Tuple[str, Optional[dict]]:
+    """
+    The LLM-free ways to structure an upload: the file-hash cache, then the local
+    sectioner for PDFs. Returns (cache_key, cleaned resume_json or None).
+    """
+    cache_key = structure_file_cache_key(upload.data, upload.sha256)
+    if refresh:
+        await asyncio.to_thread(structure_cache.invalidate, cache_key)
+    else:
+        cached = await asyncio.to_thread(structure_cache.get, cache_key)
+        if cached is not None:
+            return cache_key, cached
+
+    # Local sectioner (PDF only), good enough for most single-column resumes
+    if upload.kind == "pdf":
+        # Parsed in the extraction pool only; a PDF that hangs or crashes a worker is never parsed here
+        document = await extraction_pool.load_pdf(upload.data, label=upload.filename, sha256=upload.sha256)
+        if document is None:
+            return cache_key, None
+        local = await asyncio.to_thread(section_resume_document, document)
+        if local and local.confidence >= SECTIONER_MIN_CONFIDENCE:
+            resume_json = clean_resume_json(local.resume_json)
+            await asyncio.to_thread(structure_cache.set, cache_key, resume_json)
+            return cache_key, resume_json
+        if local:
+            logger.info(f"Sectioner confidence {local.confidence} below threshold, using Groq")
+    return cache_key, None
+
+
 @router.post("/resume/structure")
 async def structure_resume(
     resume: UploadFile,
+    refresh: bool = Form(False),
     # current_user: models.User = Depends(get_current_user),
 ):
     """
     Convert a resume into structured JSON (ResumeData).
     Only called when user wants to edit.
+    Results are cached by file hash, so reopening the same file is instant;
+    refresh=true drops the cached result and re-extracts.
+    PDFs go through the local layout-based sectioner first; Groq is only called
+    when its confidence is below SECTIONER_MIN_CONFIDENCE.
     """
     try:
-        file_bytes = await resume.read()
-        if not file_bytes:
-            raise HTTPException(status_code=400, detail="Uploaded file is empty.")
-        if len(file_bytes) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="File too large.")
-
-        # Step 1: Extract raw text
-        resume_text = extract_resume_text(file_bytes, resume.content_type, resume.filename)
-        if not resume_text:
-            raise HTTPException(status_code=400, detail="Could not extract text from resume")
+        upload = await read_upload(resume, MAX_FILE_SIZE)
+
+        # Step 1: Cache by file hash, then the local sectioner
+        cache_key, resume_json = await _structure_without_llm(upload, refresh)
+
+        if resume_json is None:
+            # Step 2: Extract raw text
+            resume_text = await _upload_text(upload)
+            if not resume_text:
+                raise HTTPException(status_code=400, detail="Could not extract text from resume")
 
-        # Step 2: Call Groq extractor
-        resume_json = extract_resume_json_with_groq(resume_text)
+            # Step 3: Call Groq extractor
+            resume_json = await extract_resume_json_with_groq_async(resume_text)
 
-        # Step 3: Normalize dates (YYYY-MM format)
-        resume_json = clean_resume_json(resume_json)
+            # Step 4: Normalize dates (YYYY-MM format)
+            resume_json = clean_resume_json(resume_json)
+            if resume_json.get("sections"):
+                await asyncio.to_thread(structure_cache.set, cache_key, resume_json)
 
         return {
             "filename": resume.filename,
@@ -190,6 +793,10 @@ async def structure_resume(
         
    
 
+    except GroqUnavailableError as e:
+        raise _groq_unavailable(e)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("Resume structuring failed")
         raise HTTPException(status_code=500, detail=str(e))
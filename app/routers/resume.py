@@ -1,15 +1,26 @@
+import asyncio
 import os
 from app import database
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Body, Request, Response
 from sqlalchemy.orm import Session
 from app import models, database
 from app.schema.schemas import AddResumeRequest
 from app.utils.utils import get_current_user
 import cloudinary.uploader
 from typing import Dict
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse
 import io
 import requests
+from app.utils.asset_store import ASSET_CACHE_CONTROL
+from app.utils.thumbnails import (
+    THUMBNAIL_MAX_PAGES,
+    THUMBNAIL_SIZES,
+    ThumbnailError,
+    page_thumbnails,
+    resume_thumbnails,
+    thumbnail_path,
+    valid_thumbnail_id,
+)
 
 
 router = APIRouter(prefix="/resume", tags=["Resume"])
@@ -97,12 +108,74 @@ def delete_resume(
     return {"message": "Resume deleted successfully"}
 
 
+def _resume_dict(resume: models.Resume) -> dict:
+    data = {column.name: getattr(resume, column.name) for column in models.Resume.__table__.columns}
+    # Page-1 previews in every size; rendered and cached server-side on first request
+    data["thumbnails"] = resume_thumbnails(resume) if resume.file_url.lower().split("?")[0].endswith(".pdf") else None
+    return data
+
+
 @router.get("/my-resumes")
 def list_resumes(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     resumes = db.query(models.Resume).filter(models.Resume.user_id == current_user.id).all()
     if not resumes:
         return {"message": "You have no resume."}
-    return {"resumes": resumes}
+    return {"resumes": [_resume_dict(r) for r in resumes]}
+
+
+@router.get("/my-resumes/{resume_id}/thumbnails")
+async def list_resume_thumbnails(
+    resume_id: int,
+    size: str = "md",
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user),
+):
+    """Thumbnail URLs for every page of a stored PDF resume (up to THUMBNAIL_MAX_PAGES)."""
+    if size not in THUMBNAIL_SIZES:
+        raise HTTPException(status_code=400, detail=f"size must be one of {', '.join(THUMBNAIL_SIZES)}")
+    resume = db.query(models.Resume).filter(
+        models.Resume.id == resume_id,
+        models.Resume.user_id == current_user.id
+    ).first()
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    try:
+        pages = await page_thumbnails(resume, size)
+    except ThumbnailError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Thumbnail rendering timed out.")
+    return {"resume_id": resume.id, "size": size, "pages": pages}
+
+
+@router.get("/thumbnails/{resume_id}/{page}/{size}/{thumb_id}")
+async def get_thumbnail(
+    resume_id: int,
+    page: int,
+    size: str,
+    thumb_id: str,
+    request: Request,
+    db: Session = Depends(get_db),
+):
+    """
+    A WebP page thumbnail. No auth header (it is used in <img> tags): the id in the
+    URL is derived from the resume's file URL and only handed out to its owner.
+    Ids change whenever the file does, so responses are immutable.
+    """
+    resume = db.get(models.Resume, resume_id)
+    if not resume or not 1 <= page <= THUMBNAIL_MAX_PAGES or not valid_thumbnail_id(resume, page, size, thumb_id):
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    etag = f'"{thumb_id.split(".")[0]}"'
+    headers = {"Cache-Control": ASSET_CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    try:
+        path = await thumbnail_path(resume, page, size)
+    except ThumbnailError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Thumbnail rendering timed out.")
+    return FileResponse(path, media_type="image/webp", headers=headers)
 
 @router.get("/my-resumes/{resume_id}")
 def get_resume(resume_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
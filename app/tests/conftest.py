@@ -0,0 +1,4 @@
+import os
+
+# app.database builds its engine at import time; point it at a throwaway SQLite file for tests
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
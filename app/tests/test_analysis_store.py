@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.database import Base
+from app.routers import feedback
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(models.User(id=1, username="jane", email="jane@example.com", password_hash="x"))
+    session.add(models.Application(id=1, user_id=1, job_title="Backend", company="Acme", job_description="Python, SQL"))
+    session.add(models.Resume(id=1, user_id=1, name="cv", file_url="https://cdn.test/v1/cv.pdf", public_id="cv"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def groq_calls(monkeypatch):
+    calls = []
+
+    async def analyze(resume_text, job_description, **kwargs):
+        calls.append((resume_text, job_description))
+        return {"ats_score": 70, "keyword_match_score": 60, "missing_keywords": ["sql"], "suggestions": []}
+
+    async def fetch(resume):
+        return f"text of {resume.file_url}"
+
+    monkeypatch.setattr(feedback, "analyze_resume_with_groq_async", analyze)
+    monkeypatch.setattr(feedback, "fetch_resume_text", fetch)
+    return calls
+
+
+def _analyze(db):
+    user = db.get(models.User, 1)
+    return asyncio.run(feedback.analyze_saved_resume(application_id=1, resume_id=1, db=db, current_user=user))
+
+
+def test_unchanged_inputs_reuse_the_stored_analysis(db, groq_calls):
+    assert _analyze(db)["cached"] is False
+    again = _analyze(db)
+    assert again["cached"] is True and again["analysis"]["ats_score"] == 70
+    assert len(groq_calls) == 1
+
+    db.get(models.Application, 1).job_description = "Go, Kubernetes"
+    db.commit()
+    assert _analyze(db)["cached"] is False
+    assert groq_calls[-1][1] == "Go, Kubernetes"
+
+    db.get(models.Resume, 1).file_url = "https://cdn.test/v2/cv.pdf"
+    db.commit()
+    assert _analyze(db)["cached"] is False
+    assert len(groq_calls) == 3 and groq_calls[-1][0] == "text of https://cdn.test/v2/cv.pdf"
+
+
+def test_batch_only_calls_groq_for_changed_pairs(db, groq_calls):
+    user = db.get(models.User, 1)
+
+    def batch():
+        return asyncio.run(feedback.analyze_resume_batch(
+            resume=None, resume_ids=[1], application_ids=[1], all_with_jd=False, db=db, current_user=user,
+        ))
+
+    assert batch()["reused"] == 0
+    assert batch()["reused"] == 1
+    assert len(groq_calls) == 1
+
+    db.get(models.Resume, 1).file_url = "https://cdn.test/v2/cv.pdf"
+    db.commit()
+    assert batch()["reused"] == 0
+    assert len(groq_calls) == 2
+
+
+def test_oversized_batches_are_rejected(db, groq_calls, monkeypatch):
+    monkeypatch.setattr(feedback, "BATCH_MAX_APPLICATIONS", 1)
+    user = db.get(models.User, 1)
+    db.add(models.Application(id=2, user_id=1, job_title="Data", company="Acme", job_description="Spark"))
+    db.commit()
+
+    for kwargs in ({"application_ids": [1, 2], "all_with_jd": False}, {"application_ids": None, "all_with_jd": True}):
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(feedback.analyze_resume_batch(resume=None, resume_ids=[1], db=db, current_user=user, **kwargs))
+        assert exc.value.status_code == 422
+    assert groq_calls == []
@@ -0,0 +1,51 @@
+import fitz
+
+from app.utils import asset_store as assets
+from app.utils.pdf_converter import iter_editable_html
+from app.utils.pdf_document import parse_pdf
+
+
+def _pdf_with_logo() -> bytes:
+    pix = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 8, 8), False)
+    pix.clear_with(200)
+    logo = pix.tobytes("png")
+    doc = fitz.open()
+    for n in (1, 2):
+        page = doc.new_page()
+        page.insert_image(fitz.Rect(72, 20, 120, 68), stream=logo)
+        page.insert_text((72, 100), f"Page {n}")
+    return doc.tobytes()
+
+
+def test_put_is_content_addressed(tmp_path):
+    store = assets.AssetStore(str(tmp_path), max_bytes=16)
+    a = store.put(b"logo bytes", "PNG")
+    assert store.put(b"logo bytes", "png") == a and a.endswith(".png")
+    assert store.path(a) and store.path("../" + a) is None and store.path("f1.woff") is None
+    store.put(b"another asset", "woff")
+    assert store.prune() == 1
+    assert store.media_type("0" * 64 + ".woff") == "font/woff"
+
+
+def test_html_references_images_once_by_url(tmp_path, monkeypatch):
+    monkeypatch.setattr(assets, "asset_store", assets.AssetStore(str(tmp_path)))
+    document = parse_pdf(_pdf_with_logo())
+    ids = assets.document_asset_ids(document)
+    assert len(set(ids.values())) == 1
+
+    urls = {xref: assets.asset_url(i) for xref, i in ids.items()}
+    html = "".join(iter_editable_html(document, image_urls=urls))
+    assert "data:image" not in html
+    assert html.count(assets.asset_url(next(iter(ids.values())))) == 2
+    assert len("".join(iter_editable_html(document))) > len(html)
+
+
+def test_remembered_ids_are_restored_after_prune(tmp_path, monkeypatch):
+    store = assets.AssetStore(str(tmp_path), max_bytes=0)
+    monkeypatch.setattr(assets, "asset_store", store)
+    document = parse_pdf(_pdf_with_logo())
+    asset_id = next(iter(assets.document_asset_ids(document).values()))
+
+    assert store.prune() == 1 and store.path(asset_id) is None
+    assert next(iter(assets.document_asset_ids(document).values())) == asset_id
+    assert store.path(asset_id) is not None
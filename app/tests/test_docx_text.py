@@ -0,0 +1,27 @@
+from io import BytesIO
+
+import docx
+
+from app.utils.pdf_utils import extract_text_from_docx
+
+
+def _docx() -> bytes:
+    d = docx.Document()
+    d.add_paragraph("Jane Doe")
+    table = d.add_table(rows=2, cols=3)
+    table.cell(0, 0).merge(table.cell(0, 1)).text = "Skills"
+    table.cell(0, 2).text = "Python"
+    table.cell(0, 2).merge(table.cell(1, 2))
+    table.cell(1, 0).text = "Languages"
+    d.add_paragraph("Experience\tAcme")
+    buf = BytesIO()
+    d.save(buf)
+    return buf.getvalue()
+
+
+def test_document_order_and_merged_cells_read_once():
+    assert extract_text_from_docx(_docx()) == "Jane Doe\nSkills\nPython\nLanguages\nExperience\tAcme"
+
+
+def test_unreadable_files_return_none():
+    assert extract_text_from_docx(b"not a zip") is None
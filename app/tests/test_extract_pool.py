@@ -0,0 +1,127 @@
+import asyncio
+import os
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import fitz
+import pytest
+
+from app.utils.extract_pool import ExtractionPool
+
+
+def _hang():
+    time.sleep(60)
+
+
+def _crash():
+    os._exit(1)
+
+
+def _sleep(seconds: float) -> float:
+    time.sleep(seconds)
+    return seconds
+
+
+def _pdf(text: str) -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+def test_hung_and_crashing_tasks_are_isolated():
+    async def scenario():
+        pool = ExtractionPool(workers=2, timeout=2)
+        try:
+            assert "hello resume" in await pool.extract(_pdf("hello resume"), "application/pdf", "a.pdf")
+            with pytest.raises(asyncio.TimeoutError):
+                await pool.run(_hang)
+            with pytest.raises(BrokenProcessPool):
+                await pool.run(_crash)
+            # The pool was rebuilt and keeps serving
+            texts = await asyncio.gather(*(
+                pool.extract(_pdf(f"resume {i}"), "application/pdf", f"{i}.pdf") for i in range(6)
+            ))
+            assert all(f"resume {i}" in t for i, t in enumerate(texts))
+            assert pool.stats()["restarts"] >= 2
+        finally:
+            await pool.stop()
+
+    asyncio.run(scenario())
+
+
+def test_scanned_pages_are_ocrd_once(monkeypatch):
+    from app.utils import extract_pool, pdf_ocr
+
+    calls = []
+    monkeypatch.setattr(extract_pool, "ocr_available", lambda: True)
+    monkeypatch.setattr(pdf_ocr.pytesseract, "image_to_string", lambda image, **kw: calls.append(image.mode) or "Scanned Jane")
+    pdf_ocr.ocr_cache.clear()
+
+    pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 850, 1100), False)
+    pix.clear_with(255)
+    doc = fitz.open()
+    doc.new_page().insert_image(fitz.Rect(0, 0, 612, 792), stream=pix.tobytes("png"))
+    doc.new_page().insert_text((72, 72), "Typed second page with a real text layer")
+    data = doc.tobytes()
+
+    async def scenario():
+        pool = ExtractionPool(workers=0)
+        first = await pool.extract(data, "application/pdf", "scan.pdf")
+        again = await pool.extract(data, "application/pdf", "scan.pdf")
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert first == again == "Scanned Jane\n\fTyped second page with a real text layer"
+    assert calls == ["L"]
+
+
+def test_ocr_past_the_budget_is_stopped_and_skipped(monkeypatch):
+    from app.utils import extract_pool, pdf_ocr
+
+    def slow_tesseract(image, timeout=0, **kw):
+        assert 0 < timeout <= 0.5
+        time.sleep(timeout)
+        raise RuntimeError("Tesseract process timeout")
+
+    monkeypatch.setattr(extract_pool, "ocr_available", lambda: True)
+    monkeypatch.setattr(extract_pool, "OCR_BUDGET_SECONDS", 0.5)
+    monkeypatch.setattr(pdf_ocr.pytesseract, "image_to_string", slow_tesseract)
+    pdf_ocr.ocr_cache.clear()
+
+    pix = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 85, 110), False)
+    pix.clear_with(255)
+    doc = fitz.open()
+    doc.new_page().insert_image(fitz.Rect(0, 0, 612, 792), stream=pix.tobytes("png"))
+    doc.new_page().insert_text((72, 72), "Typed second page with a real text layer")
+    data = doc.tobytes()
+
+    pool = ExtractionPool(workers=0)
+    started = time.monotonic()
+    text = asyncio.run(pool.extract(data, "application/pdf", "scan.pdf"))
+    assert text == "Typed second page with a real text layer"
+    assert time.monotonic() - started < 2 and pool.stats()["in_flight"] == 0
+
+
+def test_missed_deadline_keeps_the_pool_and_the_slot():
+    async def scenario():
+        pool = ExtractionPool(workers=2, timeout=5)
+        try:
+            await pool.start()
+            loop = asyncio.get_running_loop()
+            late = asyncio.ensure_future(pool.run(_sleep, 1.5, deadline=loop.time() + 0.3))
+            other = asyncio.ensure_future(pool.run(_sleep, 0.8))
+            with pytest.raises(asyncio.TimeoutError):
+                await late
+            assert await other == 0.8  # not killed by a pool restart
+            assert pool.stats()["restarts"] == 0 and pool.stats()["in_flight"] == 1
+            await asyncio.sleep(1.5)
+            assert pool.stats()["in_flight"] == 0
+        finally:
+            await pool.stop()
+
+    asyncio.run(scenario())
+
+
+def test_ocr_leaves_a_worker_for_text_extraction():
+    assert ExtractionPool(workers=4, ocr_workers=4).ocr_workers == 3
+    assert ExtractionPool(workers=1).ocr_workers == 1
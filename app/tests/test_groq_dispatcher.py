@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.api import groq_dispatcher
+from app.api.groq_dispatcher import CircuitBreaker, GroqDispatcher, GroqUnavailableError, TokenBucket
+
+URL = "https://groq.test/chat/completions"
+OK = {"choices": [{"message": {"content": "{}"}}]}
+
+
+def _dispatcher(handler) -> GroqDispatcher:
+    async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    sync_client = httpx.Client(transport=httpx.MockTransport(handler))
+    return GroqDispatcher(lambda: async_client, lambda: sync_client, URL)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(groq_dispatcher, "GROQ_BACKOFF_BASE", 0.0)
+
+
+def test_token_bucket_reserves_ahead():
+    bucket = TokenBucket(per_minute=60)  # one per second, burst of 60
+    assert bucket.reserve(60) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_breaker_opens_then_allows_one_trial():
+    breaker = CircuitBreaker(threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    breaker.check()
+    breaker.record_failure()
+    with pytest.raises(GroqUnavailableError):
+        breaker.check()
+
+    asyncio.run(asyncio.sleep(0.06))
+    breaker.check()  # half-open trial
+    with pytest.raises(GroqUnavailableError):
+        breaker.check()  # only one trial at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_retries_429_honoring_retry_after():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            return httpx.Response(429, headers={"retry-after": "0"})
+        return httpx.Response(200, json=OK)
+
+    dispatcher = _dispatcher(handler)
+    assert asyncio.run(dispatcher.post({}, timeout=httpx.Timeout(1))) == OK
+    assert len(calls) == 2
+    assert dispatcher.stats()["rate_limited"] == 1
+    assert dispatcher.breaker.state == "closed"
+
+
+def test_gives_up_after_max_retries():
+    dispatcher = _dispatcher(lambda request: httpx.Response(503))
+    with pytest.raises(GroqUnavailableError):
+        dispatcher.post_sync({}, timeout=httpx.Timeout(1))
+    assert dispatcher.stats()["sent"] == groq_dispatcher.GROQ_MAX_RETRIES + 1
@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.database import Base
+from app.utils.jd_index import JobDescriptionIndex
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(models.User(id=1, username="a", email="a@example.com", password_hash="x"))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _add(db, title, jd):
+    app = models.Application(user_id=1, job_title=title, company="Acme", job_description=jd)
+    db.add(app)
+    db.commit()
+    return app
+
+
+def test_ranks_by_lexical_similarity(db):
+    backend = _add(db, "Backend", "Python FastAPI PostgreSQL Docker backend services")
+    frontend = _add(db, "Frontend", "React TypeScript CSS design systems")
+    _add(db, "No JD", "")
+    index = JobDescriptionIndex()
+
+    ranked = index.rank(db, 1, "Built FastAPI services in Python on PostgreSQL")
+    assert [r["application_id"] for r in ranked] == [backend.id, frontend.id]
+    assert ranked[0]["similarity"] == 100 and ranked[1]["score"] == 0
+    assert "fastapi" in ranked[0]["matched_terms"]
+
+
+def test_index_follows_updates_and_deletes(db):
+    backend = _add(db, "Backend", "Python FastAPI backend")
+    frontend = _add(db, "Frontend", "React TypeScript")
+    index = JobDescriptionIndex()
+    assert index.rank(db, 1, "React")[0]["application_id"] == frontend.id
+
+    # Changes made behind the index's back are reconciled on the next query
+    frontend.job_description = "Java Spring"
+    db.commit()
+    db.delete(backend)
+    db.commit()
+    ranked = index.rank(db, 1, "React Java")
+    assert [r["application_id"] for r in ranked] == [frontend.id]
+    assert ranked[0]["matched_terms"] == ["java"]
@@ -0,0 +1,120 @@
+import asyncio
+import datetime
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.api import job_queue
+from app.database import Base
+from app.routers import feedback
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(job_queue.database, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def test_job_is_claimed_once(session_factory):
+    db = session_factory()
+    job = job_queue.submit_job(db, 1, "analyze", {"resume_text": "r", "job_description": "jd"})
+
+    claimed = job_queue._claim_next("worker-a")
+    assert claimed[0] == job.id and claimed[3] == 1
+    assert job_queue._claim_next("worker-b") is None
+
+    # Only the worker holding the job may record its outcome
+    job_queue._finish(job.id, "worker-b", status=job_queue.FAILED)
+    job_queue._finish(job.id, "worker-a", status=job_queue.SUCCEEDED, result={"ats_score": 1})
+    db.expire_all()
+    assert db.get(models.AiJob, job.id).status == job_queue.SUCCEEDED
+
+
+def test_stale_running_job_is_requeued(session_factory):
+    db = session_factory()
+    job = job_queue.submit_job(db, 1, "structure", {"resume_text": "r"})
+    job_queue._claim_next("crashed-worker")
+
+    db.query(models.AiJob).update({models.AiJob.started_at: datetime.datetime(2000, 1, 1)})
+    db.commit()
+    assert job_queue.requeue_stale_jobs() == 1
+    assert job_queue._claim_next("worker-b")[0] == job.id
+
+
+def test_cached_result_completes_immediately(session_factory):
+    db = session_factory()
+    job = job_queue.submit_job(db, 1, "analyze", {}, result={"ats_score": 80})
+    assert job_queue.job_to_dict(job)["result"] == {"ats_score": 80}
+    assert job_queue._claim_next("worker-a") is None
+
+
+def _run_once(db, monkeypatch, handler):
+    monkeypatch.setitem(job_queue.JOB_HANDLERS, "analyze", handler)
+    job = job_queue.submit_job(db, 1, "analyze", {"resume_text": "r", "job_description": "jd"})
+    pool = job_queue.JobWorkerPool(concurrency=1)
+    asyncio.run(pool._run("worker-a", *job_queue._claim_next("worker-a")))
+    db.expire_all()
+    return db.get(models.AiJob, job.id)
+
+
+def test_finished_job_drops_resume_text(session_factory, monkeypatch):
+    async def analyze(payload):
+        return {"ats_score": 80}
+
+    job = _run_once(session_factory(), monkeypatch, analyze)
+    assert job.status == job_queue.SUCCEEDED
+    assert job.payload == {"job_description": "jd"}
+
+
+def test_failed_analysis_marks_job_failed(session_factory, monkeypatch):
+    async def analyze(payload):
+        return {"ats_score": 40, "suggestions": ["AI analysis unavailable"], "failed": True}
+
+    job = _run_once(session_factory(), monkeypatch, analyze)
+    assert job.status == job_queue.FAILED and job.error == "AI analysis unavailable"
+    assert "resume_text" not in job.payload
+
+
+def test_jobs_are_only_visible_to_their_owner(session_factory):
+    db = session_factory()
+    job = job_queue.submit_job(db, 1, "analyze", {}, result={"ats_score": 80})
+    assert feedback._get_job_or_404(db, job.id, 1).id == job.id
+    with pytest.raises(HTTPException) as exc:
+        feedback._get_job_or_404(db, job.id, 2)
+    assert exc.value.status_code == 404
+
+
+def test_failed_job_result_is_not_a_server_error(session_factory):
+    db = session_factory()
+    job = job_queue.submit_job(db, 1, "analyze", {})
+    job_queue._claim_next("worker-a")
+    job_queue._finish(job.id, "worker-a", status=job_queue.FAILED, error="AI analysis unavailable")
+    db.expire_all()
+    user = models.User(id=1, username="jane", email="jane@example.com", password_hash="x")
+
+    result = asyncio.run(feedback.get_job_result(job.id, response=Response(), db=db, current_user=user))
+    assert result == {"job_id": job.id, "status": "failed", "error": "AI analysis unavailable"}
+
+
+def test_event_stream_gives_up_on_an_unfinished_job(session_factory, monkeypatch):
+    monkeypatch.setattr(feedback, "JOB_EVENTS_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(feedback, "JOB_EVENTS_MAX_SECONDS", 0.03)
+    db = session_factory()
+    job = job_queue.submit_job(db, 1, "analyze", {})
+    user = models.User(id=1, username="jane", email="jane@example.com", password_hash="x")
+
+    async def read():
+        response = await feedback.job_events(job.id, db=db, current_user=user)
+        return [chunk async for chunk in response.body_iterator]
+
+    chunks = asyncio.run(read())
+    assert sum("event: status" in c for c in chunks) == 1
+    assert "event: timeout" in chunks[-1]
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from app.utils.json_stream import IncrementalJSONParser
+
+ANALYSIS = (
+    'Here you go:\n{"ats_score": 72, "keyword_match_score": 80, '
+    '"missing_keywords": ["docker", "k8s \\"core\\""], '
+    '"suggestions": ["Add {metrics}", "Use, commas"]}\ntrailing text'
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 17, len(ANALYSIS)])
+def test_chunking_does_not_change_result(chunk_size):
+    parser = IncrementalJSONParser()
+    events = []
+    for i in range(0, len(ANALYSIS), chunk_size):
+        events += parser.feed(ANALYSIS[i:i + chunk_size])
+
+    expected = json.loads(ANALYSIS[ANALYSIS.index("{"):ANALYSIS.rindex("}") + 1])
+    assert parser.close() == expected
+    assert (["ats_score"], 72) in events
+    assert (["suggestions", 0], "Add {metrics}") in events
+    assert (["missing_keywords", 1], 'k8s "core"') in events
+
+
+def test_fields_are_emitted_before_object_closes():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"ats_score": 72') == []
+    assert parser.feed(', "suggestions": ["one"') == [(["ats_score"], 72), (["suggestions", 0], "one")]
+    assert not parser.done
+
+
+def test_incomplete_stream_raises():
+    parser = IncrementalJSONParser()
+    parser.feed('{"ats_score": 7')
+    with pytest.raises(ValueError):
+        parser.close()
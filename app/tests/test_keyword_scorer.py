@@ -0,0 +1,46 @@
+from app.utils.keyword_scorer import combine_ats_score, extract_jd_keywords, failed_analysis, normalize, score_keywords
+
+JD = """Senior Backend Engineer
+Requirements: Python, FastAPI, PostgreSQL, Docker, and AWS.
+Experience with CI/CD pipelines (GitHub Actions, Jenkins). Node.js or C++ is a plus.
+5+ years of experience. Bachelor's degree in Computer Science or related field."""
+
+
+def test_normalize_keeps_tech_tokens():
+    assert normalize("Node.js, C++ and C#!  (React)") == "node.js c++ and c# react"
+
+
+def test_extracts_lists_phrases_and_tech_tokens():
+    keywords = extract_jd_keywords(JD)
+    for expected in ["python", "fastapi", "github actions", "node.js", "c++", "ci cd", "5+ years of experience"]:
+        assert expected in keywords
+    assert "and" not in keywords
+
+
+def test_matching_rules_and_score():
+    resume = "Backend engineer. Python, FastAPI, Postgres, Docker, Amazon Web Services, Jenkins, GitHub Actions."
+    result = score_keywords(resume, JD)
+
+    assert "python" not in result["missing_keywords"]
+    # synonyms count as matches
+    assert "postgresql" in result["matched_keywords"]
+    assert "aws" in result["matched_keywords"]
+    assert "c++" in result["missing_keywords"]
+    assert 0 < result["keyword_match_score"] < 100
+
+
+def test_empty_jd_scores_zero():
+    assert score_keywords("anything", "")["keyword_match_score"] == 0
+
+
+def test_combine_ats_score():
+    assert combine_ats_score(80, 50) == 71
+    assert combine_ats_score(80, 500) == 86
+    assert combine_ats_score(80, "high") == combine_ats_score(80, None) == 56
+    assert combine_ats_score(80, "90") == 83
+
+
+def test_failed_analysis_keeps_local_score():
+    local = score_keywords("Python and Docker", JD)
+    failed = failed_analysis(local, "Groq API failed")
+    assert failed["ats_score"] == local["keyword_match_score"] > 0 and failed["failed"]
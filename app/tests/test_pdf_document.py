@@ -0,0 +1,86 @@
+import fitz
+import msgpack
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import feedback
+from app.utils import pdf_document
+from app.utils.extract_pool import extraction_pool
+from app.utils.pdf_converter import iter_editable_html, parse_page_range, pdf_to_editable_html
+from app.utils.pdf_overlay_extractor import _merged_runs, extract_pdf_structure, extract_pdf_structure_columnar
+from app.utils.pdf_utils import extract_text_from_pdf
+
+
+def _pdf() -> bytes:
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_text((72, 72), "Jane Doe", fontsize=18)
+    page.insert_text((72, 110), "Backend engineer, Python and Go")
+    doc.new_page().insert_text((72, 72), "Page two")
+    return doc.tobytes()
+
+
+def test_text_matches_pymupdf():
+    data = _pdf()
+    document = pdf_document.parse_pdf(data)
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        assert [p.text() for p in document.pages] == [page.get_text("text") for page in doc]
+    assert document.text() == "Jane Doe\nBackend engineer, Python and Go\n\fPage two"
+
+
+def test_converters_share_one_parse(monkeypatch):
+    calls = []
+    parse = pdf_document.parse_pdf
+    monkeypatch.setattr(pdf_document, "parse_pdf", lambda *a: calls.append(1) or parse(*a))
+    pdf_document.pdf_cache.clear()
+
+    data = _pdf()
+    assert "Jane Doe" in extract_text_from_pdf(data)
+    assert "data-page='2'" in pdf_to_editable_html(data)
+    assert extract_pdf_structure(data)["pages"][1]["items"][0]["text"] == "Page two"
+    assert len(calls) == 1
+
+
+def test_page_ranges_stream_lazily():
+    document = pdf_document.parse_pdf(_pdf())
+    assert "".join(iter_editable_html(document)) == pdf_to_editable_html(_pdf())
+
+    second = list(iter_editable_html(document, *parse_page_range("2-", 2), wrap=False))
+    assert len(second) == 1 and second[0].startswith("<div class='pdf-page' data-page='2'>")
+    assert parse_page_range("1", 2) == (1, 1) and parse_page_range("1-9", 2) == (1, 2)
+    with pytest.raises(ValueError):
+        parse_page_range("3", 2)
+
+
+def test_columnar_structure_interns_fonts_and_merges_runs():
+    data = _pdf()
+    columnar = extract_pdf_structure_columnar(data)
+    legacy = extract_pdf_structure(data)
+    for page, old in zip(columnar["pages"], legacy["pages"]):
+        assert page["text"] == [item["text"] for item in old["items"]]
+        assert [columnar["fonts"][i] for i in page["font"]] == [item["fontFamily"] for item in old["items"]]
+
+    span = lambda text, x0, x1, size=11.0: pdf_document.PdfSpan(text, "Arial", size, 0, 0, (x0, 10, x1, 22))
+    line = pdf_document.PdfLine((0, 10, 90, 22), [
+        span("Senior", 0, 30), span(" ", 30, 33, 9.0), span("engineer", 33, 70), span("!", 70, 74, 14.0),
+    ])
+    assert [(text, bbox) for text, bbox, _ in _merged_runs(line)] == [
+        ("Senior engineer", (0, 10, 70, 22)), ("!", (70, 10, 74, 22)),
+    ]
+
+
+def test_msgpack_structure_round_trips_to_the_json(monkeypatch):
+    monkeypatch.setattr(extraction_pool, "workers", 0)
+    app = FastAPI()
+    app.include_router(feedback.router)
+    client = TestClient(app)
+    files = {"file": ("cv.pdf", _pdf(), "application/pdf")}
+
+    for output_format in ("json", "columnar"):
+        url = f"/ai/extract-pdf-structure?format={output_format}"
+        as_json = client.post(url, files=files).json()
+        packed = client.post(url, files=files, headers={"Accept": "application/msgpack"})
+        assert packed.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(packed.content) == as_json
+    assert client.post("/ai/extract-pdf-structure?format=xml", files=files).status_code == 400
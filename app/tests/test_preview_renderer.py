@@ -0,0 +1,89 @@
+import asyncio
+import os
+import stat
+import time
+
+import fitz
+import pytest
+
+from app.utils import asset_store as assets
+from app.utils.extract_pool import extraction_pool
+from app.utils.preview_renderer import PreviewRenderer
+
+# Stands in for pdf2htmlEX: writes HTML, a stylesheet and a font into --dest-dir
+FAKE_PDF2HTMLEX = """#!/bin/sh
+[ -n "$BIG" ] && head -c 2000000 /dev/zero > "$4/big.bin"
+[ -n "$SLEEP" ] && sleep "$SLEEP"
+printf 'woff' > "$4/f1.woff"
+printf '@font-face{src:url(f1.woff)}' > "$4/resume.css"
+printf '<link rel="stylesheet" href="resume.css"/><p>preview</p>' > "$4/$6"
+"""
+
+
+def _pdf() -> bytes:
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), "Jane Doe")
+    return doc.tobytes()
+
+
+def _fake_binary(tmp_path) -> str:
+    path = tmp_path / "pdf2htmlEX"
+    path.write_text(FAKE_PDF2HTMLEX)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def test_pdf2htmlex_outputs_move_to_asset_store(tmp_path, monkeypatch):
+    store = assets.AssetStore(str(tmp_path / "assets"))
+    monkeypatch.setattr("app.utils.preview_renderer.asset_store", store)
+    workspace = tmp_path / "work"
+    workspace.mkdir()
+    renderer = PreviewRenderer(binary=_fake_binary(tmp_path), workspace_dir=str(workspace))
+
+    data = _pdf()
+    preview = asyncio.run(renderer.render(data, label="a.pdf"))
+    assert preview["renderer"] == "pdf2htmlEX" and "<p>preview</p>" in preview["html"]
+    css_id = preview["html"].split(assets.ASSET_URL_PREFIX)[1].split('"')[0]
+    with open(store.path(css_id)) as f:
+        assert f.read().startswith(f"@font-face{{src:url({assets.ASSET_URL_PREFIX}")
+    assert os.listdir(workspace) == []
+    assert asyncio.run(renderer.render(data)) is preview
+
+
+def test_missing_or_hung_binary_falls_back_to_pymupdf(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_pool, "workers", 0)
+    missing = PreviewRenderer(binary=str(tmp_path / "nope"))
+    assert asyncio.run(missing.render(_pdf()))["renderer"] == "pymupdf"
+
+    monkeypatch.setenv("SLEEP", "5")
+    workspace = tmp_path / "work"
+    workspace.mkdir()
+    hung = PreviewRenderer(binary=_fake_binary(tmp_path), timeout=0.5, workspace_dir=str(workspace))
+    preview = asyncio.run(hung.render(_pdf()))
+    assert preview["renderer"] == "pymupdf" and "Jane Doe" in preview["html"]
+    assert hung.stats()["timeouts"] == 1 and hung.stats()["failures"] == 0
+    assert os.listdir(workspace) == []
+
+
+def test_runaway_output_is_killed_while_running(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_pool, "workers", 0)
+    monkeypatch.setattr("app.utils.preview_renderer.PREVIEW_MAX_OUTPUT_MB", 1)
+    monkeypatch.setenv("BIG", "1")
+    monkeypatch.setenv("SLEEP", "5")
+    workspace = tmp_path / "work"
+    workspace.mkdir()
+    renderer = PreviewRenderer(binary=_fake_binary(tmp_path), timeout=10, workspace_dir=str(workspace))
+
+    started = time.monotonic()
+    assert asyncio.run(renderer.render(_pdf()))["renderer"] == "pymupdf"
+    assert time.monotonic() - started < 3
+    assert renderer.stats()["failures"] == 1 and renderer.stats()["timeouts"] == 0
+    assert os.listdir(workspace) == []
+
+
+def test_unreadable_pdf_is_a_value_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(extraction_pool, "workers", 0)
+    renderer = PreviewRenderer(binary=str(tmp_path / "nope"))
+    with pytest.raises(ValueError):
+        asyncio.run(renderer.render(b"%PDF-1.4 not really", label="bad.pdf"))
+    assert renderer.stats()["native"] == 0
@@ -0,0 +1,69 @@
+from app.utils.pdf_document import PAGE_BREAK
+from app.utils.prompt_compactor import compact_inputs, compact_job_description, compact_resume, estimate_tokens
+
+
+def test_page_headers_and_footers_are_dropped():
+    pages = [
+        "Jane Doe | jane@example.com\nExperience\nBuilt APIs in Python\nConfidential - Jane Doe CV\nPage 1 of 2",
+        "Jane Doe | jane@example.com\nSkills\nPython, SQL\nConfidential - Jane Doe CV\nPage 2 of 2",
+    ]
+    text = compact_resume(PAGE_BREAK.join(pages))
+    assert text.count("Jane Doe | jane@example.com") == 1
+    assert text.count("Confidential - Jane Doe CV") == 1
+    assert "Page" not in text
+    assert "Python, SQL" in text and "Built APIs in Python" in text
+
+
+def test_repeated_lines_in_the_body_are_kept():
+    text = "\n".join([
+        "Jane Doe", "Experience",
+        "Software Engineer", "Acme Corp, 2021-2024", "Built the billing service",
+        "Software Engineer", "Initech, 2018-2021", "Maintained the reporting stack",
+        "Education", "BSc Computer Science",
+    ])
+    assert compact_resume(text).count("Software Engineer") == 2
+
+
+def test_single_long_line_is_cut_at_the_token_budget():
+    result = compact_inputs("short resume", "word " * 7000, budget=100)
+    assert result.truncated
+    assert result.job_description.startswith("word word")
+    assert result.tokens_after <= 100
+    assert estimate_tokens(result.job_description) > 80
+
+
+def test_body_lines_repeated_across_pages_are_kept():
+    pages = [
+        "Jane Doe\nExperience\nAcme Corp\nSoftware Engineer\nBuilt the billing service in Python\nPython\nMore work\nEven more",
+        "Globex\nPrevious role\nDetails\nSoftware Engineer\nMaintained the reporting stack\nPython\nTail a\nTail b",
+        "Education\nBSc Computer Science\nState University\nAwards\nDean's list\nHackathon winner",
+    ]
+    text = compact_resume(PAGE_BREAK.join(pages))
+    assert text.count("Software Engineer") == 2 and text.count("Python\n") == 2
+
+
+def test_jd_boilerplate_skip_ends_at_the_next_heading():
+    jd = "\n".join([
+        "Senior Backend Engineer",
+        "About us",
+        "We are a fast-growing fintech with offices in three countries and a great culture.",
+        "What you'll do",
+        "Build APIs in Python and Go.",
+        "Own our PostgreSQL data model.",
+        "Design event-driven services on Kafka, with CI/CD in GitHub Actions and Jenkins.",
+        "Mentor engineers and review designs for reliability, observability and cost.",
+        "Benefits",
+        "Generous vacation, health insurance and a learning budget for everyone.",
+        "",
+        "Requirements: 5+ years with Kubernetes and AWS.",
+    ])
+    compacted = compact_job_description(jd)
+    assert "fintech" not in compacted and "vacation" not in compacted
+    assert "Build APIs in Python and Go." in compacted and "Own our PostgreSQL data model." in compacted
+    assert "Kubernetes" in compacted
+
+
+def test_jd_mostly_dropped_falls_back_to_the_normalized_text():
+    jd = "Role\nAbout us\n" + "\n".join(f"We value people and culture, point {i}." for i in range(20))
+    compacted = compact_job_description(jd)
+    assert "point 19" in compacted and compacted.startswith("Role\nAbout us")
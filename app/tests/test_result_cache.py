@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import models
+from app.api import result_cache
+from app.api.result_cache import ResultCache, make_cache_key
+from app.database import Base
+
+
+@pytest.fixture
+def sqlite_session(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(result_cache.database, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+def test_cache_key_depends_on_every_part():
+    assert make_cache_key("ab", "c") != make_cache_key("a", "bc")
+    assert make_cache_key("resume", "jd", "model-a") != make_cache_key("resume", "jd", "model-b")
+
+
+def test_memory_then_db_tier(sqlite_session):
+    cache = ResultCache("test", ttl=60, maxsize=2)
+    key = make_cache_key("resume", "jd")
+
+    assert cache.get(key) is None
+    cache.set(key, {"ats_score": 80})
+    assert cache.get(key) == {"ats_score": 80}
+
+    # A fresh process only has the DB tier
+    fresh = ResultCache("test", ttl=60, maxsize=2)
+    assert fresh.get(key) == {"ats_score": 80}
+    assert fresh.stats()["db_hits"] == 1
+
+    fresh.invalidate(key)
+    assert ResultCache("test", ttl=60).get(key) is None
+
+
+def test_expired_entries_are_not_served(sqlite_session):
+    cache = ResultCache("test", ttl=-1)
+    key = make_cache_key("resume", "jd")
+    cache.set(key, {"ats_score": 80})
+    assert cache.get(key) is None
+    live_key = make_cache_key("resume", "other jd")
+    ResultCache("test", ttl=60).set(live_key, {"ats_score": 70})
+
+    result_cache.purge_expired_cache_entries()
+    db = sqlite_session()
+    assert [row.cache_key for row in db.query(models.AiResultCache).all()] == [live_key]
+    db.close()
+
+
+def test_db_tier_is_trimmed_to_max_rows(sqlite_session):
+    cache = ResultCache("test", ttl=60, maxsize=10, max_rows=2)
+    keys = [make_cache_key("resume", str(i)) for i in range(4)]
+    for i, key in enumerate(keys):
+        cache.set(key, {"i": i})
+
+    assert cache.trim() == 2
+    fresh = ResultCache("test", ttl=60)
+    assert fresh.get(keys[0]) is None
+    assert fresh.get(keys[3]) == {"i": 3}
+
+    cache.clear()
+    assert ResultCache("test", ttl=60).get(keys[3]) is None
+
+
+def test_trim_and_purge_survive_db_errors(monkeypatch):
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    monkeypatch.setattr(result_cache.database, "SessionLocal", sessionmaker(bind=engine))  # no tables
+    assert ResultCache("test", ttl=60, max_rows=2).trim() == 0
+    result_cache.purge_expired_cache_entries()
+    engine.dispose()
+
+
+def test_ttl_zero_caches_nothing_and_none_never_expires():
+    from app.utils.cache import TTLCache
+
+    off = TTLCache(ttl=0)
+    off.set("k", 1)
+    assert off.get("k") is None and len(off) == 0
+
+    forever = TTLCache(ttl=None)
+    forever.set("k", 1)
+    assert forever.get("k") == 1
+    forever.set("k2", 2, ttl=0)
+    assert forever.get("k2") is None
@@ -0,0 +1,94 @@
+import fitz
+
+from app.utils.resume_sectioner import SECTIONER_MIN_CONFIDENCE, section_resume_document, section_resume_pdf
+
+
+def make_pdf(lines, columns: bool = False) -> bytes:
+    """lines: (text, size, bold); with columns=True every heading also gets a right-hand twin."""
+    doc = fitz.open()
+    page = doc.new_page()
+    y = 60
+    for text, size, bold in lines:
+        page.insert_text((50, y), text, fontsize=size, fontname="hebo" if bold else "helv")
+        if columns and size > 11:
+            page.insert_text((330, y), text, fontsize=size, fontname="hebo")
+        y += size * 1.5
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+RESUME = [
+    ("Jane Doe", 20, True),
+    ("Senior Software Engineer", 10, False),
+    ("jane.doe@example.com | +1 (555) 123-4567 | San Francisco, CA", 10, False),
+    ("SUMMARY", 13, True),
+    ("Backend engineer building distributed systems in Python and Go.", 10, False),
+    ("EXPERIENCE", 13, True),
+    ("Senior Software Engineer | Acme Corp", 10, True),
+    ("San Francisco, CA   Jan 2020 - Present", 10, False),
+    ("- Led migration of monolith to microservices", 10, False),
+    ("- Built event pipeline processing 2M messages/day", 10, False),
+    ("Globex - Software Engineer", 10, True),
+    ("Mar 2016 - Dec 2019", 10, False),
+    ("- Designed REST APIs used by 30 internal teams", 10, False),
+    ("EDUCATION", 13, True),
+    ("University of California, Berkeley", 10, True),
+    ("B.S. in Computer Science   2012 - 2016", 10, False),
+    ("SKILLS", 13, True),
+    ("Languages: Python, Go, SQL", 10, False),
+]
+
+
+def test_single_column_resume_is_sectioned_locally():
+    result = section_resume_pdf(make_pdf(RESUME))
+    assert result.confidence >= SECTIONER_MIN_CONFIDENCE
+
+    sections = result.resume_json["sections"]
+    assert result.resume_json["order"] == ["Header", "Professional Summary", "Work Experience", "Education", "Skills"]
+    assert sections["Header"]["fullName"] == "Jane Doe"
+    assert sections["Header"]["email"] == "jane.doe@example.com"
+
+    first, second = sections["Work Experience"]
+    assert (first["role"], first["company"], first["endDate"]) == ("Senior Software Engineer", "Acme Corp", "Present")
+    assert len(first["achievements"]) == 2
+    assert (second["role"], second["company"]) == ("Software Engineer", "Globex")
+    assert sections["Education"][0]["degree"] == "B.S. in Computer Science"
+    assert sections["Skills"] == {"Languages": ["Python", "Go", "SQL"]}
+
+
+def test_multi_column_layout_falls_back_to_llm():
+    result = section_resume_pdf(make_pdf(RESUME, columns=True))
+    assert result.confidence < SECTIONER_MIN_CONFIDENCE
+
+
+def test_pdf_without_text_layer():
+    doc = fitz.open()
+    doc.new_page()
+    assert section_resume_pdf(doc.tobytes()) is None
+
+
+def test_parsed_document_is_sectioned_without_reparsing(monkeypatch):
+    import asyncio
+
+    from app.routers import feedback
+    from app.utils import pdf_converter
+    from app.utils.pdf_document import parse_pdf
+    from app.utils.upload_intake import Upload
+
+    data = make_pdf(RESUME)
+    document = parse_pdf(data)
+    monkeypatch.setattr(pdf_converter, "load_pdf", lambda *a: (_ for _ in ()).throw(AssertionError("parsed again")))
+    result = section_resume_document(document)
+    assert result.confidence >= SECTIONER_MIN_CONFIDENCE
+    assert result.resume_json["order"][:3] == ["Header", "Professional Summary", "Work Experience"]
+
+    # A PDF the extraction pool could not parse skips the sectioner instead of parsing in-process
+    async def unreadable(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(feedback.extraction_pool, "load_pdf", unreadable)
+    monkeypatch.setattr(feedback, "section_resume_document", lambda d: (_ for _ in ()).throw(AssertionError("sectioned")))
+    upload = Upload("cv.pdf", data, "0" * 64, "pdf", "application/pdf")
+    _, resume_json = asyncio.run(feedback._structure_without_llm(upload, refresh=True))
+    assert resume_json is None
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.api.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    flight = SingleFlight("test")
+    runs = 0
+
+    async def work():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        return runs
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", work) for _ in range(10)))
+
+    assert asyncio.run(main()) == [1] * 10
+    assert runs == 1
+    assert flight.stats() == {"name": "test", "calls": 1, "coalesced": 9, "in_flight": 0}
+
+
+def test_every_caller_gets_the_exception_and_key_is_freed():
+    flight = SingleFlight("test")
+    runs = 0
+
+    async def boom():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        raise ValueError("boom")
+
+    async def ok():
+        return "ok"
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("k", boom) for _ in range(5)), return_exceptions=True)
+        assert flight.stats()["in_flight"] == 0
+        return results, await flight.do("k", ok)
+
+    results, after = asyncio.run(main())
+    assert runs == 1
+    assert len(results) == 5 and all(isinstance(r, ValueError) and str(r) == "boom" for r in results)
+    assert after == "ok"
+
+
+def test_cancelled_caller_does_not_cancel_the_others():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
@@ -0,0 +1,23 @@
+from app.utils.pdf_utils import extract_keywords
+from app.utils.skill_matcher import SkillMatcher, get_skill_matcher
+
+
+def test_multiword_and_tech_tokens_canonicalized():
+    text = "Machine learning with Spring Boot, C++, node.js and Postgres on k8s (CI/CD via GitHub Actions)."
+    assert extract_keywords(text) == [
+        "Machine Learning", "Spring Boot", "C++", "Node.js", "PostgreSQL", "Kubernetes", "CI/CD", "GitHub Actions",
+    ]
+
+
+def test_leftmost_longest_and_case_sensitive_forms():
+    matcher = SkillMatcher(
+        [("Spring", "Backend", []), ("Spring Boot", "Backend", ["springboot"]), ("Go", "Languages", ["golang"])],
+        case_sensitive=["Go", "Spring"],
+    )
+    skills = [m.skill for m in matcher.scan("spring boot and spring-boot; we go fast in Go, golang and Spring.")]
+    assert skills == ["Spring Boot", "Spring Boot", "Go", "Go", "Spring"]
+
+
+def test_dictionary_loads():
+    stats = get_skill_matcher().stats()
+    assert stats["skills"] > 300 and stats["forms"] > stats["skills"]
@@ -0,0 +1,56 @@
+import asyncio
+
+import fitz
+from PIL import Image
+
+from app import models
+from app.utils import thumbnails
+from app.utils.asset_store import AssetStore
+from app.utils.extract_pool import extraction_pool
+
+
+def _pdf() -> bytes:
+    doc = fitz.open()
+    for n in (1, 2, 3):
+        doc.new_page().insert_text((72, 72), f"Page {n}")
+    return doc.tobytes()
+
+
+def test_thumbnails_render_once_and_are_served_from_disk(tmp_path, monkeypatch):
+    fetches = []
+
+    async def fetch(resume):
+        fetches.append(resume.id)
+        return _pdf(), "application/pdf", "cv.pdf"
+
+    monkeypatch.setattr(thumbnails, "fetch_resume_bytes", fetch)
+    monkeypatch.setattr(thumbnails, "thumbnail_store", AssetStore(str(tmp_path)))
+    monkeypatch.setattr(extraction_pool, "workers", 0)
+    thumbnails.page_counts.clear()
+    resume = models.Resume(id=7, user_id=1, name="CV", file_url="https://res.cloudinary.com/x/v1/cv.pdf", public_id="cv")
+
+    async def scenario():
+        paths = await asyncio.gather(*(
+            thumbnails.thumbnail_path(resume, 1, size) for size in thumbnails.THUMBNAIL_SIZES
+        ))
+        pages = await thumbnails.page_thumbnails(resume, "sm")
+        return paths, pages
+
+    paths, pages = asyncio.run(scenario())
+    assert fetches == [7]
+    widths = [Image.open(p).size[0] for p in paths]
+    assert widths == list(thumbnails.THUMBNAIL_SIZES.values())
+    assert Image.open(paths[0]).format == "WEBP"
+    assert pages == [thumbnails.thumbnail_url(resume, n, "sm") for n in (1, 2, 3)]
+
+    thumb_id = thumbnails.thumbnail_id(resume.file_url, 1, "md")
+    assert thumbnails.valid_thumbnail_id(resume, 1, "md", thumb_id)
+    assert not thumbnails.valid_thumbnail_id(resume, 2, "md", thumb_id)
+
+
+def test_thumbnail_ids_depend_on_the_server_key(monkeypatch):
+    url = "https://res.cloudinary.com/x/v1/cv.pdf"
+    thumb_id = thumbnails.thumbnail_id(url, 1, "md")
+    assert thumb_id == thumbnails.thumbnail_id(url, 1, "md")
+    monkeypatch.setattr(thumbnails, "THUMBNAIL_SECRET", b"another key")
+    assert thumbnails.thumbnail_id(url, 1, "md") != thumb_id
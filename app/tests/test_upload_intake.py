@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+from io import BytesIO
+
+import fitz
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.tests.test_docx_text import _docx
+from app.utils.upload_intake import DOCX_MEDIA_TYPE, read_upload
+
+
+def _upload(data: bytes, filename: str = "resume.pdf") -> UploadFile:
+    return UploadFile(BytesIO(data), filename=filename)
+
+
+def test_type_comes_from_magic_bytes_and_hash_from_the_stream():
+    pdf = fitz.open()
+    pdf.new_page()
+    data = pdf.tobytes()
+    upload = asyncio.run(read_upload(_upload(data, "resume.docx"), max_size=1024 * 1024))
+    assert upload.kind == "pdf" and upload.sha256 == hashlib.sha256(data).hexdigest()
+
+    upload = asyncio.run(read_upload(_upload(_docx(), "resume.pdf"), max_size=1024 * 1024))
+    assert upload.kind == "docx" and upload.content_type == DOCX_MEDIA_TYPE
+
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(read_upload(_upload(_docx()), max_size=1024 * 1024, kinds=("pdf",)))
+    assert e.value.status_code == 415
+
+
+def test_reading_stops_at_the_size_cap():
+    class Endless:
+        reads = 0
+
+        def read(self, n=-1):
+            self.reads += 1
+            return b"%PDF-" + b"x" * (n - 5)
+
+    source = Endless()
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(read_upload(UploadFile(source, filename="big.pdf"), max_size=256 * 1024))
+    assert e.value.status_code == 400 and source.reads == 5
+
+
+def test_middleware_limits_only_the_ai_upload_paths():
+    from fastapi import FastAPI, File
+    from fastapi.testclient import TestClient
+
+    from app.utils.upload_intake import UploadLimitMiddleware
+
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, limits={"/ai/": 1024})
+
+    @app.post("/ai/resume/analyze")
+    async def analyze(resume: UploadFile = File(...)):
+        return {"size": len(await resume.read())}
+
+    @app.post("/get-jd-from/image")
+    async def jd_image(files: UploadFile = File(...)):
+        return {"size": len(await files.read())}
+
+    client = TestClient(app)
+    big = {"files": ("jd.png", b"x" * 4096, "image/png")}
+    assert client.post("/get-jd-from/image", files=big).json() == {"size": 4096}
+    assert client.post("/ai/resume/analyze", files={"resume": ("cv.pdf", b"x" * 4096)}).status_code == 413
+    assert client.post("/ai/resume/analyze", files={"resume": ("cv.pdf", b"x" * 512)}).json() == {"size": 512}
+
+    # No Content-Length: the body is counted as it streams in
+    def chunked(size):
+        yield b'--b\r\nContent-Disposition: form-data; name="resume"; filename="cv.pdf"\r\n\r\n'
+        for _ in range(size // 256):
+            yield b"x" * 256
+        yield b"\r\n--b--\r\n"
+
+    multipart = {"content-type": "multipart/form-data; boundary=b"}
+    resp = client.post("/ai/resume/analyze", content=chunked(4096), headers=multipart)
+    assert resp.status_code == 413 and resp.json() == {"detail": "Request body too large."}
+    assert client.post("/ai/resume/analyze", content=chunked(512), headers=multipart).json() == {"size": 512}
@@ -0,0 +1,81 @@
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.api.groq_client import ANALYSIS_PROMPT_VERSION, GROQ_MODEL
+from app.api.result_cache import make_cache_key, normalize_text
+
+
+def analysis_fingerprint(resume: models.Resume, job_description: str) -> str:
+    """
+    Identifies the inputs of a stored analysis. Stored resumes are immutable
+    Cloudinary uploads (a new file gets a new versioned URL), so the URL stands
+    in for the file content and the resume does not have to be downloaded to
+    know whether its analysis is still current.
+    """
+    return make_cache_key(
+        "resume-file", resume.file_url,
+        normalize_text(job_description),
+        ANALYSIS_PROMPT_VERSION, GROQ_MODEL,
+    )
+
+
+def get_current_analyses(
+    db: Session, pairs: Dict[Tuple[int, int], str]
+) -> Dict[Tuple[int, int], models.AiAnalysis]:
+    """
+    pairs maps (application_id, resume_id) -> fingerprint.
+    Returns the stored analyses whose fingerprint still matches, keyed the same way.
+    """
+    if not pairs:
+        return {}
+    application_ids = {app_id for app_id, _ in pairs}
+    resume_ids = {resume_id for _, resume_id in pairs}
+    rows = db.query(models.AiAnalysis).filter(
+        models.AiAnalysis.application_id.in_(application_ids),
+        models.AiAnalysis.resume_id.in_(resume_ids),
+    ).all()
+    return {
+        (row.application_id, row.resume_id): row
+        for row in rows
+        if row.input_fingerprint and pairs.get((row.application_id, row.resume_id)) == row.input_fingerprint
+    }
+
+
+def save_analysis(
+    db: Session, application_id: int, resume_id: int, insights: dict, fingerprint: Optional[str] = None
+) -> Optional[models.AiAnalysis]:
+    """
+    Upsert the analysis for an (application, resume) pair.
+    Failed analyses are not stored. Caller commits.
+    """
+    if insights.get("failed"):
+        return None
+
+    analysis = db.query(models.AiAnalysis).filter(
+        models.AiAnalysis.application_id == application_id,
+        models.AiAnalysis.resume_id == resume_id,
+    ).first()
+    if not analysis:
+        analysis = models.AiAnalysis(application_id=application_id, resume_id=resume_id)
+        db.add(analysis)
+
+    missing = insights.get("missing_keywords") or []
+    analysis.ats_score = int(insights.get("ats_score") or 0)
+    analysis.keyword_match_score = int(insights.get("keyword_match_score") or 0)
+    analysis.keyword_Match = not missing
+    analysis.missing_keywords = missing
+    analysis.suggestions = insights.get("suggestions") or []
+    analysis.input_fingerprint = fingerprint
+    return analysis
+
+
+def analysis_to_dict(analysis: models.AiAnalysis) -> dict:
+    return {
+        "ats_score": analysis.ats_score,
+        "keyword_match_score": analysis.keyword_match_score,
+        "missing_keywords": analysis.missing_keywords or [],
+        "suggestions": analysis.suggestions or [],
+    }
+
@@ -0,0 +1,133 @@
+"""
+Content-addressed store for images and fonts pulled out of converted resumes.
+
+Converted HTML references assets by URL (/ai/assets/<sha256>.<ext>) instead of
+inlining them as base64, so a logo repeated on every page is fetched once and
+browsers keep it across pages and sessions. An asset id is the SHA-256 of its
+bytes, so a URL's content never changes and is served as immutable. Assets live
+on disk (ASSET_STORE_DIR), shared by every worker process. prune() keeps the
+directory under ASSET_STORE_MAX_MB by dropping the least recently stored files.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, Optional
+
+from app.core.logger import get_logger
+from app.utils.pdf_document import PdfDocument
+
+logger = get_logger(__name__)
+
+ASSET_STORE_DIR = os.getenv("ASSET_STORE_DIR", os.path.join(tempfile.gettempdir(), "resume-assets"))
+ASSET_STORE_MAX_MB = int(os.getenv("ASSET_STORE_MAX_MB", "512"))
+ASSET_URL_PREFIX = "/ai/assets/"
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_ASSET_ID_RE = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]{1,5}$")
+
+mimetypes.add_type("font/woff", ".woff")
+mimetypes.add_type("font/woff2", ".woff2")
+mimetypes.add_type("image/jpx", ".jpx")
+
+
+class AssetStore:
+    def __init__(self, root: str = ASSET_STORE_DIR, max_bytes: int = ASSET_STORE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, asset_id: str, touch: bool = False) -> Optional[str]:
+        """
+        Filesystem path of a stored asset, or None for unknown or malformed ids.
+        touch=True marks it recently used, so prune() evicts least recently used first.
+        """
+        if not _ASSET_ID_RE.match(asset_id or ""):
+            return None
+        path = os.path.join(self.root, asset_id)
+        if not os.path.exists(path):
+            return None
+        if touch:
+            try:
+                os.utime(path)
+            except FileNotFoundError:  # pruned in between
+                return None
+        return path
+
+    def put(self, data: bytes, ext: str) -> str:
+        """Store `data` (idempotent) and return its asset id."""
+        ext = re.sub(r"[^a-z0-9]", "", (ext or "bin").lower())[:5] or "bin"
+        return self.put_as(f"{hashlib.sha256(data).hexdigest()}.{ext}", data)
+
+    def put_as(self, asset_id: str, data: bytes) -> str:
+        """Store `data` under an id derived elsewhere (e.g. from what it was rendered from)."""
+        if not _ASSET_ID_RE.match(asset_id):
+            raise ValueError(f"Invalid asset id: {asset_id}")
+        path = os.path.join(self.root, asset_id)
+        if os.path.exists(path):
+            os.utime(path)  # recently used again; keep it out of prune()'s way
+            return asset_id
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)  # atomic, so readers never see a partial file
+        return asset_id
+
+    def prune(self) -> int:
+        """Delete the oldest assets until the store fits max_bytes. Scheduled from app.main."""
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and _ASSET_ID_RE.match(entry.name):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"Pruned {removed} files from {self.root}")
+        return removed
+
+    @staticmethod
+    def media_type(asset_id: str) -> str:
+        return mimetypes.guess_type(asset_id)[0] or "application/octet-stream"
+
+
+asset_store = AssetStore()
+
+
+def asset_url(asset_id: str) -> str:
+    return f"{ASSET_URL_PREFIX}{asset_id}"
+
+
+def document_asset_ids(document: PdfDocument) -> Dict[int, str]:
+    """
+    xref -> asset id for every image of a parsed PDF, stored on first use and remembered
+    on the (cached) model, so later page ranges of the same document don't re-hash.
+    A remembered id is touched on reuse, and stored again if prune() removed it meanwhile.
+    """
+    if document.asset_ids is None:
+        document.asset_ids = {
+            xref: asset_store.put(image["image"], image["ext"])
+            for xref, image in document.images.items()
+            if image
+        }
+        return document.asset_ids
+
+    for xref, asset_id in document.asset_ids.items():
+        if asset_store.path(asset_id, touch=True) is None:
+            asset_store.put_as(asset_id, document.images[xref]["image"])
+    return document.asset_ids
+
+
+def prune_assets():
+    asset_store.prune()
@@ -0,0 +1,90 @@
+"""
+Streaming DOCX text extraction.
+
+Reads word/document.xml straight out of the zip with lxml.etree.iterparse and
+emits paragraph and table-cell text in document order, clearing elements as it
+goes, instead of building python-docx's full object model. Each table cell is
+read once: a horizontally merged cell is a single <w:tc> (python-docx repeats it
+per grid column) and vertical-merge continuation cells are skipped. Text-box
+fallbacks (mc:Fallback, a copy of the mc:Choice content) are ignored.
+pdf_utils.extract_text_from_docx falls back to python-docx if this raises.
+"""
+import os
+import zipfile
+from io import BytesIO
+from typing import List, Optional
+
+from lxml import etree
+
+DOCX_MAX_XML_MB = int(os.getenv("DOCX_MAX_XML_MB", "50"))
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MC_FALLBACK = "{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback"
+_P, _T, _TAB, _BR, _CR = f"{_W}p", f"{_W}t", f"{_W}tab", f"{_W}br", f"{_W}cr"
+_TC, _TBL, _VMERGE, _VAL = f"{_W}tc", f"{_W}tbl", f"{_W}vMerge", f"{_W}val"
+
+
+def _document_xml(file_bytes: bytes):
+    archive = zipfile.ZipFile(BytesIO(file_bytes))
+    info = archive.getinfo("word/document.xml")
+    if info.file_size > DOCX_MAX_XML_MB * 1024 * 1024:
+        raise ValueError(f"word/document.xml is {info.file_size} bytes uncompressed")
+    return archive.open(info)
+
+
+def iter_docx_text(file_bytes: bytes):
+    """Stripped, non-empty paragraph and table-cell texts, in document order."""
+    paragraphs: List[List[str]] = []  # runs of the open <w:p> elements (text boxes nest them)
+    cells: List[dict] = []            # open <w:tc> elements
+    fallback = 0
+
+    with _document_xml(file_bytes) as xml:
+        for event, elem in etree.iterparse(
+            xml, events=("start", "end"), resolve_entities=False, no_network=True, huge_tree=False,
+        ):
+            tag = elem.tag
+            if event == "start":
+                if tag == _P:
+                    paragraphs.append([])
+                elif tag == _TC:
+                    cells.append({"paragraphs": [], "continuation": False})
+                elif tag == _MC_FALLBACK:
+                    fallback += 1
+                continue
+
+            if tag == _MC_FALLBACK:
+                fallback -= 1
+            elif fallback or not paragraphs and tag in (_T, _TAB, _BR, _CR):
+                pass
+            elif tag == _T:
+                paragraphs[-1].append(elem.text or "")
+            elif tag == _TAB:
+                paragraphs[-1].append("\t")
+            elif tag in (_BR, _CR):
+                paragraphs[-1].append("\n")
+
+            if tag == _P:
+                text = "".join(paragraphs.pop())
+                if fallback:
+                    pass
+                elif cells:
+                    cells[-1]["paragraphs"].append(text)
+                elif text.strip():
+                    yield text.strip()
+                elem.clear()
+            elif tag == _VMERGE and cells:
+                # <w:vMerge/> or val="continue" continues the cell above; "restart" starts one
+                cells[-1]["continuation"] = elem.get(_VAL, "continue") == "continue"
+            elif tag == _TC:
+                cell = cells.pop()
+                text = "\n".join(cell["paragraphs"]).strip()
+                if text and not cell["continuation"] and not fallback:
+                    yield text
+                elem.clear()
+            elif tag == _TBL:
+                elem.clear()
+
+
+def extract_docx_text(file_bytes: bytes) -> Optional[str]:
+    text = "\n".join(iter_docx_text(file_bytes))
+    return text if text else None
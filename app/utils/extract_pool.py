@@ -0,0 +1,292 @@
+"""
+Resume text extraction in a pool of worker processes.
+
+PyMuPDF and python-docx parsing is CPU-bound and holds the GIL, so running it
+inside async endpoints serializes every upload on the event loop. Here it runs in
+a bounded ProcessPoolExecutor. Workers are spawned and warmed up at startup, so
+the first request does not pay for importing fitz. Each task has a timeout.
+Scanned pages are OCR'd here too, one task per page on fewer workers than the
+pool has (see pdf_ocr); they stop themselves at their deadline.
+A hung or crashed worker (malformed PDF) only takes down the pool, which is
+torn down and rebuilt, never the API process. Tasks lost with it are retried
+once on the new pool.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from app.core.logger import get_logger
+from app.utils.pdf_document import PdfDocument, cached_pdf, parse_pdf, pdf_cache
+from app.utils.pdf_ocr import (
+    OCR_BUDGET_GRACE_SECONDS, OCR_BUDGET_SECONDS, merge_ocr_text, ocr_available, ocr_cache, ocr_page, page_content_key, pages_needing_ocr,
+)
+from app.utils.pdf_utils import extract_resume_text, is_pdf
+
+logger = get_logger(__name__)
+
+EXTRACT_POOL_WORKERS = int(os.getenv("EXTRACT_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "20"))
+# OCR pages in flight at once; below the worker count so text extraction is never starved
+EXTRACT_OCR_WORKERS = int(os.getenv("EXTRACT_OCR_WORKERS", str(max(1, EXTRACT_POOL_WORKERS - 1))))
+EXTRACT_POOL_MAX_TASKS_PER_CHILD = int(os.getenv("EXTRACT_POOL_MAX_TASKS_PER_CHILD", "500"))
+
+
+def _warm_worker() -> None:
+    # Runs once in each worker process: import the parsers before the first task arrives
+    import fitz  # noqa: F401
+    import docx  # noqa: F401
+
+
+def _ping() -> int:
+    time.sleep(0.05)  # long enough that each ping lands on a different worker
+    return os.getpid()
+
+
+def _extract(file_bytes: bytes, content_type: str, filename: str) -> str:
+    return extract_resume_text(file_bytes, content_type, filename) or ""
+
+
+class ExtractionPool:
+    """
+    No more than `workers` tasks are handed to the executor at a time, so every
+    submitted task starts at once and its timeout measures parsing, not queueing.
+    Further callers wait on a semaphore instead of piling file bytes into the
+    executor's queue. With workers=0 extraction runs in a thread instead.
+    """
+
+    def __init__(self, workers: int = EXTRACT_POOL_WORKERS, timeout: float = EXTRACT_TIMEOUT_SECONDS,
+                 ocr_workers: int = EXTRACT_OCR_WORKERS):
+        self.workers = workers
+        self.timeout = timeout
+        self.ocr_workers = max(1, min(ocr_workers, workers - 1))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._ocr_slots: Optional[asyncio.Semaphore] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.completed = 0
+        self.timeouts = 0
+        self.crashes = 0
+        self.restarts = 0
+        self.in_flight = 0
+        self.ocr_pages = 0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_worker,
+            max_tasks_per_child=EXTRACT_POOL_MAX_TASKS_PER_CHILD,
+        )
+
+    async def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._slots = asyncio.Semaphore(max(self.workers, 1))
+            self._ocr_slots = asyncio.Semaphore(self.ocr_workers)
+            self._lock = asyncio.Lock()
+        if self.workers <= 0 or self._executor is not None:
+            return
+        async with self._lock:
+            if self._executor is None:
+                self._executor = self._new_executor()
+                try:
+                    pids = await asyncio.gather(*(
+                        loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)
+                    ))
+                except Exception:
+                    logger.exception("Extraction pool failed to start; extracting in threads instead")
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                    self._executor, self.workers = None, 0
+                    return
+                logger.info(f"Extraction pool ready: {len(set(pids))} worker processes")
+
+    async def stop(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _restart(self, broken: ProcessPoolExecutor, reason: str) -> None:
+        async with self._lock:
+            if self._executor is not broken:
+                return  # another caller already replaced it
+            logger.warning(f"Restarting extraction pool: {reason}")
+            self.restarts += 1
+            # A hung worker ignores cancellation; terminating the processes is the only way out
+            for process in list((getattr(broken, "_processes", None) or {}).values()):
+                process.terminate()
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+
+    async def run(self, fn: Callable, *args, label: str = "", deadline: Optional[float] = None):
+        """
+        fn(*args) in a worker process; fn and args must be picklable. Raises
+        asyncio.TimeoutError when it runs past the timeout, or BrokenProcessPool when
+        it kills its worker twice in a row.
+
+        A task that runs past the timeout is assumed hung, and the pool is restarted to
+        get rid of it. With a deadline (loop time) the task is expected to stop itself
+        (ocr_page does): it gets whatever is left of the deadline once a worker is free,
+        and missing it raises without restarting the pool. Its slot stays taken until
+        the worker actually returns.
+        """
+        await self.start()
+        if self.workers <= 0:
+            return await asyncio.wait_for(asyncio.to_thread(fn, *args), self._timeout(deadline))
+
+        await self._slots.acquire()
+        self.in_flight += 1
+        holds_slot = True
+        try:
+            for attempt in (1, 2):
+                executor = self._executor
+                try:
+                    timeout = self._timeout(deadline)
+                    if timeout <= 0:
+                        raise asyncio.TimeoutError()
+                    future = self._loop.run_in_executor(executor, fn, *args)
+                    done, _ = await asyncio.wait({future}, timeout=timeout)
+                    if not done:
+                        raise asyncio.TimeoutError()
+                    result = future.result()
+                    self.completed += 1
+                    return result
+                except asyncio.TimeoutError:
+                    self.timeouts += 1
+                    if timeout <= 0:
+                        raise
+                    if deadline is None:
+                        await self._restart(executor, f"task timed out ({label or fn.__name__})")
+                    else:
+                        logger.warning(f"{label or fn.__name__} missed its deadline; its worker stays busy until it returns")
+                        holds_slot = False
+                        future.add_done_callback(lambda _: self._release_slot())
+                    raise
+                except BrokenProcessPool:
+                    # The worker died (segfault, OOM kill) or the pool was restarted under us
+                    self.crashes += 1
+                    await self._restart(executor, f"worker died ({label or fn.__name__})")
+                    if attempt == 2:
+                        raise
+        finally:
+            if holds_slot:
+                self._release_slot()
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._slots.release()
+
+    def _timeout(self, deadline: Optional[float]) -> float:
+        if deadline is None:
+            return self.timeout
+        return deadline - asyncio.get_running_loop().time()
+
+    async def load_pdf(self, file_bytes: bytes, label: str = "", sha256: Optional[str] = None) -> Optional[PdfDocument]:
+        """
+        The parsed document model, from the in-process cache or parsed in a worker and
+        cached here, so later converters of the same upload skip parsing. None if unreadable.
+        """
+        sha, document = cached_pdf(file_bytes, sha256)
+        if document is not None:
+            return document
+        try:
+            document = await self.run(parse_pdf, file_bytes, sha, label=label)
+        except asyncio.TimeoutError:
+            logger.error(f"Parsing {label} timed out after {self.timeout}s")
+            return None
+        except BrokenProcessPool:
+            logger.error(f"Parsing {label} crashed the worker twice; giving up")
+            return None
+        except Exception as e:
+            logger.warning(f"Could not parse PDF {label}: {e}")
+            return None
+        pdf_cache.set(sha, document)
+        return document
+
+    async def ocr_text(self, file_bytes: bytes, document: PdfDocument, label: str = "") -> str:
+        """
+        document.text() with pages lacking a text layer OCR'd, one worker per page and
+        at most EXTRACT_OCR_WORKERS pages at once, so a scanned resume leaves workers
+        for ordinary extraction. Pages not done within OCR_BUDGET_SECONDS are dropped;
+        cached pages cost nothing.
+        Each page's tesseract is killed at the deadline, so workers are free again
+        by the time this returns.
+        """
+        pages = pages_needing_ocr(document)
+        if not pages or not ocr_available():
+            return document.text()
+
+        texts, keys = {}, {}
+        for page in pages:
+            key = page_content_key(document, page)
+            cached = ocr_cache.get(key)
+            if cached is None:
+                keys[page.number] = key
+            else:
+                texts[page.number] = cached
+        if keys:
+            # The worker stops tesseract at `deadline`; the grace covers its return before the pool kills it
+            deadline = time.time() + OCR_BUDGET_SECONDS
+            loop_deadline = asyncio.get_running_loop().time() + OCR_BUDGET_SECONDS + OCR_BUDGET_GRACE_SECONDS
+            numbers = list(keys)
+
+            async def ocr(number: int) -> str:
+                async with self._ocr_slots:
+                    return await self.run(
+                        ocr_page, file_bytes, number, deadline, label=f"{label} p{number} OCR", deadline=loop_deadline,
+                    )
+
+            results = await asyncio.gather(*(ocr(number) for number in numbers), return_exceptions=True)
+            skipped = 0
+            for number, result in zip(numbers, results):
+                if isinstance(result, BaseException):
+                    if isinstance(result, asyncio.TimeoutError):
+                        skipped += 1
+                    else:
+                        logger.warning(f"OCR of {label} page {number} failed: {result!r}")
+                    continue
+                texts[number] = result
+                ocr_cache.set(keys[number], result)
+                self.ocr_pages += 1
+            if skipped:
+                logger.warning(f"OCR of {label} ran past {OCR_BUDGET_SECONDS}s; skipped {skipped} pages")
+        return merge_ocr_text(document, texts)
+
+    async def extract(self, file_bytes: bytes, content_type: str, filename: str, sha256: Optional[str] = None) -> str:
+        """Same contract as pdf_utils.extract_resume_text: the text, or "" when it could not be extracted."""
+        if is_pdf(content_type, filename):
+            document = await self.load_pdf(file_bytes, label=filename, sha256=sha256)
+            return await self.ocr_text(file_bytes, document, label=filename) if document else ""
+        try:
+            return await self.run(_extract, file_bytes, content_type, filename, label=filename)
+        except asyncio.TimeoutError:
+            logger.error(f"Extraction of {filename} timed out after {self.timeout}s")
+        except BrokenProcessPool:
+            logger.error(f"Extraction of {filename} crashed the worker twice; giving up")
+        return ""
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "completed": self.completed,
+            "timeouts": self.timeouts,
+            "crashes": self.crashes,
+            "restarts": self.restarts,
+            "ocr_pages": self.ocr_pages,
+            "ocr_cache": ocr_cache.stats(),
+        }
+
+
+extraction_pool = ExtractionPool()
+
+
+async def extract_resume_text_async(
+    file_bytes: bytes, content_type: str, filename: str, sha256: Optional[str] = None,
+) -> str:
+    return await extraction_pool.extract(file_bytes, content_type, filename, sha256)
@@ -0,0 +1,191 @@
+"""
+Per-user BM25 index over Application.job_description, for ranking every saved
+application against one resume without an LLM call per JD.
+
+Each user's index is an inverted index (term -> {application_id: tf}) kept in
+process memory and updated incrementally by the application add/update/delete
+endpoints. Before every query it is reconciled with the database using only
+(id, updated_at) pairs, so edits made through another worker process are
+picked up without a rebuild. Scoring gathers the postings of the resume's terms
+into flat NumPy arrays and accumulates BM25 contributions with np.add.at.
+"""
+import math
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils.keyword_scorer import STOPWORDS, tokenize
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_INDEXED_USERS = 1000
+
+
+def index_terms(text: str) -> List[str]:
+    return [t for t in tokenize(text) if t not in STOPWORDS and len(t) > 1 and not t.isdigit()]
+
+
+class _UserIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.versions: Dict[int, object] = {}  # application_id -> updated_at
+        self.doc_len: Dict[int, int] = {}
+        self.doc_tf: Dict[int, Counter] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.total_len = 0
+
+    def upsert(self, app_id: int, text: str, version) -> None:
+        self.remove(app_id)
+        tf = Counter(index_terms(text))
+        if not tf:
+            return
+        self.doc_tf[app_id] = tf
+        self.doc_len[app_id] = sum(tf.values())
+        self.versions[app_id] = version
+        self.total_len += self.doc_len[app_id]
+        for term, count in tf.items():
+            self.postings.setdefault(term, {})[app_id] = count
+
+    def remove(self, app_id: int) -> None:
+        tf = self.doc_tf.pop(app_id, None)
+        self.versions.pop(app_id, None)
+        if tf is None:
+            return
+        self.total_len -= self.doc_len.pop(app_id)
+        for term in tf:
+            docs = self.postings[term]
+            docs.pop(app_id, None)
+            if not docs:
+                del self.postings[term]
+
+    def score(self, query_terms: List[str]) -> Tuple[List[int], np.ndarray]:
+        doc_ids = list(self.doc_len)
+        if not doc_ids:
+            return [], np.zeros(0)
+        row = {app_id: i for i, app_id in enumerate(doc_ids)}
+        n_docs = len(doc_ids)
+        avgdl = self.total_len / n_docs
+        lengths = np.fromiter((self.doc_len[a] for a in doc_ids), dtype=np.float64, count=n_docs)
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths / avgdl)
+
+        rows, tfs, idfs = [], [], []
+        for term in set(query_terms):
+            docs = self.postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            rows.extend(row[a] for a in docs)
+            tfs.extend(docs.values())
+            idfs.extend([idf] * len(docs))
+
+        scores = np.zeros(n_docs)
+        if rows:
+            rows_a = np.asarray(rows)
+            tf_a = np.asarray(tfs, dtype=np.float64)
+            contrib = np.asarray(idfs) * tf_a * (BM25_K1 + 1) / (tf_a + norm[rows_a])
+            np.add.at(scores, rows_a, contrib)
+        return doc_ids, scores
+
+
+class JobDescriptionIndex:
+    """Process-wide registry of per-user indexes, LRU-bounded to MAX_INDEXED_USERS users."""
+
+    def __init__(self, max_users: int = MAX_INDEXED_USERS):
+        self.max_users = max_users
+        self._users: "OrderedDict[int, _UserIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _user(self, user_id: int, create: bool = True) -> Optional[_UserIndex]:
+        with self._lock:
+            index = self._users.get(user_id)
+            if index is not None:
+                self._users.move_to_end(user_id)
+            elif create:
+                index = self._users[user_id] = _UserIndex()
+                while len(self._users) > self.max_users:
+                    self._users.popitem(last=False)
+            return index
+
+    # ---- hooks called by the applications router ----
+
+    def upsert(self, application: models.Application) -> None:
+        index = self._user(application.user_id, create=False)
+        if index is None:
+            return  # built lazily on the user's first ranking request
+        with index.lock:
+            if application.job_description:
+                index.upsert(application.id, application.job_description, application.updated_at)
+            else:
+                index.remove(application.id)
+
+    def remove(self, user_id: int, application_id: int) -> None:
+        index = self._user(user_id, create=False)
+        if index is not None:
+            with index.lock:
+                index.remove(application_id)
+
+    # ---- queries ----
+
+    def _sync(self, db: Session, user_id: int, index: _UserIndex) -> None:
+        """Bring the index in line with the DB, loading only new or changed JDs."""
+        current = dict(db.query(models.Application.id, models.Application.updated_at).filter(
+            models.Application.user_id == user_id,
+            models.Application.job_description.isnot(None),
+            models.Application.job_description != "",
+        ).all())
+        for app_id in set(index.versions) - set(current):
+            index.remove(app_id)
+        changed = [a for a, version in current.items() if index.versions.get(a, object()) != version]
+        if changed:
+            rows = db.query(
+                models.Application.id, models.Application.job_description, models.Application.updated_at
+            ).filter(models.Application.id.in_(changed)).all()
+            for app_id, text, version in rows:
+                index.upsert(app_id, text, version)
+
+    def rank(self, db: Session, user_id: int, resume_text: str, limit: Optional[int] = None) -> List[dict]:
+        """
+        BM25 rank of the user's applications against a resume.
+        Returns [{"application_id", "score", "similarity", "matched_terms"}] best first;
+        similarity is the score relative to the best match (0-100).
+        """
+        index = self._user(user_id)
+        query_terms = index_terms(resume_text)
+        with index.lock:
+            self._sync(db, user_id, index)
+            doc_ids, scores = index.score(query_terms)
+            if not doc_ids:
+                return []
+            order = np.argsort(-scores, kind="stable")
+            if limit:
+                order = order[:limit]
+            best = float(scores[order[0]]) or 1.0
+            query_set = set(query_terms)
+            results = []
+            for i in order:
+                app_id = doc_ids[i]
+                tf = index.doc_tf[app_id]
+                matched = sorted(query_set.intersection(tf), key=lambda t: (-tf[t], t))[:10]
+                results.append({
+                    "application_id": app_id,
+                    "score": round(float(scores[i]), 4),
+                    "similarity": int(round(float(scores[i]) / best * 100)),
+                    "matched_terms": matched,
+                })
+            return results
+
+    def stats(self) -> dict:
+        with self._lock:
+            users = list(self._users.values())
+        return {
+            "users": len(users),
+            "documents": sum(len(u.doc_len) for u in users),
+            "terms": sum(len(u.postings) for u in users),
+        }
+
+
+jd_index = JobDescriptionIndex()
@@ -0,0 +1,117 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+_WHITESPACE = " \t\r\n"
+
+
+class IncrementalJSONParser:
+    """
+    Parses a single JSON object that arrives in arbitrary chunks (e.g. LLM token stream).
+
+    feed() returns every value that became complete in that chunk as (path, value)
+    tuples, for paths between 1 and `max_depth` levels deep. With the analysis schema
+    that means `ats_score` is reported as soon as its digits end, and each entry of
+    `suggestions` as soon as its closing quote arrives, long before the object closes.
+
+    Text before the first "{" (stray prose, markdown fences) is ignored, as is anything
+    after the root object closes.
+    """
+
+    def __init__(self, max_depth: int = 2):
+        self.max_depth = max_depth
+        self._text = ""
+        self._pos = 0
+        self._stack: List[dict] = []
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._scalar_start: Optional[int] = None
+        self.done = False
+        self.result: Optional[dict] = None
+
+    def feed(self, chunk: str) -> List[Tuple[list, Any]]:
+        if self.done or not chunk:
+            return []
+
+        self._text += chunk
+        events: List[Tuple[list, Any]] = []
+        text = self._text
+        i = self._pos
+
+        while i < len(text) and not self.done:
+            ch = text[i]
+
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._stack.append(self._frame("obj", i))
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    frame = self._stack[-1]
+                    if frame["kind"] == "obj" and frame["expect_key"]:
+                        frame["key"] = json.loads(text[self._string_start:i + 1])
+                    else:
+                        self._complete(self._string_start, i + 1, events)
+                i += 1
+                continue
+
+            if self._scalar_start is not None and (ch in _WHITESPACE or ch in ",}]"):
+                self._complete(self._scalar_start, i, events)
+                self._scalar_start = None
+
+            if ch in _WHITESPACE:
+                pass
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._stack.append(self._frame("obj" if ch == "{" else "arr", i))
+            elif ch in "}]":
+                frame = self._stack.pop()
+                if self._stack:
+                    self._complete(frame["start"], i + 1, events)
+                else:
+                    self.result = json.loads(text[frame["start"]:i + 1])
+                    self.done = True
+            elif ch == ":":
+                self._stack[-1]["expect_key"] = False
+            elif ch == ",":
+                frame = self._stack[-1]
+                if frame["kind"] == "obj":
+                    frame["expect_key"] = True
+                else:
+                    frame["index"] += 1
+            elif self._scalar_start is None:
+                self._scalar_start = i
+
+            i += 1
+
+        self._pos = i
+        return events
+
+    def close(self) -> dict:
+        """Return the fully parsed object, or raise ValueError if the stream was incomplete."""
+        if not self.done:
+            raise ValueError("JSON stream ended before the root object was complete")
+        return self.result
+
+    @staticmethod
+    def _frame(kind: str, start: int) -> dict:
+        return {"kind": kind, "start": start, "key": None, "index": 0, "expect_key": kind == "obj"}
+
+    def _path(self) -> list:
+        return [f["key"] if f["kind"] == "obj" else f["index"] for f in self._stack]
+
+    def _complete(self, start: int, end: int, events: List[Tuple[list, Any]]) -> None:
+        path = self._path()
+        if 1 <= len(path) <= self.max_depth:
+            events.append((path, json.loads(self._text[start:end])))
@@ -0,0 +1,228 @@
+"""
+Local implementation of the deterministic keyword-matching rules that the
+analysis prompt used to ask the LLM to follow.
+
+    normalize -> extract JD keywords -> match each keyword against the resume
+    (exact phrase 1.0, token subset 1.0, >=60% token overlap 0.5, synonym 0.5)
+    -> keyword_match_score = floor(sum(weights) / len(keywords) * 100)
+
+Token overlap for all keywords is computed at once as a (keywords x vocabulary)
+matrix product, so scoring a JD costs milliseconds instead of an LLM round trip.
+"""
+import math
+import re
+from typing import Dict, List
+
+import numpy as np
+
+SYNONYMS: Dict[str, str] = {
+    "js": "javascript",
+    "node": "node.js",
+    "reactjs": "react",
+    "aws": "amazon web services",
+    "postgres": "postgresql",
+    "sql": "sql",
+    "csharp": "c#",
+    "cpp": "c++",
+}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "our", "the", "their", "this", "to", "we", "will", "with", "you", "your",
+    "etc", "other", "such", "like", "using", "use", "including", "plus", "strong", "good",
+    "excellent", "solid", "proven", "ability", "experience", "knowledge", "understanding",
+    "familiarity", "proficiency", "working", "work", "skills", "skill", "must", "should",
+    "preferred", "required", "requirements", "responsibilities", "have", "has", "who",
+}
+
+# Leading filler stripped from list items ("experience with Docker" -> "docker")
+_LEAD_FILLER_RE = re.compile(
+    r"^(?:(?:strong|solid|good|excellent|proven|hands-on|deep|working|basic|advanced)\s+)*"
+    r"(?:(?:experience|knowledge|understanding|familiarity|proficiency|expertise)\s+(?:with|of|in)\s+)?"
+    r"(?:(?:and|or|e\.g\.|i\.e\.|including|such as)\s+)*"
+)
+_TOKEN_RE = re.compile(r"\.?[a-z0-9+#](?:[a-z0-9+#.\-]*[a-z0-9+#])?")
+_SPACE_RE = re.compile(r"\s+")
+_QUOTED_RE = re.compile(r"[\"“”]([^\"“”\n]{2,60})[\"“”]")
+_PAREN_RE = re.compile(r"\(([^()\n]{2,120})\)")
+_CAPITALIZED_RE = re.compile(r"\b[A-Z][\w+#]*(?:\.\w+)*(?:[ \-][A-Z][\w+#]*(?:\.\w+)*)+")
+_TECH_TOKEN_RE = re.compile(
+    r"(?<![\w./])(?:[A-Z]{2,}(?:/[A-Z]{2,})+|\.[A-Z][A-Za-z]+|[A-Za-z][\w]*[+#]+|\.?[A-Za-z]+\.[A-Za-z]+(?:\.[A-Za-z]+)*|"
+    r"[A-Z]{2,}[a-z]*|[A-Z][a-z]+[A-Z]\w*)(?![\w])"
+)
+_YEARS_RE = re.compile(r"\b\d+\s*\+?\s*(?:-\s*\d+\s*)?\+?\s*years?(?:\s+of\s+experience)?\b", re.I)
+_EDUCATION_RE = re.compile(
+    r"\b(?:bachelor|master|associate|doctorate|phd|b\.?sc|m\.?sc|mba)[’']?s?\b[^.;\n]{0,120}", re.I
+)
+_LIST_SPLIT_RE = re.compile(r"[,;•·|]|\band\b|\bor\b")
+_EDUCATION_END_RE = re.compile(r",|\bor\b|\bwith\b|\band\b", re.I)
+
+MAX_KEYWORD_TOKENS = 5
+
+
+def normalize(text: str) -> str:
+    """Lowercase, drop punctuation except tech characters (+ # . -), collapse spaces."""
+    return " ".join(tokenize(text))
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _skills():
+    from app.utils.skill_matcher import get_skill_matcher  # skill_matcher builds on this module's tokenizer
+    return get_skill_matcher()
+
+
+def _clean_item(item: str) -> str:
+    item = _LEAD_FILLER_RE.sub("", _SPACE_RE.sub(" ", item.strip().lower()))
+    tokens = tokenize(item)
+    while tokens and tokens[0] in STOPWORDS:
+        tokens.pop(0)
+    while tokens and tokens[-1] in STOPWORDS:
+        tokens.pop()
+    if not tokens or len(tokens) > MAX_KEYWORD_TOKENS:
+        return ""
+    if all(t in STOPWORDS or t.isdigit() for t in tokens):
+        return ""
+    return " ".join(tokens)
+
+
+def extract_jd_keywords(job_description: str) -> List[str]:
+    """
+    Deterministic JD keyword extraction: quoted tokens, parenthesized items,
+    comma/semicolon lists, capitalized multi-word phrases, tech tokens
+    (C++, Node.js, PostgreSQL), skill dictionary hits ("machine learning"),
+    years-of-experience and education phrasing.
+    Only text present in the JD is returned; order follows first appearance.
+    """
+    if not job_description:
+        return []
+
+    found: Dict[str, int] = {}
+
+    def add(candidate: str, pos: int, clean: bool = True):
+        kw = _clean_item(candidate) if clean else normalize(candidate)
+        if kw and kw not in found:
+            found[kw] = pos
+
+    for m in _YEARS_RE.finditer(job_description):
+        add(m.group(), m.start(), clean=False)
+    for m in _EDUCATION_RE.finditer(job_description):
+        add(_EDUCATION_END_RE.split(m.group())[0], m.start(), clean=False)
+    for m in _QUOTED_RE.finditer(job_description):
+        add(m.group(1), m.start())
+    for m in _PAREN_RE.finditer(job_description):
+        for part in _LIST_SPLIT_RE.split(m.group(1)):
+            add(part, m.start())
+    for m in _CAPITALIZED_RE.finditer(job_description):
+        add(m.group(), m.start())
+    for m in _TECH_TOKEN_RE.finditer(job_description):
+        add(m.group(), m.start())
+    for m in _skills().scan(job_description, offsets=True):
+        add(m.form, m.offset, clean=False)
+
+    # Comma-separated lists: a line/sentence with at least two separators
+    offset = 0
+    for sentence in re.split(r"(?<=[.:\n])\s", job_description):
+        if len(re.findall(r"[,;•|]", sentence)) >= 2:
+            body = sentence.split(":", 1)[-1]
+            for part in _LIST_SPLIT_RE.split(body):
+                add(part, offset)
+        offset += len(sentence) + 1
+
+    return [kw for kw, _ in sorted(found.items(), key=lambda kv: kv[1])]
+
+
+def _synonym_forms(keyword: str) -> List[str]:
+    forms = set()
+    for short, long in SYNONYMS.items():
+        if short == long:
+            continue
+        if keyword == short:
+            forms.add(long)
+        elif keyword == long:
+            forms.add(short)
+        else:
+            tokens = keyword.split()
+            if short in tokens:
+                forms.add(" ".join(long if t == short else t for t in tokens))
+            if long in tokens:
+                forms.add(" ".join(short if t == long else t for t in tokens))
+    return sorted(forms)
+
+
+def score_keywords(resume_text: str, job_description: str) -> dict:
+    """
+    Returns {"keyword_match_score", "missing_keywords", "matched_keywords", "jd_keywords"}
+    following the deterministic matching rules.
+    """
+    keywords = extract_jd_keywords(job_description)
+    if not keywords:
+        return {"keyword_match_score": 0, "missing_keywords": [], "matched_keywords": [], "jd_keywords": []}
+
+    resume_tokens = tokenize(resume_text)
+    resume_norm = f" {' '.join(resume_tokens)} "
+    resume_vocab = set(resume_tokens)
+
+    # Vocabulary over JD keyword tokens only; the resume is projected onto it
+    vocab: Dict[str, int] = {}
+    kw_tokens = [kw.split() for kw in keywords]
+    for tokens in kw_tokens:
+        for t in tokens:
+            vocab.setdefault(t, len(vocab))
+
+    K = np.zeros((len(keywords), len(vocab)), dtype=np.float32)
+    for row, tokens in enumerate(kw_tokens):
+        K[row, [vocab[t] for t in tokens]] = 1.0
+    r = np.fromiter((t in resume_vocab for t in vocab), dtype=np.float32, count=len(vocab))
+
+    overlap = (K @ r) / K.sum(axis=1)
+    exact = np.fromiter((f" {kw} " in resume_norm for kw in keywords), dtype=bool, count=len(keywords))
+    subset = overlap >= 1.0
+    partial = overlap >= 0.6
+    # Synonym: another spelling of the same dictionary skill ("k8s" for "kubernetes") is in the resume
+    skills = _skills()
+    resume_skills = {m.skill for m in skills.scan(resume_text)}
+    synonym = np.fromiter(
+        (
+            any(f" {s} " in resume_norm for s in _synonym_forms(kw)) or skills.canonical(kw) in resume_skills
+            for kw in keywords
+        ),
+        dtype=bool, count=len(keywords),
+    )
+
+    weights = np.where(exact | subset, 1.0, np.where(partial | synonym, 0.5, 0.0))
+    score = math.floor(weights.sum() / len(keywords) * 100)
+
+    return {
+        "keyword_match_score": int(score),
+        "missing_keywords": [kw for kw, w in zip(keywords, weights) if w == 0],
+        "matched_keywords": [kw for kw, w in zip(keywords, weights) if w > 0],
+        "jd_keywords": keywords,
+    }
+
+
+def clamp_quality(resume_quality) -> int:
+    """The model's resume_quality as an int in 0-100; anything non-numeric counts as 0."""
+    try:
+        quality = int(float(resume_quality or 0))
+    except (TypeError, ValueError):
+        return 0
+    return max(0, min(100, quality))
+
+
+def combine_ats_score(keyword_match_score: int, resume_quality) -> int:
+    """ats_score = floor(0.7 * keyword_match_score + 0.3 * resume_quality)."""
+    return int(math.floor(0.7 * keyword_match_score + 0.3 * clamp_quality(resume_quality)))
+
+
+def failed_analysis(local: dict, message: str) -> dict:
+    """Analysis result when the LLM is unavailable: the local keyword score stands in for ats_score."""
+    return {
+        "ats_score": local["keyword_match_score"],
+        "keyword_match_score": local["keyword_match_score"],
+        "missing_keywords": local["missing_keywords"],
+        "suggestions": [message],
+        "failed": True,
+    }
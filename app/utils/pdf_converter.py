@@ -1,58 +1,12 @@
-import subprocess
-import tempfile
-import os
-import fitz 
 import base64
 import html
 import statistics
 import re
+from typing import Dict, Iterator, Optional, Tuple
 
+from app.utils.pdf_document import PdfDocument, PdfPage, load_pdf
 
 
-
-PDF2HTMLEX_PATH =  r"c:\ProgramData\pdf2htmlEX\pdf2htmlEX.exe"
-def pdf_to_html_preview(file_bytes: bytes) -> str:
-    import tempfile, os, subprocess
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-        tmp_pdf.write(file_bytes)
-        tmp_pdf_path = tmp_pdf.name
-
-    tmp_dir = os.path.dirname(tmp_pdf_path)
-    tmp_html_name = os.path.splitext(os.path.basename(tmp_pdf_path))[0] + ".html"
-    tmp_html_path = os.path.join(tmp_dir, tmp_html_name)
-
-    try:
-        result = subprocess.run(
-            [
-                PDF2HTMLEX_PATH,
-                "--embed", "cfijo",
-                "--dest-dir", tmp_dir,
-                tmp_pdf_path,
-                tmp_html_name,  # only filename, not full path
-            ],
-            capture_output=True,
-            text=True
-        )
-
-        if result.returncode != 0:
-            raise RuntimeError(
-                f"pdf2htmlEX failed (code {result.returncode}):\n"
-                f"STDOUT:\n{result.stdout}\n\nSTDERR:\n{result.stderr}"
-            )
-
-        with open(tmp_html_path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
-
-    finally:
-        # Always clean up, even if it fails
-        if os.path.exists(tmp_pdf_path):
-            os.remove(tmp_pdf_path)
-        if os.path.exists(tmp_html_path):
-            os.remove(tmp_html_path)
-
-import base64
-
 # def pdf_to_editable_html(file_bytes: bytes) -> str:
 #     """Convert PDF to editable HTML (text + images) for TipTap."""
 #     doc = fitz.open(stream=file_bytes, filetype="pdf")
@@ -200,144 +154,195 @@ def _pt_to_px(pt: float) -> int:
 def _escape(t: str) -> str:
     return html.escape(t).replace("\n", "<br/>")
 
-def pdf_to_editable_html(file_bytes: bytes) -> str:
+def _collect_spans(page: PdfPage) -> list:
+    spans = []
+    for line in page.lines():
+        line_y = line.bbox[1]
+        for span in line.spans:
+            text = span.text.strip()
+            if not text:
+                continue
+            font = span.font.lower()
+            spans.append({
+                "text": text,
+                "size": span.size,
+                "font": font,
+                "y": line_y,
+                "x": span.bbox[0],
+                "x1": span.bbox[2],
+                "bold": "bold" in font or "black" in font,
+                "italic": "italic" in font or "oblique" in font,
+            })
+    return spans
+
+
+def page_layout(page: PdfPage) -> dict:
     """
-    Convert PDF to structured HTML (close to original).
-    Preserves headings, paragraphs, lists, bold/italic, spacing, and images.
+    Layout analysis for one parsed page, shared by the HTML converter and the resume sectioner.
+
+    Spans are grouped into lines (same baseline within 0.6 x median font size),
+    lines into paragraphs (vertical gap above 1.2 x median), and a paragraph is a
+    heading when its font is at least 1.25 x the page median and it is short.
+    Returns {"median_size", "width", "paragraphs": [{"lines", "max_size", "is_heading"}]},
+    each line being {"html", "plain", "is_bullet", "size", "bold", "x", "x1", "y", "spans"}.
     """
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    all_pages = []
+    spans = _collect_spans(page)
+    sizes = [s["size"] for s in spans]
+    median_size = statistics.median(sizes) if sizes else 12.0
+
+    # --- Group into lines ---
+    lines = []
+    current_line = {"y": None, "spans": []}
+    for s in sorted(spans, key=lambda s: (s["y"], s["x"])):
+        if current_line["y"] is not None and abs(s["y"] - current_line["y"]) <= (median_size * 0.6):
+            current_line["spans"].append(s)
+        else:
+            current_line = {"y": s["y"], "spans": [s]}
+            lines.append(current_line)
+
+    # --- Group into paragraphs ---
+    paragraphs = []
+    cur_para = {"lines": [], "max_size": 0}
+    prev_y = None
+    for ln in lines:
+        span_htmls = []
+        for s in ln["spans"]:
+            t = _escape(s["text"])
+            if s["bold"]: t = f"<strong>{t}</strong>"
+            if s["italic"]: t = f"<em>{t}</em>"
+            span_htmls.append(t)
+
+        plain_text = "".join([sp["text"] for sp in ln["spans"]]).strip()
+        line = {
+            "html": " ".join(span_htmls).strip(),
+            "plain": plain_text,
+            "is_bullet": bool(_bullet_re.match(plain_text)),
+            "size": max(sp["size"] for sp in ln["spans"]),
+            "bold": all(sp["bold"] for sp in ln["spans"]),
+            "x": ln["spans"][0]["x"],
+            "x1": ln["spans"][-1]["x1"],
+            "y": ln["y"],
+            "spans": ln["spans"],
+        }
+
+        if prev_y is not None and ln["y"] - prev_y > (median_size * 1.2):  # new paragraph
+            paragraphs.append(cur_para)
+            cur_para = {"lines": [], "max_size": 0}
+        cur_para["lines"].append(line)
+        cur_para["max_size"] = max(cur_para["max_size"], line["size"])
+        prev_y = ln["y"]
 
-    for page_num, page in enumerate(doc, start=1):
-        page_dict = page.get_text("dict")
-        spans = []
-        sizes = []
+    if cur_para["lines"]:
+        paragraphs.append(cur_para)
 
-        # --- Collect spans ---
-        for block in page_dict.get("blocks", []):
-            if block.get("type") != 0:
-                continue
-            for line in block.get("lines", []):
-                line_y = line.get("bbox", [0, 0, 0, 0])[1]
-                for span in line.get("spans", []):
-                    text = span.get("text", "").strip()
-                    if not text:
-                        continue
-                    font = span.get("font", "").lower()
-                    size = span.get("size", 12.0)
-                    bbox = span.get("bbox", [0, 0, 0, 0])
-                    is_bold = "bold" in font or "black" in font
-                    is_italic = "italic" in font or "oblique" in font
-
-                    spans.append({
-                        "text": text,
-                        "size": size,
-                        "font": font,
-                        "y": line_y,
-                        "x": bbox[0],
-                        "bold": is_bold,
-                        "italic": is_italic,
-                    })
-                    sizes.append(size)
-
-        # If no text, maybe images only
-        if not spans:
-            imgs_html = []
-            for img_idx, img in enumerate(page.get_images(full=True)):
-                xref = img[0]
-                base_image = doc.extract_image(xref)
-                b64 = base64.b64encode(base_image["image"]).decode("utf-8")
-                imgs_html.append(
-                    f'<img src="data:image/{base_image["ext"]};base64,{b64}" '
-                    f'alt="img-{page_num}-{img_idx}" style="max-width:100%;" />'
-                )
-            all_pages.append(f"<div class='pdf-page' data-page='{page_num}'>{''.join(imgs_html)}</div>")
-            continue
+    for para in paragraphs:
+        max_sz = para["max_size"] or median_size
+        text_length = sum(len(l["plain"]) for l in para["lines"])
+        para["is_heading"] = (max_sz >= median_size * 1.25) and (text_length < 200)
+
+    return {"median_size": median_size, "width": page.width, "paragraphs": paragraphs}
+
+
+def document_layout(document: PdfDocument) -> list:
+    """page_layout() for every page of a parsed PDF."""
+    return [page_layout(page) for page in document.pages]
 
-        # --- Stats for font sizes ---
-        median_size = statistics.median(sizes) if sizes else 12.0
-        spans_sorted = sorted(spans, key=lambda s: (s["y"], s["x"]))
-
-        # --- Group into lines ---
-        lines = []
-        current_line = {"y": None, "spans": []}
-        for s in spans_sorted:
-            if current_line["y"] is None:
-                current_line = {"y": s["y"], "spans": [s]}
-                lines.append(current_line)
-            else:
-                if abs(s["y"] - current_line["y"]) <= (median_size * 0.6):
-                    current_line["spans"].append(s)
-                else:
-                    current_line = {"y": s["y"], "spans": [s]}
-                    lines.append(current_line)
-
-        # --- Group into paragraphs ---
-        paragraphs = []
-        cur_para = {"lines": [], "max_size": 0}
-        prev_y = None
-        for ln in lines:
-            span_htmls = []
-            line_max_size = 0
-            for s in ln["spans"]:
-                t = _escape(s["text"])
-                if s["bold"]: t = f"<strong>{t}</strong>"
-                if s["italic"]: t = f"<em>{t}</em>"
-                span_htmls.append(t)
-                line_max_size = max(line_max_size, s["size"])
-
-            line_html = " ".join(span_htmls).strip()
-            plain_text = "".join([sp["text"] for sp in ln["spans"]]).strip()
-            is_bullet = bool(_bullet_re.match(plain_text))
-
-            if prev_y is None:
-                cur_para["lines"].append({"html": line_html, "is_bullet": is_bullet, "plain": plain_text})
-                cur_para["max_size"] = max(cur_para["max_size"], line_max_size)
-            else:
-                gap = ln["y"] - prev_y
-                if gap > (median_size * 1.2):  # new paragraph
-                    paragraphs.append(cur_para)
-                    cur_para = {"lines": [{"html": line_html, "is_bullet": is_bullet, "plain": plain_text}], "max_size": line_max_size}
-                else:
-                    cur_para["lines"].append({"html": line_html, "is_bullet": is_bullet, "plain": plain_text})
-                    cur_para["max_size"] = max(cur_para["max_size"], line_max_size)
-
-            prev_y = ln["y"]
-
-        if cur_para["lines"]:
-            paragraphs.append(cur_para)
 
-        # --- Render paragraphs ---
-        page_parts = []
-        for para in paragraphs:
-            max_sz = para["max_size"] or median_size
-            text_length = sum(len(l["plain"]) for l in para["lines"])
-            is_heading = (max_sz >= median_size * 1.25) and (text_length < 200)
-
-            if all(l["is_bullet"] for l in para["lines"]):
-                lis = [f"<li>{_bullet_re.sub('', l['html']).strip()}</li>" for l in para["lines"]]
-                page_parts.append("<ul>" + "".join(lis) + "</ul>")
-            elif is_heading:
-                px = _pt_to_px(max_sz)
-                heading_text = " ".join(l["html"] for l in para["lines"])
-                page_parts.append(f'<h2 style="font-size:{px}px;margin:4px 0;">{heading_text}</h2>')
-            else:
-                para_html = " ".join(l["html"] for l in para["lines"])
-                px = _pt_to_px(max_sz)
-                page_parts.append(f'<p style="font-size:{px}px;margin:4px 0;">{para_html}</p>')
-
-        # --- Images ---
-        imgs_html = []
-        for img_idx, img in enumerate(page.get_images(full=True)):
-            xref = img[0]
-            base_image = doc.extract_image(xref)
+def pdf_layout(file_bytes: bytes) -> list:
+    """page_layout() for every page of a PDF."""
+    return document_layout(load_pdf(file_bytes))
+
+
+def _page_images_html(document: PdfDocument, page: PdfPage, alt: str, style: str,
+                      image_urls: Optional[Dict[int, str]] = None) -> list:
+    """<img> tags for a page; by URL when image_urls (xref -> url) is given, else base64-inlined."""
+    imgs_html = []
+    for img_idx, xref in enumerate(page.image_xrefs):
+        base_image = document.images.get(xref)
+        if not base_image:
+            continue
+        if image_urls is not None and xref in image_urls:
+            src = image_urls[xref]
+        else:
             b64 = base64.b64encode(base_image["image"]).decode("utf-8")
-            imgs_html.append(
-                f'<img src="data:image/{base_image["ext"]};base64,{b64}" '
-                f'alt="pdf-image-{page_num}-{img_idx}" style="max-width:100%;margin:8px 0;" />'
-            )
+            src = f"data:image/{base_image['ext']};base64,{b64}"
+        imgs_html.append(f'<img src="{src}" alt="{alt}-{page.number}-{img_idx}" style="{style}" />')
+    return imgs_html
+
+
+def _page_html(document: PdfDocument, page: PdfPage, image_urls: Optional[Dict[int, str]] = None) -> str:
+    """One page of the editable HTML: headings, paragraphs, lists, bold/italic and images."""
+    page_num = page.number
+    layout = page_layout(page)
+
+    # If no text, maybe images only
+    if not layout["paragraphs"]:
+        imgs_html = _page_images_html(document, page, "img", "max-width:100%;", image_urls)
+        return f"<div class='pdf-page' data-page='{page_num}'>{''.join(imgs_html)}</div>"
+
+    median_size = layout["median_size"]
+
+    # --- Render paragraphs ---
+    page_parts = []
+    for para in layout["paragraphs"]:
+        max_sz = para["max_size"] or median_size
+
+        if all(l["is_bullet"] for l in para["lines"]):
+            lis = [f"<li>{_bullet_re.sub('', l['html']).strip()}</li>" for l in para["lines"]]
+            page_parts.append("<ul>" + "".join(lis) + "</ul>")
+        elif para["is_heading"]:
+            px = _pt_to_px(max_sz)
+            heading_text = " ".join(l["html"] for l in para["lines"])
+            page_parts.append(f'<h2 style="font-size:{px}px;margin:4px 0;">{heading_text}</h2>')
+        else:
+            para_html = " ".join(l["html"] for l in para["lines"])
+            px = _pt_to_px(max_sz)
+            page_parts.append(f'<p style="font-size:{px}px;margin:4px 0;">{para_html}</p>')
+
+    # --- Images ---
+    imgs_html = _page_images_html(document, page, "pdf-image", "max-width:100%;margin:8px 0;", image_urls)
+
+    return f"<div class='pdf-page' data-page='{page_num}'>{''.join(page_parts)}{''.join(imgs_html)}</div>"
 
-        all_pages.append(f"<div class='pdf-page' data-page='{page_num}'>{''.join(page_parts)}{''.join(imgs_html)}</div>")
 
-    doc.close()
-    return "<div class='pdf-document'>" + "\n".join(all_pages) + "</div>"
+def parse_page_range(spec: Optional[str], page_count: int) -> Tuple[int, int]:
+    """
+    "3" -> (3, 3), "2-5" -> (2, 5), "4-" -> (4, page_count), None/"" -> all pages.
+    Pages are 1-based and inclusive; the end is clamped to the page count.
+    Raises ValueError for malformed or out-of-range specs.
+    """
+    if not spec:
+        return 1, page_count
+    first, sep, last = spec.strip().partition("-")
+    start = int(first)
+    end = (int(last) if last.strip() else page_count) if sep else start
+    end = min(end, page_count)
+    if start < 1 or start > page_count or end < start:
+        raise ValueError(f"Page range {spec!r} is outside 1-{page_count}")
+    return start, end
+
+
+def iter_editable_html(document: PdfDocument, start: int = 1, end: Optional[int] = None,
+                       wrap: bool = True, image_urls: Optional[Dict[int, str]] = None) -> Iterator[str]:
+    """
+    pdf_to_editable_html one page at a time, for pages start..end (1-based, inclusive).
+    Each page is rendered only when the consumer asks for it, so the first page can be
+    sent before later pages exist. wrap=False leaves out the pdf-document wrapper, for
+    clients that append fetched page ranges to a document they already hold.
+    image_urls (xref -> url) references images instead of inlining them.
+    """
+    end = len(document.pages) if end is None else end
+    if wrap:
+        yield "<div class='pdf-document'>"
+    for page in document.pages[start - 1:end]:
+        yield ("\n" if page.number > start else "") + _page_html(document, page, image_urls)
+    if wrap:
+        yield "</div>"
+
+
+def pdf_to_editable_html(file_bytes: bytes) -> str:
+    """
+    Convert PDF to structured HTML (close to original).
+    Preserves headings, paragraphs, lists, bold/italic, spacing, and images.
+    """
+    return "".join(iter_editable_html(load_pdf(file_bytes)))
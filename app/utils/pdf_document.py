@@ -0,0 +1,145 @@
+"""
+Parse-once PDF document model.
+
+A PDF is opened once and every page walked once with page.get_text("dict"),
+capturing spans, lines, blocks, page geometry and embedded images. Plain text
+(pdf_utils), the editable HTML and layout (pdf_converter), and the overlay
+structure (pdf_overlay_extractor) are all derived from that model instead of
+re-parsing the bytes.
+
+Models are cached in-process by SHA-256 of the file, so the editor opened right
+after an analysis of the same upload reuses the parse. They are plain
+dataclasses and picklable, so the extraction pool can build them in a worker
+process and hand them back.
+"""
+import hashlib
+import os
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import fitz
+
+from app.utils.cache import TTLCache
+
+PDF_DOC_CACHE_SIZE = int(os.getenv("PDF_DOC_CACHE_SIZE", "32"))
+PDF_DOC_CACHE_TTL = int(os.getenv("PDF_DOC_CACHE_TTL", str(30 * 60)))
+PAGE_BREAK = "\n\f"  # between pages in extracted text, as pdftotext does
+
+
+@dataclass(slots=True)
+class PdfSpan:
+    text: str          # as in the PDF, unstripped
+    font: str
+    size: float
+    color: int
+    flags: int
+    bbox: Tuple[float, float, float, float]
+
+
+@dataclass(slots=True)
+class PdfLine:
+    bbox: Tuple[float, float, float, float]
+    spans: List[PdfSpan]
+
+    @property
+    def text(self) -> str:
+        return "".join(s.text for s in self.spans)
+
+
+@dataclass(slots=True)
+class PdfPage:
+    number: int        # 1-based
+    width: float
+    height: float
+    blocks: List[List[PdfLine]]  # text blocks, in reading order
+    image_xrefs: List[int]
+
+    def lines(self):
+        for block in self.blocks:
+            yield from block
+
+    def spans(self):
+        for block in self.blocks:
+            for line in block:
+                yield from line.spans
+
+    def text(self) -> str:
+        """Same output as page.get_text("text")."""
+        return "".join(f"{line.text}\n" for line in self.lines())
+
+
+@dataclass
+class PdfDocument:
+    sha256: str
+    pages: List[PdfPage]
+    images: Dict[int, Optional[dict]] = field(default_factory=dict)  # xref -> {"ext", "image"}
+    asset_ids: Optional[Dict[int, str]] = None  # xref -> asset store id, filled by asset_store
+
+    def text(self) -> str:
+        """
+        Non-empty page texts separated by PAGE_BREAK (what extract_text_from_pdf
+        returns); the form feed lets prompt_compactor find page headers and footers.
+        """
+        return PAGE_BREAK.join(t for t in (page.text().strip() for page in self.pages) if t)
+
+
+def file_sha256(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def _bbox(raw) -> Tuple[float, float, float, float]:
+    return tuple(raw or (0, 0, 0, 0))
+
+
+def parse_pdf(file_bytes: bytes, sha256: Optional[str] = None) -> PdfDocument:
+    """Single pass over the file. Raises whatever fitz raises on unreadable input."""
+    pages = []
+    images: Dict[int, Optional[dict]] = {}
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        for number, page in enumerate(doc, start=1):
+            blocks = []
+            for block in page.get_text("dict").get("blocks", []):
+                if block.get("type") != 0:
+                    continue
+                blocks.append([
+                    PdfLine(
+                        _bbox(line.get("bbox")),
+                        [
+                            PdfSpan(
+                                span.get("text", ""), span.get("font", ""), span.get("size", 12.0),
+                                span.get("color", 0), span.get("flags", 0), _bbox(span.get("bbox")),
+                            )
+                            for span in line.get("spans", [])
+                        ],
+                    )
+                    for line in block.get("lines", [])
+                ])
+
+            xrefs = [img[0] for img in page.get_images(full=True)]
+            for xref in xrefs:
+                if xref not in images:
+                    try:
+                        extracted = doc.extract_image(xref)
+                        images[xref] = {"ext": extracted["ext"], "image": extracted["image"]} if extracted else None
+                    except Exception:
+                        images[xref] = None
+
+            pages.append(PdfPage(number, page.rect.width, page.rect.height, blocks, xrefs))
+    return PdfDocument(sha256 or file_sha256(file_bytes), pages, images)
+
+
+pdf_cache = TTLCache(maxsize=PDF_DOC_CACHE_SIZE, ttl=PDF_DOC_CACHE_TTL)
+
+
+def cached_pdf(file_bytes: bytes, sha256: Optional[str] = None) -> Tuple[str, Optional[PdfDocument]]:
+    sha = sha256 or file_sha256(file_bytes)
+    return sha, pdf_cache.get(sha)
+
+
+def load_pdf(file_bytes: bytes, sha256: Optional[str] = None) -> PdfDocument:
+    """The cached model for these bytes, parsing them on a miss. Pass sha256 if already known."""
+    sha, document = cached_pdf(file_bytes, sha256)
+    if document is None:
+        document = parse_pdf(file_bytes, sha)
+        pdf_cache.set(sha, document)
+    return document
@@ -0,0 +1,137 @@
+"""
+OCR fallback for scanned resumes.
+
+Only pages without a usable text layer are OCR'd. Each page is rasterized in
+grayscale at an adaptive DPI: the native resolution of the scan it carries,
+clamped to [OCR_DPI_MIN, OCR_DPI_MAX] and to a pixel budget, so a 600 DPI scan
+is not upsampled work and a phone photo is not blown up. Results are cached per
+page content (the hash of the page's images), so re-uploads and the same scan
+inside another PDF skip tesseract. ExtractionPool.ocr_text runs the pages in
+parallel across the extraction workers within OCR_BUDGET_SECONDS: each page gets
+the wall-clock deadline and tesseract is killed when it passes, so no OCR keeps a
+worker busy after the request has given up on it.
+"""
+import hashlib
+import os
+import shutil
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import fitz
+import pytesseract
+from PIL import Image, ImageOps
+
+from app.core.logger import get_logger
+from app.utils.cache import TTLCache
+from app.utils.pdf_document import PAGE_BREAK, PdfDocument, PdfPage
+
+logger = get_logger(__name__)
+
+TESSERACT_CMD = os.getenv("TESSERACT_CMD", "tesseract")
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_DPI_MIN = int(os.getenv("OCR_DPI_MIN", "150"))
+OCR_DPI_MAX = int(os.getenv("OCR_DPI_MAX", "300"))
+OCR_MAX_MEGAPIXELS = float(os.getenv("OCR_MAX_MEGAPIXELS", "9"))
+OCR_MIN_PAGE_CHARS = int(os.getenv("OCR_MIN_PAGE_CHARS", "20"))  # fewer = no usable text layer
+OCR_MAX_PAGES = int(os.getenv("OCR_MAX_PAGES", "10"))
+OCR_BUDGET_SECONDS = float(os.getenv("OCR_BUDGET_SECONDS", "30"))
+OCR_BUDGET_GRACE_SECONDS = 5.0  # for a worker to return after tesseract is killed at the deadline
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "512"))
+OCR_CACHE_TTL = int(os.getenv("OCR_CACHE_TTL", str(24 * 3600)))
+
+pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
+
+# Page content hash -> OCR text
+ocr_cache = TTLCache(maxsize=OCR_CACHE_SIZE, ttl=OCR_CACHE_TTL)
+
+
+@lru_cache(maxsize=1)
+def ocr_available() -> bool:
+    if shutil.which(TESSERACT_CMD) is None:
+        logger.warning(f"tesseract not found ({TESSERACT_CMD}); scanned resumes cannot be OCR'd")
+        return False
+    return True
+
+
+def pages_needing_ocr(document: PdfDocument) -> List[PdfPage]:
+    """Pages with (almost) no extractable text, first OCR_MAX_PAGES of them."""
+    pages = [p for p in document.pages if len(p.text().strip()) < OCR_MIN_PAGE_CHARS]
+    return pages[:OCR_MAX_PAGES]
+
+
+def page_content_key(document: PdfDocument, page: PdfPage) -> str:
+    """
+    Cache key for a page's OCR text. A scanned page is its images, so their bytes
+    identify it across files; pages without decodable images fall back to file + page.
+    """
+    images = [document.images.get(xref) for xref in page.image_xrefs]
+    if not any(images):
+        return f"{OCR_LANG}:{document.sha256}:{page.number}"
+    h = hashlib.sha256(f"{page.width:.1f}x{page.height:.1f}".encode())
+    for image in images:
+        if image:
+            h.update(image["image"])
+    return f"{OCR_LANG}:{h.hexdigest()}"
+
+
+def _page_dpi(page: fitz.Page) -> int:
+    native = 0.0
+    for info in page.get_image_info():
+        x0, _, x1, _ = info.get("bbox", (0, 0, 0, 0))
+        if x1 - x0 > 1:
+            native = max(native, info.get("width", 0) / ((x1 - x0) / 72))
+    dpi = min(max(native or OCR_DPI_MAX, OCR_DPI_MIN), OCR_DPI_MAX)
+    inches = (page.rect.width / 72) * (page.rect.height / 72)
+    budget_dpi = (OCR_MAX_MEGAPIXELS * 1e6 / inches) ** 0.5 if inches else dpi
+    return int(max(min(dpi, budget_dpi), 72))
+
+
+def ocr_page(file_bytes: bytes, number: int, deadline: Optional[float] = None) -> str:
+    """
+    Rasterize and OCR one 1-based page. Runs in an extraction worker. With a
+    deadline (time.time()), tesseract is killed when it passes (TimeoutError).
+    """
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        page = doc[number - 1]
+        pix = page.get_pixmap(dpi=_page_dpi(page), colorspace=fitz.csGRAY, alpha=False)
+    image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+    image = ImageOps.autocontrast(image, cutoff=1)
+    timeout = 0
+    if deadline is not None:
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            raise TimeoutError(f"OCR budget spent before page {number} started")
+    try:
+        return pytesseract.image_to_string(image, lang=OCR_LANG, config="--oem 1 --psm 3", timeout=timeout).strip()
+    except RuntimeError as e:
+        # pytesseract kills tesseract at the timeout and raises a plain RuntimeError
+        if deadline is not None and time.time() >= deadline:
+            raise TimeoutError(f"OCR of page {number} killed at the deadline") from e
+        raise
+
+
+def merge_ocr_text(document: PdfDocument, ocr_texts: Dict[int, str]) -> str:
+    """document.text() with OCR'd pages substituted for their (empty) text layer."""
+    texts = (ocr_texts.get(page.number) or page.text().strip() for page in document.pages)
+    return PAGE_BREAK.join(t for t in texts if t)
+
+
+def ocr_document_text(file_bytes: bytes, document: PdfDocument) -> str:
+    """Synchronous, sequential fallback for callers outside the extraction pool."""
+    pages = pages_needing_ocr(document)
+    if not pages or not ocr_available():
+        return document.text()
+    texts = {}
+    for page in pages:
+        key = page_content_key(document, page)
+        text = ocr_cache.get(key)
+        if text is None:
+            try:
+                text = ocr_page(file_bytes, page.number)
+            except Exception as e:
+                logger.warning(f"OCR of page {page.number} failed: {e}")
+                continue
+            ocr_cache.set(key, text)
+        texts[page.number] = text
+    return merge_ocr_text(document, texts)
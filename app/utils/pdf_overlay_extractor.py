@@ -1,49 +1,98 @@
-import fitz  # PyMuPDF
 from typing import Dict, Any, List
 
+from app.utils.pdf_document import PdfLine, PdfSpan, load_pdf
+
+COLUMNAR_VERSION = 1
+_COLUMNS = ("text", "x", "y", "width", "height", "fontSize", "font", "color")
+
 def extract_pdf_structure(file_bytes: bytes) -> Dict[str, Any]:
     """
     Extracts structured PDF text + layout for overlay editing.
     Returns JSON with page size and positioned text spans.
     """
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
     pages = []
 
-    for page_num, page in enumerate(doc, start=1):
-        page_width, page_height = page.rect.width, page.rect.height
-        page_dict = page.get_text("dict")
-
+    for page in load_pdf(file_bytes).pages:
         items: List[Dict[str, Any]] = []
 
-        for block in page_dict.get("blocks", []):
-            if block.get("type") != 0:
-                continue  # only text blocks
-            for line in block.get("lines", []):
-                for span in line.get("spans", []):
-                    text = span.get("text", "").strip()
-                    if not text:
-                        continue
-
-                    x0, y0, x1, y1 = span.get("bbox", [0, 0, 0, 0])
-                    items.append({
-                        "text": text,
-                        "x": x0,
-                        "y": y0,
-                        "width": x1 - x0,
-                        "height": y1 - y0,
-                        "fontSize": span.get("size", 12),
-                        "fontFamily": span.get("font", "Helvetica"),
-                        "color": span.get("color", 0),
-                        "page": page_num
-                    })
+        for span in page.spans():
+            text = span.text.strip()
+            if not text:
+                continue
+
+            x0, y0, x1, y1 = span.bbox
+            items.append({
+                "text": text,
+                "x": x0,
+                "y": y0,
+                "width": x1 - x0,
+                "height": y1 - y0,
+                "fontSize": span.size,
+                "fontFamily": span.font or "Helvetica",
+                "color": span.color,
+                "page": page.number
+            })
 
         pages.append({
-            "page": page_num,
-            "width": page_width,
-            "height": page_height,
+            "page": page.number,
+            "width": page.width,
+            "height": page.height,
             "items": items
         })
 
-    doc.close()
-
     return {"pages": pages}
+
+
+def _style(span: PdfSpan):
+    return span.font or "Helvetica", span.size, span.color
+
+
+def _merged_runs(line: PdfLine):
+    """
+    Consecutive spans of a line that share font, size and color, as (text, bbox, style).
+    Whitespace-only spans join whichever run they sit in, whatever their style.
+    """
+    run_text, run_bbox, run_style = "", None, None
+    for span in line.spans:
+        if run_style is not None and (span.text.isspace() or _style(span) == run_style):
+            run_text += span.text
+            if not span.text.isspace():
+                x0, y0, x1, y1 = run_bbox
+                sx0, sy0, sx1, sy1 = span.bbox
+                run_bbox = (min(x0, sx0), min(y0, sy0), max(x1, sx1), max(y1, sy1))
+            continue
+        if run_style is not None:
+            yield run_text, run_bbox, run_style
+            run_text, run_bbox, run_style = "", None, None
+        if span.text.strip():
+            run_text, run_bbox, run_style = span.text, span.bbox, _style(span)
+    if run_style is not None:
+        yield run_text, run_bbox, run_style
+
+
+def extract_pdf_structure_columnar(file_bytes: bytes) -> Dict[str, Any]:
+    """
+    Same content as extract_pdf_structure, laid out for size: per page one array per
+    field instead of one object per span, font names interned in a top-level table
+    ("font" holds indexes into "fonts"), adjacent same-style spans of a line merged,
+    and coordinates rounded to 1/100 pt.
+    """
+    fonts: Dict[str, int] = {}
+    pages = []
+
+    for page in load_pdf(file_bytes).pages:
+        columns: Dict[str, list] = {name: [] for name in _COLUMNS}
+        for line in page.lines():
+            for text, (x0, y0, x1, y1), (font, size, color) in _merged_runs(line):
+                columns["text"].append(text.strip())
+                columns["x"].append(round(x0, 2))
+                columns["y"].append(round(y0, 2))
+                columns["width"].append(round(x1 - x0, 2))
+                columns["height"].append(round(y1 - y0, 2))
+                columns["fontSize"].append(round(size, 2))
+                columns["font"].append(fonts.setdefault(font, len(fonts)))
+                columns["color"].append(color)
+
+        pages.append({"page": page.number, "width": page.width, "height": page.height, **columns})
+
+    return {"format": "columnar", "version": COLUMNAR_VERSION, "fonts": list(fonts), "pages": pages}
@@ -1,24 +1,22 @@
 from typing import Optional
-from collections import Counter
 import fitz  # PyMuPDF
-import pytesseract
-from PIL import Image
 from io import BytesIO
 from docx import Document
 from app.core.logger import get_logger
-import re
+from app.utils.docx_text import extract_docx_text
+from app.utils.pdf_document import load_pdf
+from app.utils.pdf_ocr import ocr_document_text
+from app.utils.skill_matcher import get_skill_matcher
 
 logger = get_logger(__name__)
 
 def extract_text_from_pdf(file_bytes: bytes) -> Optional[str]:
     """
-    Extracts text from PDF using PyMuPDF.
-    Returns None if extraction fails or text is empty.
+    Extracts text from PDF using the shared parsed-document model, OCR'ing pages
+    without a text layer. Returns None if extraction fails or text is empty.
     """
     try:
-        with fitz.open(stream=file_bytes, filetype="pdf") as pdf:
-            text_chunks = [page.get_text("text").strip() for page in pdf]
-        extracted_text = "\n".join([t for t in text_chunks if t])
+        extracted_text = ocr_document_text(file_bytes, load_pdf(file_bytes))
 
         return extracted_text if extracted_text else None
     except Exception:
@@ -26,10 +24,18 @@ def extract_text_from_pdf(file_bytes: bytes) -> Optional[str]:
 
 def extract_text_from_docx(file_bytes: bytes) -> Optional[str]:
     """
-    Extracts text from DOCX resumes.
-    Includes paragraphs and tables.
+    Extracts text from DOCX resumes, paragraphs and table cells in document order.
+    Streams the XML (docx_text); python-docx is the fallback for files it cannot read.
     Returns None if extraction fails or file is empty.
     """
+    try:
+        return extract_docx_text(file_bytes)
+    except Exception as e:
+        logger.warning(f"Streaming DOCX extraction failed, falling back to python-docx: {e}")
+    return _extract_text_from_docx_model(file_bytes)
+
+
+def _extract_text_from_docx_model(file_bytes: bytes) -> Optional[str]:
     try:
         doc = Document(BytesIO(file_bytes))
         text_chunks = []
@@ -52,6 +58,13 @@ def extract_text_from_docx(file_bytes: bytes) -> Optional[str]:
         return None
 
 
+def is_pdf(content_type: str, filename: str) -> bool:
+    ctype = (content_type or "").lower()
+    if "word" in ctype:  # a sniffed type wins over the file name
+        return False
+    return "pdf" in ctype or (filename or "").lower().endswith(".pdf")
+
+
 def extract_resume_text(file_bytes: bytes, content_type: str, filename: str) -> str:
     """
     Universal extractor for resumes (PDF or DOCX).
@@ -60,7 +73,7 @@ def extract_resume_text(file_bytes: bytes, content_type: str, filename: str) ->
         fname = filename.lower()
         ctype = (content_type or "").lower()
 
-        if "pdf" in ctype or fname.endswith(".pdf"):
+        if is_pdf(content_type, filename):
             return extract_text_from_pdf(file_bytes)
         elif "word" in ctype or fname.endswith(".docx"):
             return extract_text_from_docx(file_bytes)
@@ -73,25 +86,7 @@ def extract_resume_text(file_bytes: bytes, content_type: str, filename: str) ->
 
 def extract_keywords(job_description: str, top_n: int = 30) -> list:
     """
-    Extracts keywords (skills, tools, terms) from JD deterministically.
-    Very simple version using regex + frequency filtering.
+    Extracts skills (languages, tools, practices) from a JD or resume deterministically,
+    using the skill dictionary. Returns canonical names, most frequent first.
     """
-    # Normalize
-    text = job_description.lower()
-    
-    # Keep only words
-    words = re.findall(r"[a-zA-Z]+", text)
-    
-    # Common stopwords (you can extend this list)
-    stopwords = {"the","and","with","for","a","an","to","of","in","on","at","is","as","by","or","be","from"}
-    
-    # Filter
-    filtered = [w for w in words if w not in stopwords and len(w) > 2]
-    
-    # Count frequency
-    counts = Counter(filtered)
-    
-    # Pick top-N terms
-    keywords = [word for word, _ in counts.most_common(top_n)]
-    
-    return keywords
\ No newline at end of file
+    return get_skill_matcher().extract(job_description or "", top_n)
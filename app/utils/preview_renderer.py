@@ -0,0 +1,226 @@
+"""
+Pixel-faithful resume previews.
+
+pdf2htmlEX gives the closest match to the original PDF, but it is an external
+binary that can hang on odd files and writes fonts, images and CSS to disk. Here
+each render gets its own workspace (on tmpfs when available) that is removed
+when the job ends, no more than PREVIEW_WORKERS processes run at once, and a
+render running past PREVIEW_TIMEOUT_SECONDS, or whose workspace grows past
+PREVIEW_MAX_OUTPUT_MB while it runs, is killed. The files it writes go to the
+asset store and the HTML references them by URL.
+
+When the binary is missing, fails or times out, the preview is rendered with
+PyMuPDF instead, in the extraction pool. Results are cached by the file's SHA-256.
+"""
+import asyncio
+import os
+import re
+import shutil
+import signal
+import tempfile
+from typing import Dict, Optional
+
+import fitz
+
+from app.core.logger import get_logger
+from app.utils.asset_store import asset_store, asset_url
+from app.utils.cache import TTLCache
+from app.utils.extract_pool import extraction_pool
+from app.utils.pdf_document import file_sha256
+
+logger = get_logger(__name__)
+
+PDF2HTMLEX_PATH = os.getenv("PDF2HTMLEX_PATH", "pdf2htmlEX")
+PREVIEW_WORKERS = int(os.getenv("PREVIEW_WORKERS", "2"))
+PREVIEW_TIMEOUT_SECONDS = float(os.getenv("PREVIEW_TIMEOUT_SECONDS", "30"))
+PREVIEW_WORKSPACE_DIR = os.getenv(
+    "PREVIEW_WORKSPACE_DIR", "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+)
+PREVIEW_MAX_OUTPUT_MB = int(os.getenv("PREVIEW_MAX_OUTPUT_MB", "50"))
+PREVIEW_POLL_SECONDS = 0.2  # how often a running render's workspace size is checked
+PREVIEW_CACHE_SIZE = int(os.getenv("PREVIEW_CACHE_SIZE", "64"))
+PREVIEW_CACHE_TTL = int(os.getenv("PREVIEW_CACHE_TTL", str(30 * 60)))
+
+# "--embed cfijo" keeps CSS, fonts, images, JS and the outline external. They go to
+# the asset store, CSS/JS last so their url() references can be rewritten first.
+_TEXT_ASSET_EXTS = (".css", ".js", ".outline")
+_PDF_NAME = "resume.pdf"
+_HTML_NAME = "resume.html"
+
+
+def _rewrite_refs(text: str, urls: Dict[str, str]) -> str:
+    if not urls:
+        return text
+    pattern = re.compile(r"""(?<=["'(])(%s)(?=["')])""" % "|".join(re.escape(name) for name in urls))
+    return pattern.sub(lambda m: urls[m.group(1)], text)
+
+
+def _store_outputs(workspace: str) -> str:
+    """Move what pdf2htmlEX wrote into the asset store; returns the HTML pointing at it."""
+    with open(os.path.join(workspace, _HTML_NAME), "r", encoding="utf-8", errors="ignore") as f:
+        page_html = f.read()
+
+    names = [n for n in sorted(os.listdir(workspace)) if n not in (_PDF_NAME, _HTML_NAME)]
+    urls: Dict[str, str] = {}
+    for name in sorted(names, key=lambda n: n.endswith(_TEXT_ASSET_EXTS)):
+        path = os.path.join(workspace, name)
+        if not os.path.isfile(path):
+            continue
+        ext = os.path.splitext(name)[1].lstrip(".")
+        if name.endswith(_TEXT_ASSET_EXTS):
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                data = _rewrite_refs(f.read(), urls).encode("utf-8")
+        else:
+            with open(path, "rb") as f:
+                data = f.read()
+        urls[name] = asset_url(asset_store.put(data, ext))
+    return _rewrite_refs(page_html, urls)
+
+
+def _workspace_bytes(workspace: str) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(workspace) if entry.is_file())
+
+
+def _kill(proc: asyncio.subprocess.Process) -> None:
+    # The whole process group, so helpers the binary spawned don't outlive it
+    try:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except ProcessLookupError:
+        pass
+
+
+def render_native(file_bytes: bytes) -> str:
+    """PyMuPDF's own positioned HTML, page by page. Runs in an extraction worker."""
+    pages = []
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        for number, page in enumerate(doc, start=1):
+            pages.append(f"<div class='pdf-preview-page' data-page='{number}'>{page.get_text('html')}</div>")
+    return "<div class='pdf-preview'>" + "".join(pages) + "</div>"
+
+
+class PreviewRenderer:
+    def __init__(self, binary: str = PDF2HTMLEX_PATH, workers: int = PREVIEW_WORKERS,
+                 timeout: float = PREVIEW_TIMEOUT_SECONDS, workspace_dir: str = PREVIEW_WORKSPACE_DIR):
+        self.binary = binary
+        self.workers = max(workers, 1)
+        self.timeout = timeout
+        self.workspace_dir = workspace_dir
+        self.cache = TTLCache(maxsize=PREVIEW_CACHE_SIZE, ttl=PREVIEW_CACHE_TTL)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.rendered = 0
+        self.native = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def binary_path(self) -> Optional[str]:
+        return shutil.which(self.binary)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._slots = loop, asyncio.Semaphore(self.workers)
+        return self._slots
+
+    async def _wait(self, proc: asyncio.subprocess.Process, workspace: str, label: str) -> tuple:
+        """
+        (stdout, stderr) once the process exits. Kills it when it runs past the timeout
+        (asyncio.TimeoutError) or its workspace outgrows PREVIEW_MAX_OUTPUT_MB (RuntimeError).
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        output = asyncio.ensure_future(proc.communicate())
+        try:
+            while True:
+                poll = min(PREVIEW_POLL_SECONDS, max(deadline - loop.time(), 0))
+                done, _ = await asyncio.wait({output}, timeout=poll)
+                if done:
+                    return output.result()
+                if loop.time() >= deadline:
+                    raise asyncio.TimeoutError(f"pdf2htmlEX timed out after {self.timeout}s on {label}")
+                if await asyncio.to_thread(_workspace_bytes, workspace) > PREVIEW_MAX_OUTPUT_MB * 1024 * 1024:
+                    raise RuntimeError(f"pdf2htmlEX output for {label} exceeds {PREVIEW_MAX_OUTPUT_MB} MB")
+        except BaseException:
+            _kill(proc)
+            await proc.wait()
+            await asyncio.gather(output, return_exceptions=True)
+            raise
+
+    async def _pdf2htmlex(self, binary: str, file_bytes: bytes, label: str) -> str:
+        async with self._semaphore():
+            self.in_flight += 1
+            try:
+                with tempfile.TemporaryDirectory(prefix="pdf2htmlex-", dir=self.workspace_dir) as workspace:
+                    with open(os.path.join(workspace, _PDF_NAME), "wb") as f:
+                        f.write(file_bytes)
+                    proc = await asyncio.create_subprocess_exec(
+                        binary, "--embed", "cfijo", "--dest-dir", workspace,
+                        os.path.join(workspace, _PDF_NAME), _HTML_NAME,  # only filename, not full path
+                        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                        start_new_session=os.name == "posix",
+                    )
+                    stdout, stderr = await self._wait(proc, workspace, label)
+                    if proc.returncode != 0:
+                        raise RuntimeError(
+                            f"pdf2htmlEX failed (code {proc.returncode}):\n"
+                            f"STDOUT:\n{stdout.decode(errors='ignore')}\n\nSTDERR:\n{stderr.decode(errors='ignore')}"
+                        )
+                    # What it wrote between the last poll and exiting
+                    if _workspace_bytes(workspace) > PREVIEW_MAX_OUTPUT_MB * 1024 * 1024:
+                        raise RuntimeError(f"pdf2htmlEX output for {label} exceeds {PREVIEW_MAX_OUTPUT_MB} MB")
+                    return await asyncio.to_thread(_store_outputs, workspace)
+            finally:
+                self.in_flight -= 1
+
+    async def render(self, file_bytes: bytes, label: str = "") -> dict:
+        """
+        {"document_id", "renderer", "html"}; renderer is "pdf2htmlEX" or "pymupdf".
+        Raises ValueError when the file cannot be read at all; anything else is a server fault.
+        """
+        sha = file_sha256(file_bytes)
+        cached = self.cache.get(sha)
+        if cached is not None:
+            return cached
+
+        html, renderer = None, "pdf2htmlEX"
+        binary = self.binary_path()
+        if binary:
+            try:
+                html = await self._pdf2htmlex(binary, file_bytes, label)
+                self.rendered += 1
+            except asyncio.TimeoutError as e:
+                self.timeouts += 1
+                logger.warning(f"Falling back to PyMuPDF preview for {label}: {e}")
+            except Exception as e:
+                self.failures += 1
+                logger.warning(f"Falling back to PyMuPDF preview for {label}: {e}")
+        if html is None:
+            try:
+                html = await extraction_pool.run(render_native, file_bytes, label=f"{label} preview")
+            except fitz.FileDataError as e:
+                raise ValueError(f"Could not read {label or 'PDF'}: {e}") from e
+            renderer = "pymupdf"
+            self.native += 1
+
+        result = {"document_id": sha, "renderer": renderer, "html": html}
+        self.cache.set(sha, result)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "binary": self.binary_path(),
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "rendered": self.rendered,
+            "native": self.native,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+            "cache": self.cache.stats(),
+        }
+
+
+preview_renderer = PreviewRenderer()
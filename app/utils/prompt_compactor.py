@@ -0,0 +1,250 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import List
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Combined resume + JD budget for the user message sent to Groq
+GROQ_INPUT_TOKEN_BUDGET = int(os.getenv("GROQ_INPUT_TOKEN_BUDGET", "6000"))
+# Lines at the top and bottom of a page where headers and footers are looked for
+PAGE_EDGE_LINES = 3
+# Boilerplate removal that would drop more than this share of a JD is not trusted
+JD_MAX_DROPPED_RATIO = 0.5
+
+_WORD_RE = re.compile(r"\w+|[^\w\s]")
+_SPACE_RE = re.compile(r"[ \t\u00a0\u200b]+")
+_BULLET_START = re.compile(r"^[-*•·▪●◦–]\s")
+_PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?[-–—(]?\s*\d{1,3}\s*(?:(?:of|/)\s*\d{1,3})?\s*[-–—)]?$", re.I)
+
+# JD sections that never affect matching: dropped from their heading to the next heading
+_BOILERPLATE_HEADINGS = re.compile(
+    r"^(?:benefits?|perks(?: and benefits)?|perks & benefits|what we offer|why (?:join|work (?:with|for)) us\??|"
+    r"compensation(?: and benefits)?|salary(?: and benefits)?|equal (?:employment )?opportunity.*|eeo(?: statement)?|"
+    r"diversity(?:,? equity)?(?:,? and inclusion)?.*|privacy(?: notice| policy)?|how to apply|about the company|"
+    r"about us|our commitment.*|accommodations?)\s*:?$",
+    re.I,
+)
+# Headings that end a skipped boilerplate section
+_JD_SECTION_HEADING = re.compile(
+    r"^(?:about (?:the|this) (?:role|position|job|team)|the role|role overview|overview|summary|"
+    r"(?:key |core )?responsibilities|duties|what you(?:'|’)?ll do|what you will do|"
+    r"(?:minimum |basic |preferred )?(?:requirements|qualifications)|what you(?:'|’)?ll (?:need|bring)|"
+    r"(?:required |preferred )?skills(?: and experience)?|nice to have|bonus points|tech stack|experience)\s*:?$",
+    re.I,
+)
+
+# Individual boilerplate sentences that show up anywhere in a JD
+_BOILERPLATE_SENTENCES = re.compile(
+    r"equal opportunity employer|without regard to (?:race|age|sex|religion)|reasonable accommodations?|"
+    r"e-verify|protected veteran|applicants? with disabilities|sexual orientation|gender identity|"
+    r"we (?:do not|don't) discriminate|background check",
+    re.I,
+)
+
+
+@dataclass
+class CompactionResult:
+    resume_text: str
+    job_description: str
+    tokens_before: int
+    tokens_after: int
+    truncated: bool = False
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.tokens_before = 0
+        self.tokens_saved = 0
+        self.truncated = 0
+
+    def record(self, result: CompactionResult):
+        with self._lock:
+            self.calls += 1
+            self.tokens_before += result.tokens_before
+            self.tokens_saved += result.tokens_saved
+            self.truncated += int(result.truncated)
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "tokens_before": self.tokens_before,
+            "tokens_saved": self.tokens_saved,
+            "truncated": self.truncated,
+            "budget": GROQ_INPUT_TOKEN_BUDGET,
+        }
+
+
+compaction_stats = _Stats()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough BPE token estimate (no tokenizer dependency): one token per word or
+    punctuation mark, plus one for every extra 6 characters of long words.
+    """
+    if not text:
+        return 0
+    return sum(1 + max(0, len(w) - 1) // 6 for w in _WORD_RE.findall(text))
+
+
+def _normalize_lines(text: str) -> List[str]:
+    lines = []
+    for raw in (text or "").splitlines():
+        line = _SPACE_RE.sub(" ", raw).strip()
+        if line and _PAGE_NUMBER_RE.match(line):
+            continue
+        if not line and (not lines or not lines[-1]):
+            continue  # collapse blank runs
+        lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+def _normalize_pages(text: str) -> List[List[str]]:
+    """Normalized lines of each page; extracted PDF text separates pages with a form feed."""
+    return [_normalize_lines(page) for page in (text or "").split("\f")]
+
+
+def _edge_lines(page: List[str]) -> set:
+    content = [l for l in page if l and len(l) <= 80]
+    return set(content[:PAGE_EDGE_LINES]) | set(content[-PAGE_EDGE_LINES:])
+
+
+def _drop_repeated_lines(pages: List[List[str]]) -> List[str]:
+    """
+    Flattens the pages, dropping page headers and footers: short lines that recur
+    among the first or last PAGE_EDGE_LINES lines of two or more pages. Only those
+    edge copies are dropped and the first occurrence is kept, so lines repeated
+    within the body ("Software Engineer" for two jobs) stay.
+    """
+    at_edges = Counter(l for page in pages for l in _edge_lines(page))
+    headers = {l for l, n in at_edges.items() if n > 1}
+
+    seen = set()
+    out = []
+    for page in pages:
+        edges = _edge_lines(page)
+        for line in page:
+            if line in headers and line in edges:
+                if line in seen:
+                    continue
+                seen.add(line)
+            out.append(line)
+    return out
+
+
+def compact_resume(text: str) -> str:
+    return "\n".join(_drop_repeated_lines(_normalize_pages(text)))
+
+
+def _looks_like_heading(line: str) -> bool:
+    """A short line without sentence punctuation or a bullet, e.g. "What you'll do" or "THE ROLE:"."""
+    return (
+        len(line) <= 60 and len(line.split()) <= 6
+        and not _BULLET_START.match(line) and not line.endswith((".", ",", ";"))
+    )
+
+
+def compact_job_description(text: str) -> str:
+    """
+    Drops boilerplate sections (benefits, EEO, about us) up to the next heading or
+    paragraph break, and boilerplate sentences anywhere. When that removes more than
+    JD_MAX_DROPPED_RATIO of the JD, the normalized text is returned instead.
+    """
+    lines = _drop_repeated_lines(_normalize_pages(text))
+    out = []
+    skipping = False
+    for line in lines:
+        if _BOILERPLATE_HEADINGS.match(line):
+            skipping = True
+            continue
+        if skipping:
+            if line and not _looks_like_heading(line) and not _JD_SECTION_HEADING.match(line):
+                continue
+            skipping = False
+        if _BOILERPLATE_SENTENCES.search(line):
+            sentences = re.split(r"(?<=[.!?])\s+", line)
+            line = " ".join(s for s in sentences if not _BOILERPLATE_SENTENCES.search(s))
+            if not line:
+                continue
+        out.append(line)
+
+    compacted = "\n".join(out).strip()
+    normalized = "\n".join(lines).strip()
+    if estimate_tokens(compacted) < estimate_tokens(normalized) * (1 - JD_MAX_DROPPED_RATIO):
+        logger.info("JD compaction dropped most of the text; sending it uncompacted")
+        return normalized
+    return compacted
+
+
+def _truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Whole lines while they fit, then the next line cut at the last token that fits."""
+    kept, used = [], 0
+    for line in text.split("\n"):
+        cost = estimate_tokens(line) + 1
+        if used + cost > max_tokens:
+            end = 0
+            for match in _WORD_RE.finditer(line):
+                used += 1 + max(0, len(match.group()) - 1) // 6
+                if used + 1 > max_tokens:
+                    break
+                end = match.end()
+            if end:
+                kept.append(line[:end])
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+
+def compact_inputs(resume_text: str, job_description: str = "", budget: int = None) -> CompactionResult:
+    """
+    Normalize and deduplicate both inputs, strip JD boilerplate, then enforce the
+    token budget. When over budget, the larger input is trimmed first, keeping
+    its beginning (the most relevant part of both resumes and JDs).
+    """
+    budget = budget or GROQ_INPUT_TOKEN_BUDGET
+    before = estimate_tokens(resume_text) + estimate_tokens(job_description)
+
+    resume = compact_resume(resume_text)
+    jd = compact_job_description(job_description)
+    resume_tokens, jd_tokens = estimate_tokens(resume), estimate_tokens(jd)
+
+    truncated = False
+    if resume_tokens + jd_tokens > budget:
+        truncated = True
+        half = budget // 2
+        if jd_tokens <= half:
+            resume = _truncate_to_tokens(resume, budget - jd_tokens)
+        elif resume_tokens <= half:
+            jd = _truncate_to_tokens(jd, budget - resume_tokens)
+        else:
+            resume = _truncate_to_tokens(resume, half)
+            jd = _truncate_to_tokens(jd, budget - half)
+
+    result = CompactionResult(
+        resume_text=resume,
+        job_description=jd,
+        tokens_before=before,
+        tokens_after=estimate_tokens(resume) + estimate_tokens(jd),
+        truncated=truncated,
+    )
+    compaction_stats.record(result)
+    if result.tokens_saved > 0:
+        pct = math.floor(result.tokens_saved / before * 100) if before else 0
+        logger.info(f"Prompt compaction saved ~{result.tokens_saved} tokens ({pct}%)"
+                    + (" [truncated to budget]" if truncated else ""))
+    return result
@@ -0,0 +1,59 @@
+import os
+from urllib.parse import urlparse
+
+import httpx
+from fastapi import HTTPException
+
+from app import models
+from app.core.logger import get_logger
+from app.utils.extract_pool import extract_resume_text_async
+from app.utils.upload_intake import MAX_FILE_SIZE_MB
+
+logger = get_logger(__name__)
+
+RESUME_FETCH_TIMEOUT = 30.0
+RESUME_FETCH_CHUNK_SIZE = 64 * 1024
+
+
+async def fetch_resume_bytes(resume: models.Resume) -> tuple:
+    """
+    Download a stored resume from its Cloudinary URL, streamed and capped at
+    MAX_FILE_SIZE like uploads. Returns (file_bytes, content_type, filename).
+    Raises HTTPException: 404 when the file is gone, 502 when the download fails,
+    422 when it is over the size cap.
+    """
+    max_size = MAX_FILE_SIZE_MB * 1024 * 1024
+    too_large = HTTPException(
+        status_code=422, detail=f"Stored resume file exceeds {MAX_FILE_SIZE_MB} MB."
+    )
+    try:
+        async with httpx.AsyncClient(timeout=RESUME_FETCH_TIMEOUT, follow_redirects=True) as client:
+            async with client.stream("GET", resume.file_url) as resp:
+                if resp.status_code in (404, 410):
+                    logger.warning(f"Stored resume {resume.id} is gone ({resp.status_code}): {resume.file_url}")
+                    raise HTTPException(status_code=404, detail="Resume file not found.")
+                resp.raise_for_status()
+                length = resp.headers.get("content-length", "")
+                if length.isdigit() and int(length) > max_size:
+                    raise too_large
+                chunks, size = [], 0
+                async for chunk in resp.aiter_bytes(RESUME_FETCH_CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise too_large
+                    chunks.append(chunk)
+                content_type = resp.headers.get("content-type", "")
+    except httpx.HTTPError as e:
+        logger.error(f"Downloading stored resume {resume.id} failed: {e}")
+        raise HTTPException(status_code=502, detail="Could not download the resume file.")
+
+    filename = os.path.basename(urlparse(resume.file_url).path) or resume.name
+    return b"".join(chunks), content_type, filename
+
+
+async def fetch_resume_text(resume: models.Resume) -> str:
+    file_bytes, content_type, filename = await fetch_resume_bytes(resume)
+    text = await extract_resume_text_async(file_bytes, content_type, filename)
+    if not text:
+        logger.error(f"Failed to extract text from stored resume {resume.id}")
+    return text
@@ -0,0 +1,470 @@
+"""
+Local, LLM-free resume sectioner: the fast path for /ai/resume/structure.
+
+    pdf_converter.page_layout() (font sizes, bullets, paragraph gaps)
+    -> flat line list -> section headings (known aliases + typographic cues)
+    -> Header fields from the lines above the first heading
+    -> per-section parsers (entries for experience/education/projects,
+       categories for skills, plain lists for the rest)
+    -> the same {"sections", "order"} schema extract_resume_json_with_groq returns
+
+Every result carries a confidence in [0, 1]. Callers use the local result only
+above SECTIONER_MIN_CONFIDENCE and fall back to Groq otherwise, so unusual
+layouts (multi-column, headings we don't know, scanned PDFs) still get the LLM.
+"""
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.core.logger import get_logger
+from app.utils.pdf_converter import _bullet_re, document_layout, pdf_layout
+from app.utils.pdf_document import PdfDocument
+
+logger = get_logger(__name__)
+
+SECTIONER_MIN_CONFIDENCE = float(os.getenv("SECTIONER_MIN_CONFIDENCE", "0.75"))
+
+SECTION_ALIASES: Dict[str, List[str]] = {
+    "Professional Summary": [
+        "summary", "professional summary", "profile", "professional profile", "career summary",
+        "objective", "career objective", "about me", "personal statement", "executive summary",
+    ],
+    "Skills": [
+        "skills", "technical skills", "core skills", "key skills", "skills and tools", "core competencies",
+        "competencies", "areas of expertise", "expertise", "technologies", "skills summary",
+    ],
+    "Work Experience": [
+        "experience", "work experience", "professional experience", "employment", "employment history",
+        "work history", "career history", "relevant experience", "industry experience",
+    ],
+    "Projects": ["projects", "personal projects", "academic projects", "selected projects", "key projects"],
+    "Education": ["education", "academic background", "education and training", "academics", "qualifications"],
+    "Certifications": ["certifications", "certificates", "licenses", "licenses and certifications", "certifications and licenses"],
+    "Awards": ["awards", "honors", "honours", "awards and honors", "achievements", "accomplishments"],
+    "Publications": ["publications", "research", "papers"],
+    "Languages": ["languages", "spoken languages"],
+    "Volunteer Experience": ["volunteer experience", "volunteering", "volunteer", "community involvement"],
+    "Memberships": ["memberships", "affiliations", "professional memberships", "professional affiliations"],
+    "References": ["references"],
+}
+_HEADING_LOOKUP = {alias: name for name, aliases in SECTION_ALIASES.items() for alias in aliases}
+
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"(?:\+?\d[\d\s().-]{7,}\d)")
+_LINKEDIN_RE = re.compile(r"(?:https?://)?(?:www\.)?linkedin\.com/\S+", re.I)
+_URL_RE = re.compile(r"(?:https?://)?(?:www\.)?[a-z0-9-]+(?:\.[a-z0-9-]+)*\.(?:com|io|dev|net|org|me|app|co|ai)(?:/\S*)?", re.I)
+_LOCATION_RE = re.compile(r"^[A-Z][A-Za-z .'-]+,\s*(?:[A-Z]{2}|[A-Z][A-Za-z .'-]+)$")
+_HEADER_SPLIT_RE = re.compile(r"\s*[|•·◦]\s*|\s{3,}")
+_PIECE_SPLIT_RE = re.compile(r"\s*[|•·]\s*|\s+[—–-]\s+|\s+at\s+|\s{3,}")
+_COMMA_SPLIT_RE = re.compile(r",\s+(?=[A-Z])")
+# Bullet glyphs pdf_converter renders as plain text but that still mark list items here
+_EXTRA_BULLET_RE = re.compile(r"^[·▪■●○◆❖➢➤✓✔►]\s*")
+
+_MONTH = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|"
+          r"sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?")
+_DATE = rf"(?:{_MONTH}\s*'?\d{{2,4}}|\d{{1,2}}/\d{{4}}|\d{{4}}-\d{{2}}|(?:19|20)\d{{2}})"
+_DATE_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE})\s*(?:-|–|—|to|until)\s*(?P<end>{_DATE}|present|current|now|today|ongoing)", re.I
+)
+_SINGLE_DATE_RE = re.compile(rf"(?P<end>{_DATE})", re.I)
+
+_ROLE_WORDS = re.compile(
+    r"\b(?:engineer|developer|manager|analyst|intern|designer|consultant|lead|director|scientist|specialist|"
+    r"assistant|associate|coordinator|officer|architect|administrator|nurse|teacher|accountant|technician|"
+    r"representative|executive|head|president|founder|researcher|programmer|owner|supervisor|advisor|tutor)\b",
+    re.I,
+)
+_INSTITUTION_WORDS = re.compile(r"\b(?:university|college|institute|school|academy|polytechnic|universit[ée])\b", re.I)
+_DEGREE_WORDS = re.compile(
+    r"\b(?:bachelor|master|doctor|ph\.?d|mba|b\.?sc?|m\.?sc?|b\.?a|m\.?a|b\.?tech|m\.?tech|b\.?e|m\.?e|"
+    r"associate|diploma|degree|certificate|hnd|gcse|a-levels?)\b",
+    re.I,
+)
+_TECH_LABEL_RE = re.compile(r"^(?:tech(?:nologies|nology| stack)?|stack|tools|built with)\s*:\s*", re.I)
+_CATEGORY_RE = re.compile(r"^([A-Za-z][\w &/+-]{1,40}):\s*(.+)$")
+_LIST_SPLIT_RE = re.compile(r"\s*[,;|•·]\s*")
+
+
+@dataclass
+class SectionerResult:
+    resume_json: dict
+    confidence: float
+    signals: Dict[str, float] = field(default_factory=dict)
+
+
+def _heading_key(text: str) -> str:
+    text = text.lower().replace("&", "and")
+    return " ".join(re.findall(r"[a-z]+", text))
+
+
+def _flatten(layout: list) -> List[dict]:
+    """One dict per visual line, in reading order, with the typographic cues the sectioner needs."""
+    lines = []
+    for page_num, page in enumerate(layout):
+        for para in page["paragraphs"]:
+            for idx, line in enumerate(para["lines"]):
+                lines.append({
+                    "text": line["plain"],
+                    "cells": _cells(line, page["median_size"]),
+                    "bullet": line["is_bullet"] or bool(_EXTRA_BULLET_RE.match(line["plain"])),
+                    "bold": line["bold"],
+                    "size": line["size"],
+                    "median": page["median_size"],
+                    "x": line["x"],
+                    "width": page["width"],
+                    "page": page_num,
+                    "para_start": idx == 0,
+                    "para_len": len(para["lines"]),
+                    "para_heading": para["is_heading"],
+                })
+    return lines
+
+
+def _cells(line: dict, median: float) -> List[str]:
+    """Split a line where its spans are far apart (e.g. a right-aligned date)."""
+    cells, current, prev_x1 = [], [], None
+    for span in line["spans"]:
+        if prev_x1 is not None and span["x"] - prev_x1 > median * 2:
+            cells.append(" ".join(current))
+            current = []
+        current.append(span["text"])
+        prev_x1 = span["x1"]
+    if current:
+        cells.append(" ".join(current))
+    return cells
+
+
+def _heading_name(line: dict, allow_custom: bool) -> Optional[str]:
+    """
+    Canonical section name for a heading line, a title-cased custom name, or None.
+    Custom (unknown) headings are only accepted after the first known one, so the
+    name line at the top, usually the largest text on the page, is not taken for one.
+    """
+    text = line["text"].strip().rstrip(":")
+    if line["bullet"] or not text or len(text) > 40 or len(text.split()) > 5:
+        return None
+    styled = (
+        line["bold"] or line["size"] >= line["median"] * 1.1 or line["para_heading"]
+        or (text.isupper() and len(text) > 3) or (line["para_start"] and line["para_len"] == 1)
+    )
+    known = _HEADING_LOOKUP.get(_heading_key(text))
+    if known:
+        return known if styled or line["text"].rstrip().endswith(":") else None
+    # Unknown headings need strong typography: upper-case bold, or the page's heading size
+    if not allow_custom or re.search(r"\d|@", text):
+        return None
+    if (text.isupper() and line["bold"]) or line["para_heading"]:
+        return text.title()
+    return None
+
+
+def _strip_bullet(text: str) -> str:
+    return _EXTRA_BULLET_RE.sub("", _bullet_re.sub("", text)).strip()
+
+
+def _parse_header(lines: List[dict]) -> dict:
+    header: Dict[str, str] = {}
+    if not lines:
+        return header
+
+    name_line = max(lines[:3], key=lambda l: l["size"])
+    header["fullName"] = name_line["text"].strip()
+
+    for line in lines:
+        if line is name_line:
+            continue
+        for token in _HEADER_SPLIT_RE.split(line["text"]):
+            token = token.strip(" ,")
+            if not token:
+                continue
+            if "email" not in header and _EMAIL_RE.search(token):
+                header["email"] = _EMAIL_RE.search(token).group()
+            elif "linkedin" not in header and _LINKEDIN_RE.search(token):
+                header["linkedin"] = _LINKEDIN_RE.search(token).group()
+            elif "phone" not in header and _PHONE_RE.fullmatch(token):
+                header["phone"] = token
+            elif "website" not in header and _URL_RE.fullmatch(token):
+                header["website"] = token
+            elif "location" not in header and _LOCATION_RE.match(token):
+                header["location"] = token
+            elif "title" not in header and len(token.split()) <= 8 and not re.search(r"\d", token):
+                header["title"] = token
+    return header
+
+
+def _take_dates(text: str) -> tuple:
+    """Return (text without its date range, startDate, endDate)."""
+    m = _DATE_RANGE_RE.search(text)
+    if m:
+        start, end = m.group("start"), m.group("end")
+    else:
+        m = _SINGLE_DATE_RE.search(text)
+        if not m:
+            return text, "", ""
+        start, end = "", m.group("end")
+    rest = (text[:m.start()] + " " + text[m.end():]).strip(" ,|–—-()")
+    return rest, start.strip(), end.strip().title() if end.lower() in ("present", "current", "now", "today", "ongoing") else end.strip()
+
+
+def _group_entries(lines: List[dict]) -> List[dict]:
+    """
+    Split an entry-based section into {"head": [text], "bullets": [text], "body": [text]}.
+    A non-bullet line starts a new entry once the current one has bullets, or when
+    the current head is already complete (has its dates) and the line looks like
+    the start of another one; a line indented under a bullet (or starting in lower
+    case) continues that bullet.
+    """
+    entries: List[dict] = []
+    current = None
+    prev = None
+    for line in lines:
+        text = line["text"].strip()
+        if line["bullet"]:
+            if current is None:
+                current = {"head": [], "bullets": [], "body": []}
+                entries.append(current)
+            current["bullets"].append(_strip_bullet(text))
+        elif current and current["bullets"] and prev is not None and prev["bullet"] and (
+            line["x"] > prev["x"] + 2 or text[:1].islower()
+        ):
+            current["bullets"][-1] += " " + text
+            continue
+        elif current is None or current["bullets"] or current["body"] or _starts_entry(current, line):
+            current = {"head": [line["cells"]], "bullets": [], "body": []}
+            entries.append(current)
+        elif len(current["head"]) < 3:
+            current["head"].append(line["cells"])
+        else:
+            current["body"].append(text)
+        prev = line
+    return entries
+
+
+def _starts_entry(current: dict, line: dict) -> bool:
+    head_text = " ".join(" ".join(cells) for cells in current["head"])
+    if not current["head"] or not _DATE_RANGE_RE.search(head_text) and not _SINGLE_DATE_RE.search(head_text):
+        return False
+    return line["bold"] or bool(_DATE_RANGE_RE.search(line["text"])) or (
+        bool(_INSTITUTION_WORDS.search(line["text"])) and bool(_INSTITUTION_WORDS.search(head_text))
+    )
+
+
+def _pieces(head: List[List[str]]) -> tuple:
+    """Flatten an entry head into (pieces, startDate, endDate); "City, ST" stays one piece."""
+    pieces, start, end = [], "", ""
+    for cells in head:
+        for cell in cells:
+            if not end:
+                cell, start, end = _take_dates(cell)
+            for piece in _PIECE_SPLIT_RE.split(cell):
+                piece = piece.strip(" ,")
+                if not piece:
+                    continue
+                if _LOCATION_RE.match(piece):
+                    pieces.append(piece)
+                else:
+                    pieces.extend(p.strip(" ,") for p in _COMMA_SPLIT_RE.split(piece) if p.strip(" ,"))
+    return pieces, start, end
+
+
+def _with_dates(entry: dict, start: str, end: str) -> dict:
+    if start:
+        entry["startDate"] = start
+    if end:
+        entry["endDate"] = end
+    return entry
+
+
+def _parse_experience(lines: List[dict]) -> List[dict]:
+    items = []
+    for entry in _group_entries(lines):
+        pieces, start, end = _pieces(entry["head"])
+        location = next((p for p in pieces if _LOCATION_RE.match(p)), None)
+        names = [p for p in pieces if p != location]
+        role = names[0] if names else ""
+        company = names[1] if len(names) > 1 else ""
+        if company and _ROLE_WORDS.search(company) and not _ROLE_WORDS.search(role):
+            role, company = company, role
+        item = {"role": role, "company": company}
+        if location:
+            item["location"] = location
+        item = _with_dates(item, start, end)
+        item["achievements"] = entry["bullets"] + entry["body"]
+        items.append(item)
+    return items
+
+
+def _parse_projects(lines: List[dict]) -> List[dict]:
+    items = []
+    for entry in _group_entries(lines):
+        pieces, start, end = _pieces(entry["head"][:1])
+        tech: List[str] = []
+        rest = entry["body"][:]
+        for cells in entry["head"][1:]:
+            rest.append(" ".join(cells))
+        for text in list(rest):
+            if _TECH_LABEL_RE.match(text):
+                tech.extend(t for t in _LIST_SPLIT_RE.split(_TECH_LABEL_RE.sub("", text)) if t)
+                rest.remove(text)
+        if len(pieces) > 1 and not tech and "," in pieces[-1]:
+            tech = [t for t in _LIST_SPLIT_RE.split(pieces.pop()) if t]
+        item = {"name": pieces[0] if pieces else "", "achievements": rest + entry["bullets"]}
+        if tech:
+            item["techStack"] = tech
+        items.append(_with_dates(item, start, end))
+    return items
+
+
+def _parse_education(lines: List[dict]) -> List[dict]:
+    items = []
+    for entry in _group_entries(lines):
+        pieces, start, end = _pieces(entry["head"])
+        institution = next((p for p in pieces if _INSTITUTION_WORDS.search(p)), "")
+        degree = next((p for p in pieces if p != institution and _DEGREE_WORDS.search(p)), "")
+        location = next((p for p in pieces if p not in (institution, degree) and _LOCATION_RE.match(p)), "")
+        if not institution:
+            institution = next((p for p in pieces if p not in (degree, location)), "")
+        item = {"institution": institution}
+        if degree:
+            item["degree"] = degree
+        if location:
+            item["location"] = location
+        items.append(_with_dates(item, start, end))
+    return items
+
+
+def _parse_skills(lines: List[dict]) -> Dict[str, List[str]]:
+    skills: Dict[str, List[str]] = {}
+    for line in lines:
+        text = _strip_bullet(line["text"])
+        m = _CATEGORY_RE.match(text)
+        category, items = (m.group(1).strip(), m.group(2)) if m else ("Skills", text)
+        skills.setdefault(category, []).extend(i for i in _LIST_SPLIT_RE.split(items) if i)
+    return skills
+
+
+def _parse_list(lines: List[dict]) -> List[str]:
+    items: List[str] = []
+    has_bullets = any(l["bullet"] for l in lines)
+    for line in lines:
+        text = _strip_bullet(line["text"])
+        if has_bullets and not line["bullet"] and items:
+            items[-1] += " " + text
+        elif not has_bullets and "," in text and len(lines) == 1:
+            items.extend(i for i in _LIST_SPLIT_RE.split(text) if i)
+        else:
+            items.append(text)
+    return items
+
+
+_PARSERS = {
+    "Professional Summary": lambda lines: " ".join(l["text"].strip() for l in lines),
+    "Skills": _parse_skills,
+    "Work Experience": _parse_experience,
+    "Volunteer Experience": _parse_experience,
+    "Projects": _parse_projects,
+    "Education": _parse_education,
+}
+
+
+def _entry_quality(name: str, items: List[dict]) -> List[float]:
+    if name in ("Work Experience", "Volunteer Experience"):
+        return [(bool(i["role"]) + bool(i["company"]) + bool(i.get("endDate")) + bool(i["achievements"])) / 4 for i in items]
+    if name == "Education":
+        return [(bool(i["institution"]) + bool(i.get("degree")) + bool(i.get("endDate"))) / 3 for i in items]
+    if name == "Projects":
+        return [(bool(i["name"]) + bool(i["achievements"])) / 2 for i in items]
+    return []
+
+
+def _multi_column(headings: List[dict]) -> bool:
+    """Headings that start past 40% of the page width mean a sidebar/second column."""
+    return any(h["x"] > h["width"] * 0.4 for h in headings)
+
+
+def section_lines(lines: List[dict]) -> SectionerResult:
+    headings = []
+    for i, line in enumerate(lines):
+        name = _heading_name(line, allow_custom=bool(headings))
+        if name:
+            headings.append((i, name))
+
+    header_lines = lines[:headings[0][0]] if headings else lines
+    sections: Dict[str, object] = {}
+    order: List[str] = []
+    header = _parse_header(header_lines)
+    if header:
+        sections["Header"] = header
+        order.append("Header")
+
+    known_lines = 0
+    body_lines = len(lines) - len(header_lines)
+    qualities: List[float] = []
+    for n, (start, name) in enumerate(headings):
+        end = headings[n + 1][0] if n + 1 < len(headings) else len(lines)
+        content = lines[start + 1:end]
+        if not content:
+            continue
+        value = _PARSERS.get(name, _parse_list)(content)
+        if not value:
+            continue
+        if name in sections:
+            # Same section continued after a page break or repeated heading
+            existing = sections[name]
+            if isinstance(existing, list):
+                existing.extend(value)
+            elif isinstance(existing, dict):
+                for k, v in value.items():
+                    existing.setdefault(k, []).extend(v)
+            else:
+                sections[name] = f"{existing} {value}"
+        else:
+            sections[name] = value
+            order.append(name)
+        if name in SECTION_ALIASES:
+            known_lines += len(content) + 1
+        qualities.extend(_entry_quality(name, value) if isinstance(value, list) and value and isinstance(value[0], dict) else [])
+
+    known_headings = sum(1 for _, name in headings if name in SECTION_ALIASES)
+    signals = {
+        "header": (bool(header.get("fullName")) + bool(header.get("email") or header.get("phone"))) / 2,
+        "headings": min(1.0, known_headings / 3),
+        "coverage": known_lines / body_lines if body_lines else 0.0,
+        "entries": sum(qualities) / len(qualities) if qualities else 0.0,
+        "core": float("Work Experience" in sections or "Education" in sections),
+        "header_size": 1.0 if len(header_lines) <= 8 else 0.0,
+    }
+    confidence = (
+        0.15 * signals["header"] + 0.2 * signals["headings"] + 0.25 * signals["coverage"]
+        + 0.3 * signals["entries"] + 0.1 * signals["header_size"]
+    ) * signals["core"]
+    if _multi_column([lines[i] for i, _ in headings]):
+        signals["multi_column"] = 1.0
+        confidence *= 0.5
+
+    return SectionerResult(
+        resume_json={"sections": sections, "order": order},
+        confidence=round(confidence, 3),
+        signals={k: round(v, 3) for k, v in signals.items()},
+    )
+
+
+def section_resume_pdf(file_bytes: bytes) -> Optional[SectionerResult]:
+    """Section a PDF resume locally. Returns None when the PDF has no text layer or cannot be read."""
+    try:
+        lines = _flatten(pdf_layout(file_bytes))
+    except Exception as e:
+        logger.warning(f"Resume sectioner could not read PDF: {e}")
+        return None
+    if not lines:
+        return None
+    return section_lines(lines)
+
+
+def section_resume_document(document: PdfDocument) -> Optional[SectionerResult]:
+    """section_resume_pdf() for an already parsed PDF; never parses the file itself."""
+    lines = _flatten(document_layout(document))
+    if not lines:
+        return None
+    return section_lines(lines)
@@ -0,0 +1,195 @@
+"""
+Dictionary-backed skill extraction.
+
+The skill dictionary (skill_dictionary.json, or SKILL_DICTIONARY_PATH) maps each
+canonical skill to its aliases. Every form is tokenized with the same tokenizer
+as keyword_scorer, so multi-word skills ("machine learning", "spring boot") and
+tech tokens ("c++", "node.js", ".net") are token sequences. All forms are
+compiled into one Aho-Corasick automaton over tokens, and a text is matched in
+a single pass over its tokens, whatever its length or the dictionary's size.
+Overlapping hits resolve leftmost-longest ("spring boot" wins over "spring"),
+and every hit is reported under its canonical name.
+"""
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.core.logger import get_logger
+from app.utils.keyword_scorer import _TOKEN_RE, tokenize
+
+logger = get_logger(__name__)
+
+_CASED_TOKEN_RE = re.compile(_TOKEN_RE.pattern, re.I)
+
+SKILL_DICTIONARY_PATH = os.getenv(
+    "SKILL_DICTIONARY_PATH", os.path.join(os.path.dirname(__file__), "skill_dictionary.json")
+)
+
+
+@dataclass
+class SkillMatch:
+    skill: str      # canonical name
+    category: str
+    form: str       # normalized form that matched, e.g. "postgres"
+    start: int      # token index
+    end: int        # token index, exclusive
+    offset: int = -1  # character offset, when scanned with offsets=True
+
+
+def _form_variants(form: str) -> List[Tuple[str, ...]]:
+    """Token sequences a form may appear as: "event-driven" also matches "event driven" and vice versa."""
+    tokens = tuple(tokenize(form))
+    if not tokens:
+        return []
+    variants = {tokens}
+    split = tuple(p for t in tokens for p in t.split("-") if p)
+    variants.add(split)
+    if len(split) > 1:
+        joined = tuple(tokenize("-".join(split)))
+        if len(joined) == 1:
+            variants.add(joined)
+    return sorted(variants)
+
+
+class SkillMatcher:
+    """
+    Token-level Aho-Corasick automaton. Node 0 is the root; goto[n] maps a token to
+    the next node, fail[n] is the longest proper suffix state, and out[n] lists the
+    patterns ending at n (its own plus those reachable through fail links).
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, Iterable[str]]], case_sensitive: Iterable[str] = ()):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[Tuple[int, ...]] = [()]
+        self.patterns: List[Tuple[str, str, str, int]] = []  # (skill, category, form, n_tokens)
+        self._exact: Dict[int, Tuple[str, ...]] = {}  # pid -> tokens as they must be capitalized
+        self._forms: Dict[str, int] = {}
+        self.aliases: Dict[str, List[str]] = {}
+
+        exact_case = {f.lower(): f for f in case_sensitive}
+        for skill, category, forms in entries:
+            for form in [skill, *forms]:
+                for tokens in _form_variants(form):
+                    self._add(tokens, skill, category, exact_case.get(form.lower()))
+        self._build_links()
+
+    # ---- construction ----
+
+    def _add(self, tokens: Tuple[str, ...], skill: str, category: str, exact: Optional[str]) -> None:
+        key = " ".join(tokens)
+        if key in self._forms:
+            return  # first definition wins
+        node = 0
+        for token in tokens:
+            nxt = self.goto[node].get(token)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][token] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append(())
+            node = nxt
+        pid = len(self.patterns)
+        self.patterns.append((skill, category, key, len(tokens)))
+        self.out[node] = (pid,)
+        self._forms[key] = pid
+        self.aliases.setdefault(skill, []).append(key)
+        if exact:
+            self._exact[pid] = tuple(_CASED_TOKEN_RE.findall(exact))
+
+    def _build_links(self) -> None:
+        queue = list(self.goto[0].values())
+        for node in queue:
+            for token, child in self.goto[node].items():
+                queue.append(child)
+                f = self.fail[node]
+                while f and token not in self.goto[f]:
+                    f = self.fail[f]
+                target = self.goto[f].get(token, 0)
+                self.fail[child] = target if target != child else 0
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SkillMatcher":
+        entries = [
+            (skill, category, aliases)
+            for category, skills in data.get("skills", {}).items()
+            for skill, aliases in skills.items()
+        ]
+        return cls(entries, data.get("case_sensitive", ()))
+
+    @classmethod
+    def from_file(cls, path: str) -> "SkillMatcher":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    # ---- matching ----
+
+    def scan(self, text: str, offsets: bool = False) -> List[SkillMatch]:
+        """All non-overlapping skill mentions in `text`, leftmost-longest, in text order."""
+        if not text:
+            return []
+        lowered = text.lower()
+        if offsets:
+            found = list(_TOKEN_RE.finditer(lowered))
+            tokens = [m.group() for m in found]
+        else:
+            tokens = _TOKEN_RE.findall(lowered)
+
+        goto, fail, out, patterns = self.goto, self.fail, self.out, self.patterns
+        candidates = []
+        node = 0
+        for i, token in enumerate(tokens):
+            while node and token not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(token, 0)
+            if node:
+                for pid in out[node]:
+                    candidates.append((i + 1 - patterns[pid][3], -patterns[pid][3], pid))
+
+        matches: List[SkillMatch] = []
+        cased = None
+        taken_until = 0
+        for start, neg_len, pid in sorted(candidates):
+            if start < taken_until:
+                continue
+            skill, category, form, length = patterns[pid]
+            exact = self._exact.get(pid)
+            if exact is not None:
+                # Ambiguous words ("Go", "Spring", "REST") only count as written in the dictionary
+                if cased is None:
+                    cased = _CASED_TOKEN_RE.findall(text)
+                if tuple(cased[start:start + length]) != exact:
+                    continue
+            matches.append(SkillMatch(
+                skill, category, form, start, start + length, found[start].start() if offsets else -1
+            ))
+            taken_until = start + length
+        return matches
+
+    def extract(self, text: str, top_n: Optional[int] = None) -> List[str]:
+        """Canonical skills mentioned in `text`, most frequent first, ties by first mention."""
+        counts: Dict[str, int] = {}
+        for m in self.scan(text):
+            counts[m.skill] = counts.get(m.skill, 0) + 1
+        ranked = sorted(counts, key=lambda s: -counts[s])  # stable: dict keeps first-mention order
+        return ranked[:top_n] if top_n else ranked
+
+    def canonical(self, form: str) -> Optional[str]:
+        pid = self._forms.get(" ".join(tokenize(form)))
+        return self.patterns[pid][0] if pid is not None else None
+
+    def stats(self) -> dict:
+        return {"skills": len(self.aliases), "forms": len(self.patterns), "states": len(self.goto)}
+
+
+@lru_cache(maxsize=1)
+def get_skill_matcher() -> SkillMatcher:
+    """The matcher for SKILL_DICTIONARY_PATH, compiled once per process."""
+    matcher = SkillMatcher.from_file(SKILL_DICTIONARY_PATH)
+    logger.info(f"Loaded skill dictionary: {matcher.stats()}")
+    return matcher
@@ -0,0 +1,142 @@
+"""
+WebP thumbnails of stored resumes, so the resume list can show previews without
+the client downloading and rendering whole PDFs.
+
+A page is rasterized once with PyMuPDF at the largest size and downscaled to the
+others; every size of that page is written at once. Files live in their own
+AssetStore (THUMBNAIL_DIR), pruned least-recently-used first to
+THUMBNAIL_CACHE_MAX_MB. A thumbnail id is an HMAC-SHA256, under a server-side key, of the resume's file
+URL, page, width and quality; Cloudinary URLs carry the upload version, so a URL
+always denotes the same bytes and the id addresses the rendered content. Without
+the key the id cannot be derived from the URL, so it doubles as the unguessable
+part of the public thumbnail URL, and as its ETag. The key is THUMBNAIL_SECRET,
+else SECRET_KEY; with neither set a random key is drawn per process, and
+thumbnails rendered before a restart are simply rendered again.
+"""
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import tempfile
+from io import BytesIO
+from typing import Dict, List, Tuple
+
+import fitz
+from PIL import Image
+
+from app import models
+from app.api.single_flight import SingleFlight
+from app.core.logger import get_logger
+from app.utils.asset_store import AssetStore
+from app.utils.cache import TTLCache
+from app.utils.extract_pool import extraction_pool
+from app.utils.resume_files import fetch_resume_bytes
+from app.utils.upload_intake import sniff_kind
+
+logger = get_logger(__name__)
+
+THUMBNAIL_DIR = os.getenv("THUMBNAIL_DIR", os.path.join(tempfile.gettempdir(), "resume-thumbnails"))
+THUMBNAIL_CACHE_MAX_MB = int(os.getenv("THUMBNAIL_CACHE_MAX_MB", "256"))
+THUMBNAIL_QUALITY = int(os.getenv("THUMBNAIL_QUALITY", "80"))
+THUMBNAIL_MAX_PAGES = int(os.getenv("THUMBNAIL_MAX_PAGES", "10"))
+THUMBNAIL_SIZES = {"sm": 160, "md": 320, "lg": 640}  # name -> width in px
+THUMBNAIL_URL_PREFIX = "/resume/thumbnails/"
+THUMBNAIL_SECRET = (os.getenv("THUMBNAIL_SECRET") or os.getenv("SECRET_KEY") or secrets.token_hex(32)).encode()
+
+thumbnail_store = AssetStore(THUMBNAIL_DIR, THUMBNAIL_CACHE_MAX_MB * 1024 * 1024)
+thumbnail_flight = SingleFlight("thumbnails")
+# file_url -> page count, learned when page 1 is rendered
+page_counts = TTLCache(maxsize=1024, ttl=24 * 3600)
+
+
+class ThumbnailError(Exception):
+    """The resume file could not be thumbnailed (not a PDF, unreadable, no such page)."""
+
+
+def thumbnail_id(file_url: str, page: int, size: str) -> str:
+    key = f"{file_url}|{page}|{THUMBNAIL_SIZES[size]}|{THUMBNAIL_QUALITY}"
+    return f"{hmac.new(THUMBNAIL_SECRET, key.encode(), hashlib.sha256).hexdigest()}.webp"
+
+
+def thumbnail_url(resume: models.Resume, page: int = 1, size: str = "md") -> str:
+    return f"{THUMBNAIL_URL_PREFIX}{resume.id}/{page}/{size}/{thumbnail_id(resume.file_url, page, size)}"
+
+
+def resume_thumbnails(resume: models.Resume, page: int = 1) -> Dict[str, str]:
+    """size -> URL of every thumbnail size of one page; rendered on first request."""
+    return {size: thumbnail_url(resume, page, size) for size in THUMBNAIL_SIZES}
+
+
+def valid_thumbnail_id(resume: models.Resume, page: int, size: str, thumb_id: str) -> bool:
+    return size in THUMBNAIL_SIZES and hmac.compare_digest(thumbnail_id(resume.file_url, page, size), thumb_id)
+
+
+def render_page_thumbnails(
+    file_bytes: bytes, page: int, widths: Dict[str, int], quality: int,
+) -> Tuple[int, Dict[str, bytes]]:
+    """(page count, size -> WebP bytes) for one 1-based page. Runs in an extraction worker."""
+    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if not 1 <= page <= page_count:
+            return page_count, {}
+        pdf_page = doc[page - 1]
+        zoom = max(widths.values()) / pdf_page.rect.width
+        pix = pdf_page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    full = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+
+    variants = {}
+    for size, width in widths.items():
+        image = full if width >= full.width else full.resize(
+            (width, max(1, round(full.height * width / full.width))), Image.LANCZOS,
+        )
+        buf = BytesIO()
+        image.save(buf, format="WEBP", quality=quality, method=4)
+        variants[size] = buf.getvalue()
+    return page_count, variants
+
+
+async def _render(resume: models.Resume, page: int) -> None:
+    file_bytes, _, filename = await fetch_resume_bytes(resume)
+    if sniff_kind(file_bytes) != "pdf":
+        raise ThumbnailError("Thumbnails are only available for PDF resumes.")
+    try:
+        page_count, variants = await extraction_pool.run(
+            render_page_thumbnails, file_bytes, page, THUMBNAIL_SIZES, THUMBNAIL_QUALITY,
+            label=f"{filename} thumbnail p{page}",
+        )
+    except asyncio.TimeoutError:
+        raise
+    except Exception as e:
+        logger.warning(f"Thumbnail of resume {resume.id} page {page} failed: {e}")
+        raise ThumbnailError(f"Could not render resume {resume.id}.")
+    page_counts.set(resume.file_url, page_count)
+    if not variants:
+        raise ThumbnailError(f"Resume {resume.id} has no page {page}.")
+    for size, data in variants.items():
+        await asyncio.to_thread(thumbnail_store.put_as, thumbnail_id(resume.file_url, page, size), data)
+
+
+async def thumbnail_path(resume: models.Resume, page: int, size: str) -> str:
+    """Path of the cached thumbnail, rendering (and caching every size of) the page on a miss."""
+    thumb_id = thumbnail_id(resume.file_url, page, size)
+    path = thumbnail_store.path(thumb_id, touch=True)
+    if path is None:
+        await thumbnail_flight.do(f"{resume.file_url}|{page}", lambda: _render(resume, page))
+        path = thumbnail_store.path(thumb_id, touch=True)
+        if path is None:
+            raise ThumbnailError(f"Thumbnail of resume {resume.id} was evicted before it was served.")
+    return path
+
+
+async def page_thumbnails(resume: models.Resume, size: str = "md") -> List[str]:
+    """URLs for every page (up to THUMBNAIL_MAX_PAGES); renders page 1 if the page count is unknown."""
+    page_count = page_counts.get(resume.file_url)
+    if page_count is None:
+        await thumbnail_flight.do(f"{resume.file_url}|1", lambda: _render(resume, 1))
+        page_count = page_counts.get(resume.file_url, 1)
+    return [thumbnail_url(resume, page, size) for page in range(1, min(page_count, THUMBNAIL_MAX_PAGES) + 1)]
+
+
+def prune_thumbnails():
+    thumbnail_store.prune()
@@ -0,0 +1,178 @@
+"""
+Shared intake for resume uploads.
+
+read_upload() pulls an UploadFile in chunks, stopping as soon as the size cap is
+crossed instead of reading a 200 MB body into memory first, hashes the bytes as
+they arrive (Upload.sha256 feeds the parsed-PDF and structure caches, so they
+don't hash the file again), and decides the file type from its magic bytes
+rather than the client's Content-Type.
+
+Starlette spools a multipart body to a temporary file before the endpoint runs,
+so UploadLimitMiddleware rejects multipart requests to the /ai upload endpoints
+over UPLOAD_MAX_REQUEST_MB (the file cap plus room for form fields such as a job
+description): from Content-Length before any of the body is read, or, for chunked
+bodies, as soon as the bytes received pass the limit. Other routes, e.g.
+/get-jd-from/image with its own files, are left alone.
+
+The joined buffer is the one copy made of the upload beyond Starlette's spool. It
+stays a plain bytes object rather than a memory map of the spool file because it
+is pickled to extraction workers and shared by the hash-keyed caches, and
+PyMuPDF's stream= takes it without copying again.
+"""
+import hashlib
+import os
+import zipfile
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException, UploadFile
+
+MAX_FILE_SIZE_MB = 2
+UPLOAD_CHUNK_SIZE = 64 * 1024
+UPLOAD_FORM_HEADROOM_MB = 1
+UPLOAD_MAX_REQUEST_MB = int(os.getenv("UPLOAD_MAX_REQUEST_MB", str(MAX_FILE_SIZE_MB + UPLOAD_FORM_HEADROOM_MB)))
+# Path prefix -> largest multipart body accepted; the longest matching prefix applies
+UPLOAD_REQUEST_LIMITS = {"/ai/": UPLOAD_MAX_REQUEST_MB * 1024 * 1024}
+
+PDF_MEDIA_TYPE = "application/pdf"
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+_KIND_NAMES = {"pdf": "PDF", "docx": "DOCX"}
+
+
+@dataclass
+class Upload:
+    filename: str
+    data: bytes
+    sha256: str
+    kind: Optional[str]  # "pdf", "docx" or None, from the magic bytes
+    content_type: str    # derived from kind, not the client's header
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+def sniff_kind(data: bytes) -> Optional[str]:
+    # PDF readers accept the header anywhere in the first 1 KB
+    if b"%PDF-" in data[:1024]:
+        return "pdf"
+    if data[:4] == b"PK\x03\x04":
+        try:
+            with zipfile.ZipFile(BytesIO(data)) as archive:
+                archive.getinfo("word/document.xml")
+            return "docx"
+        except (KeyError, zipfile.BadZipFile):
+            return None
+    return None
+
+
+def _content_type(kind: Optional[str]) -> str:
+    return {"pdf": PDF_MEDIA_TYPE, "docx": DOCX_MEDIA_TYPE}.get(kind, "application/octet-stream")
+
+
+async def read_upload(
+    file: UploadFile,
+    max_size: int,
+    kinds: Iterable[str] = ("pdf", "docx"),
+) -> Upload:
+    """
+    The upload's bytes, hash and sniffed type. 400 when empty or over max_size,
+    415 when the bytes are not one of `kinds`.
+    """
+    sha = hashlib.sha256()
+    chunks = []
+    size = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_size:
+            raise HTTPException(
+                status_code=400,
+                detail=f"File too large. Maximum allowed size is {max_size // (1024 * 1024)} MB.",
+            )
+        sha.update(chunk)
+        chunks.append(chunk)
+    if not size:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty.")
+
+    data = b"".join(chunks)
+    kind = sniff_kind(data)
+    kinds = tuple(kinds)
+    if kind not in kinds:
+        raise HTTPException(
+            status_code=415,
+            detail=f"Unsupported file type. Upload a {' or '.join(_KIND_NAMES[k] for k in kinds)} file.",
+        )
+    return Upload(file.filename or "", data, sha.hexdigest(), kind, _content_type(kind))
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadLimitMiddleware:
+    """
+    Pure ASGI: 413 for multipart requests over their path's limit. A declared
+    Content-Length is checked up front; the body is also counted as it is received,
+    so chunked uploads without a length are cut off at the limit too.
+    """
+
+    def __init__(self, app, limits: Optional[Dict[str, int]] = None):
+        self.app = app
+        self.limits = sorted((limits or UPLOAD_REQUEST_LIMITS).items(), key=lambda item: -len(item[0]))
+
+    def _limit(self, path: str) -> Optional[int]:
+        for prefix, max_bytes in self.limits:
+            if path.startswith(prefix):
+                return max_bytes
+        return None
+
+    @staticmethod
+    async def _reject(send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"connection", b"close")],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": b'{"detail":"Request body too large."}',
+        })
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        max_bytes = self._limit(scope.get("path", ""))
+        headers = dict(scope.get("headers") or [])
+        if max_bytes is None or not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+        length = headers.get(b"content-length", b"")
+        if length.isdigit() and int(length) > max_bytes:
+            return await self._reject(send)
+
+        received = 0
+        rejected = False
+
+        async def counting_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes and not rejected:
+                    rejected = True
+                    await self._reject(send)
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message):
+            # Once the 413 is out, whatever the app answers to the aborted body is dropped
+            if not rejected:
+                await send(message)
+
+        try:
+            await self.app(scope, counting_receive, guarded_send)
+        except _BodyTooLarge:
+            pass